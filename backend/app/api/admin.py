@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends
+
+from core.database import async_engine, async_read_engine, engine, read_engine
+from core.pool import pool_snapshot
+from core.security import get_current_token
+
+router = APIRouter(prefix="/api/admin", tags=["admin"])
+
+
+@router.get("/db/pool")
+def get_pool_stats(token=Depends(get_current_token)):
+    """
+    Connection pool counters for the worker that served this request.
+    Each uvicorn worker has its own pools; `pid` tells them apart.
+    """
+    pools = {
+        "sync": pool_snapshot(engine.pool),
+        "async": pool_snapshot(async_engine.sync_engine.pool),
+    }
+    if read_engine is not None:
+        pools["sync_read"] = pool_snapshot(read_engine.pool)
+        pools["async_read"] = pool_snapshot(async_read_engine.sync_engine.pool)
+    return pools
@@ -1,14 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from bcrypt import checkpw
 
 from schemas.user import UserRead
-from core.database import get_db
+from core.database import get_async_db, get_db
 from schemas.auth import Token
 from core.security import auth_required, create_access_token, get_current_token, oauth2_scheme
-from crud.user import UserCRUD
-from crud.blacklist import BlackListCRUD
+from crud.user import AsyncUserCRUD, UserCRUD
+from crud.blacklist import AsyncBlackListCRUD
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 
@@ -24,21 +25,21 @@ def login(form: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get
 
 @router.get("/me", response_model=UserRead)
 @auth_required
-async def me(request: Request, db: Session = Depends(get_db)):
+async def me(request: Request, db: AsyncSession = Depends(get_async_db)):
     id = request.state.user["sub"]
-    crud = UserCRUD(db)
-    return crud.get_by_id(id)
+    crud = AsyncUserCRUD(db)
+    return await crud.get_by_id(id)
 
 
 @router.get("/me/clients")
 @auth_required
-async def me(request: Request, db: Session = Depends(get_db)):
+async def me(request: Request, db: AsyncSession = Depends(get_async_db)):
     id = request.state.user["sub"]
-    crud = UserCRUD(db)
-    return crud.get_user_client(id)
+    crud = AsyncUserCRUD(db)
+    return await crud.get_user_client(id)
 
 @router.post("/logout")
-async def logout(request: Request, token=Depends(get_current_token)):
-    crud = BlackListCRUD(request.state.db)
-    crud.add(token)
+async def logout(request: Request, token=Depends(get_current_token), db: AsyncSession = Depends(get_async_db)):
+    crud = AsyncBlackListCRUD(db)
+    await crud.add(token)
     return {"message": "Logged out successfully"}
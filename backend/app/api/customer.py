@@ -3,6 +3,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlmodel import Session
 
 from core.database import get_db
+from core.responses import JSONResponse
 from crud.customer import CustomerCRUD
 from schemas.customer import (
     ReadCustomer,
@@ -26,7 +27,7 @@ def get_customers(
     try:
         items, total = crud.all(search=search, page=page, page_size=pageSize)
         data = [ReadCustomer(**c) for c in items]
-        return {"data": data, "total": total, "page": page, "pageSize": pageSize}
+        return JSONResponse({"data": data, "total": total, "page": page, "pageSize": pageSize})
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
@@ -1,9 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from core.database import get_db
-from schemas.imei import ReadImei, CreateImei
-from crud.imei import ImeiCRUD
+from core import config, snapshots
+from core.database import get_async_db, get_db
+from core.pagination import decode_cursor, encode_cursor
+from core.query_stats import query_budget
+from core.responses import JSONResponse
+from schemas.imei import BulkCreateImei, BulkImeiReport, ImeiLookupReport, LookupImeis, ReadImei, ReadImeiList, CreateImei
+from crud.imei import AsyncImeiCRUD, ImeiCRUD
+from crud.inventory import InventoryCRUD
 
 router = APIRouter(prefix="/api/imeis", tags=["imeis"])
 
@@ -18,26 +24,40 @@ def get_storage_options():
     ]
 
 @router.get("/")
-def get_all_imeis(db: Session = Depends(get_db)):
+@query_budget(1)
+def get_all_imeis(
+    pageSize: int = Query(50, ge=1, le=200),
+    cursor: str | None = Query(None),
+    store_id: int | None = Query(None),
+    brand: str | None = Query(None),
+    model: str | None = Query(None),
+    storage_size: str | None = Query(None),
+    vendor_id: int | None = Query(None),
+    db: Session = Depends(get_db),
+):
+    """
+    Newest IMEIs first, one page at a time. Pass the returned nextCursor
+    back as `cursor` for the following page; it is null on the last one.
+    """
     crud = ImeiCRUD(db)
     try:
-        imeis = crud.all()
-
-        # Return a stable, filter-friendly shape to the frontend.
-        # We keep the existing wrapper {data,total} for compatibility.
-        data = []
-        for i in imeis:
-            try:
-                # Pydantic v1
-                data.append(ReadImei.from_orm(i).dict())
-            except Exception:
-                # Pydantic v2
-                data.append(ReadImei.model_validate(i).model_dump())
-
-        return {
-            "data": data,
-            "total": len(data)
-        }
+        rows = crud.page(
+            limit=pageSize + 1,
+            after=decode_cursor(cursor) if cursor else None,
+            store_id=store_id,
+            brand=brand,
+            model=model,
+            storage_size=storage_size,
+            vendor_id=vendor_id,
+        )
+        more = len(rows) > pageSize
+        rows = rows[:pageSize]
+        last = rows[-1] if more else None
+        return JSONResponse({
+            "data": ReadImeiList.validate_python(rows),
+            "nextCursor": encode_cursor(last["created_at"], last["id"]) if last else None,
+            "pageSize": pageSize,
+        })
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -53,6 +73,7 @@ def create_imei(data: CreateImei, db: Session = Depends(get_db)):
             model=data.model,
             storage_size=data.storage_size,
             store_id=data.store_id,
+            secondary_code=data.secondary_code,
         )
     except Exception as e:
         db.rollback()
@@ -60,57 +81,169 @@ def create_imei(data: CreateImei, db: Session = Depends(get_db)):
         
     return imei
 
-@router.get("/id/{id}", response_model=ReadImei)
-def get_imei_by_id(id:int, db: Session = Depends(get_db)):
+@router.post("/bulk", response_model=BulkImeiReport)
+def bulk_create_imeis(data: BulkCreateImei, db: Session = Depends(get_db)):
+    """Stock intake of a whole carton; invalid codes are reported, not fatal."""
     crud = ImeiCRUD(db)
     try:
-        imei = crud.get_by_id(id)
+        results = crud.bulk_upsert(
+            codes=data.codes,
+            brand=data.brand,
+            model=data.model,
+            store_id=data.store_id,
+            vendor_id=data.vendor_id,
+            storage_size=data.storage_size,
+        )
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    counts = {"created": 0, "updated": 0, "rejected": 0}
+    for r in results:
+        counts[r["status"]] += 1
+    return BulkImeiReport(**counts, results=results)
+
+@router.get("/search")
+@query_budget(3)
+async def search_imeis(
+    q: str = Query(..., min_length=1, max_length=32),
+    store_id: int | None = Query(None),
+    limit: int = Query(20, ge=1, le=config.IMEI_SEARCH_MAX_RESULTS),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Partial IMEI search for counter staff typing the last digits: codes
+    ending with `q` first, then codes containing it (where the pg_trgm
+    index exists), at most `limit`. With store_id, only phones in stock there.
+    """
+    crud = AsyncImeiCRUD(db)
+    try:
+        imeis = await crud.search(q, store_id=store_id, limit=limit)
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return JSONResponse({"data": [ReadImei.model_validate(i) for i in imeis], "total": len(imeis)})
+
+@router.post("/lookup", response_model=ImeiLookupReport)
+@query_budget(1)
+async def lookup_imeis(data: LookupImeis, db: AsyncSession = Depends(get_async_db)):
+    """
+    Batch form of GET /code/{code} for scanning bursts: every code resolved
+    in one round trip and one query. Unknown codes are reported as missing,
+    not as an error.
+    """
+    crud = AsyncImeiCRUD(db)
+    try:
+        results = await crud.lookup(data.codes, store_id=data.store_id)
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    found = sum(1 for r in results if r["found"])
+    return ImeiLookupReport(found=found, missing=len(results) - found, results=results)
+
+@router.get("/id/{id}", response_model=ReadImei)
+async def get_imei_by_id(id:int, db: AsyncSession = Depends(get_async_db)):
+    crud = AsyncImeiCRUD(db)
+    try:
+        imei = await crud.get_by_id(id)
         if not imei:
             raise HTTPException(status_code=404, detail="IMEI not found")
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
         
     return imei
 
 @router.get("/code/{code}", response_model=ReadImei)
-def get_imei_by_code(code:str, db: Session = Depends(get_db)):
-    crud = ImeiCRUD(db)
+async def get_imei_by_code(code:str, db: AsyncSession = Depends(get_async_db)):
+    crud = AsyncImeiCRUD(db)
     try:
-        imei = crud.get_by_code(code)
+        imei = await crud.get_by_code(code)
         if not imei:
             raise HTTPException(status_code=404, detail="IMEI not found")
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
         
     return imei
 
 
 @router.get("/stores/{store_id}")
-def get_by_store_id(store_id: int, db: Session = Depends(get_db)):
-    crud = ImeiCRUD(db)
+@query_budget(3)
+def get_by_store_id(
+    store_id: int,
+    if_none_match: str | None = Header(None),
+    db: Session = Depends(get_db),
+):
+    """
+    The store's whole inventory, {data, total}. Versioned by
+    store_inventory_version: the ETag changes whenever the store's stock
+    (or its name or client) does. An If-None-Match of "*" or listing the
+    ETag, weak or not, gets 304 after one primary-key lookup, and the
+    serialized body is cached per version.
+    """
     try:
-        imeis = crud.all_by_store_id(store_id=store_id)
-        
-        # Return same format as /imeis endpoint
-        data = []
-        for i in imeis:
-            try:
-                # Pydantic v1
-                data.append(ReadImei.from_orm(i).dict())
-            except Exception:
-                # Pydantic v2
-                data.append(ReadImei.model_validate(i).model_dump())
-
-        return {
-            "data": data,
-            "total": len(data)
-        }
+        # Version first: the body built below is then at least as new as its ETag.
+        version = InventoryCRUD(db).version(store_id)
+        etag = f'"{store_id}-{version}"'
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        # RFC 9110 13.1.2: "*" or any listed tag, compared weakly.
+        if if_none_match and {"*", etag} & {t.strip().removeprefix("W/") for t in if_none_match.split(",")}:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        def build() -> bytes:
+            rows = ImeiCRUD(db).all_by_store_id(store_id=store_id)
+            data = ReadImeiList.dump_json(ReadImeiList.validate_python(rows))
+            return b'{"data":%s,"total":%d}' % (data, len(rows))
+
+        body = snapshots.store_inventory.get_or_build(store_id, version, build)
+        return Response(content=body, media_type="application/json", headers=headers)
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.get("/stores/{store_id}/changes")
+@query_budget(3)
+def get_store_changes(
+    store_id: int,
+    since: int | None = Query(None, ge=0),
+    db: Session = Depends(get_db),
+):
+    """
+    Delta sync of a store's inventory. Without `since`, or with a cursor
+    older than the change log keeps, returns a full snapshot:
+    {full: true, codes, cursor}. Otherwise returns what changed after it:
+    {full: false, added, removed, cursor, more}, each code listed once with
+    its latest state. "added" also covers phones whose brand, model or
+    storage changed. Call again with the returned cursor; while `more` is
+    true there are further changes waiting.
+    """
+    try:
+        inventory = InventoryCRUD(db)
+        # Version first: a snapshot read after it is at least as new as its cursor,
+        # and replaying changes over it is harmless.
+        row = inventory.version_row(store_id)
+        if since is None or not row.changes_floor <= since <= row.version:
+            return JSONResponse({"full": True, "codes": inventory.codes(store_id), "cursor": row.version})
+
+        changes, cursor = inventory.changes(store_id, since, row.version, config.INVENTORY_CHANGES_PAGE_SIZE)
+        state = {}
+        for change in changes:
+            state[change.imei_code] = change.change
+        return JSONResponse({
+            "full": False,
+            "added": [code for code, change in state.items() if change == "added"],
+            "removed": [code for code, change in state.items() if change == "removed"],
+            "cursor": cursor,
+            "more": cursor < row.version,
+        })
     except Exception as e:
         db.rollback()
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -0,0 +1,72 @@
+import os
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, status
+from sqlmodel import Session
+
+from core import stock_import
+from core.database import get_db
+from crud.import_job import ImportJobCRUD
+from schemas.import_job import ReadImportJob
+
+router = APIRouter(prefix="/api/imports", tags=["imports"])
+
+
+def _to_read(job) -> ReadImportJob:
+    rate = None
+    if job.started_at:
+        elapsed = ((job.finished_at or datetime.now()) - job.started_at).total_seconds()
+        rate = round(job.rows_processed / elapsed, 1) if elapsed > 0 else None
+    return ReadImportJob(**job.model_dump(exclude={"path", "brand", "model", "storage_size"}), rows_per_second=rate)
+
+
+# ── UPLOAD a stock file (multipart), imported in the background ──
+@router.post("/", response_model=ReadImportJob, status_code=status.HTTP_202_ACCEPTED)
+def upload_stock_file(
+    file: UploadFile = File(...),
+    store_id: int = Form(...),
+    vendor_id: int | None = Form(None),
+    brand: str = Form(""),
+    model: str = Form(""),
+    storage_size: str | None = Form(None),
+    db: Session = Depends(get_db),
+):
+    filename = file.filename or "upload"
+    ext = os.path.splitext(filename)[1].lower()
+    if ext not in stock_import.READERS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported file type {ext or '(none)'}; upload {' or '.join(stock_import.READERS)}",
+        )
+
+    try:
+        path = stock_import.save_upload(file.file, ext)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+
+    try:
+        job = ImportJobCRUD(db).create(
+            filename=filename,
+            path=path,
+            store_id=store_id,
+            vendor_id=vendor_id,
+            brand=brand.strip(),
+            model=model.strip(),
+            storage_size=storage_size or None,
+        )
+    except Exception as e:
+        db.rollback()
+        os.remove(path)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    stock_import.submit(job.id)
+    return _to_read(job)
+
+
+# ── JOB progress ─────────────────────────────────────────────────
+@router.get("/{job_id}", response_model=ReadImportJob)
+def get_import_job(job_id: int, db: Session = Depends(get_db)):
+    job = ImportJobCRUD(db).get_by_id(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return _to_read(job)
@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlmodel import Session
+
+from core.database import get_db
+from core.query_stats import query_budget
+from crud.inventory import InventoryCRUD
+from schemas.inventory import ReadStockLevel
+
+router = APIRouter(prefix="/api/inventory", tags=["inventory"])
+
+
+# ── STOCK LEVELS per store / brand / model / storage ─────────────
+@router.get("/summary")
+@query_budget(1)
+def get_stock_summary(
+    store_id: int | None = Query(None),
+    brand: str | None = Query(None),
+    model: str | None = Query(None),
+    storage_size: str | None = Query(None),
+    db: Session = Depends(get_db),
+):
+    """
+    In-stock quantities from the stock summary, e.g.
+    ?store_id=7&brand=Apple&model=iPhone 13&storage_size=128 GB
+    Brand and model match case-insensitively and come back lowercased.
+    """
+    crud = InventoryCRUD(db)
+    try:
+        rows = crud.summary(store_id=store_id, brand=brand, model=model, storage_size=storage_size)
+        data = [ReadStockLevel.model_validate(r) for r in rows]
+        return {"data": data, "total": sum(r.quantity for r in data)}
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlmodel import Session
 
 from core.database import get_db
+from core.query_stats import query_budget
 from schemas.menu import (
     CreateMenu, ReadMenu, UpdateMenu,
     CreateSubMenu, ReadSubMenu, UpdateSubMenu,
@@ -15,6 +16,7 @@ router = APIRouter(prefix="/api/menus", tags=["menus"])
 # ─── Menus ─────────────────────────────────────────────────────
 
 @router.get("/", response_model=list[ReadMenu])
+@query_budget(2)
 def list_menus(db: Session = Depends(get_db)):
     crud = MenuCRUD(db)
     return crud.get_all()
@@ -123,6 +125,7 @@ def check_permission(user_id: int, permission_string: str, db: Session = Depends
 
 
 @router.get("/permissions/user/{user_id}/menu")
+@query_budget(3)
 def get_user_menu(user_id: int, db: Session = Depends(get_db)):
     """Get filtered menu tree for a user based on their permissions."""
     crud = UserPermissionCRUD(db)
@@ -2,11 +2,9 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlmodel import Session
 
 from core.database import get_db
-from crud.category import CategoryCRUD
-from crud.client import ClientCRUD
+from core.query_stats import query_budget
+from core.responses import JSONResponse
 from crud.purchase import PurchaseCRUD
-from crud.vendor import VendorCRUD
-from crud.store import StoreCRUD
 from schemas.purchase import (
     CreatePurchase,
     ReadPurchase,
@@ -17,33 +15,13 @@ from schemas.purchase import (
 router = APIRouter(prefix="/api/purchases", tags=["purchases"])
 
 
-def _to_read_purchase(db: Session, purchase) -> ReadPurchase:
-    vendor = VendorCRUD(db).get_by_id(purchase.vendor_id)
-    brand = CategoryCRUD(db).get_by_id(purchase.brand_id)
-    model = CategoryCRUD(db).get_by_id(purchase.model_id)
-    store = StoreCRUD(db).get_by_id(purchase.store_id)
-
-    company_id = getattr(store, "client_id", None) if store else None
-    company = ClientCRUD(db).get_by_id(company_id) if company_id else None
-    company_name = getattr(company, "name", None)
-
-    storage_size = None
-    if purchase.imeis:
-        storage_size = purchase.imeis[0].storage_size
-
+def _to_read_purchase(purchase, details: dict) -> ReadPurchase:
     return ReadPurchase(
         id=purchase.id,
         vendor_id=purchase.vendor_id,
-        vendor_name=getattr(vendor, "name", None),
         brand_id=purchase.brand_id,
-        brand_name=getattr(brand, "name", None),
         model_id=purchase.model_id,
-        model_name=getattr(model, "name", None),
         store_id=purchase.store_id,
-        store_name=getattr(store, "name", None),
-        company_id=company_id,
-        company_name=company_name,
-        storage_size=storage_size,
         quantity=purchase.quantity,
         status=purchase.status,
         total_price=purchase.total_price,
@@ -51,16 +29,23 @@ def _to_read_purchase(db: Session, purchase) -> ReadPurchase:
         payment_status=purchase.payment_status,
         created_at=purchase.created_at,
         updated_at=purchase.updated_at,
+        **details,
     )
 
 
+def _read_purchases(db: Session, purchases) -> list[ReadPurchase]:
+    details = PurchaseCRUD(db).read_details([p.id for p in purchases])
+    return [_to_read_purchase(p, details.get(p.id, {})) for p in purchases]
+
+
 @router.get("/")
+@query_budget(2)
 def get_all_purchases(db: Session = Depends(get_db)):
     crud = PurchaseCRUD(db)
     try:
         purchases = crud.all()
-        data = [_to_read_purchase(db, p) for p in purchases]
-        return {"data": data, "total": len(data)}
+        data = _read_purchases(db, purchases)
+        return JSONResponse({"data": data, "total": len(data)})
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -82,7 +67,7 @@ def create_purchase(payload: CreatePurchase, db: Session = Depends(get_db)):
             paid_amount=payload.paid_amount,
             payment_status=payload.payment_status,
         )
-        return _to_read_purchase(db, purchase)
+        return _read_purchases(db, [purchase])[0]
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -95,7 +80,7 @@ def update_purchase_status(
     crud = PurchaseCRUD(db)
     try:
         purchase = crud.update_status(purchase_id, payload.status)
-        return _to_read_purchase(db, purchase)
+        return _read_purchases(db, [purchase])[0]
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -113,7 +98,7 @@ def update_purchase_payment(
             paid_amount=payload.paid_amount,
             payment_status=payload.payment_status,
         )
-        return _to_read_purchase(db, purchase)
+        return _read_purchases(db, [purchase])[0]
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
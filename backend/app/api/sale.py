@@ -5,10 +5,13 @@ from pathlib import Path
 from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
 from fastapi.responses import FileResponse
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from core.database import get_db
-from crud.sale import SaleCRUD
-from schemas.sale import CreateSale, ReadSale
+from core.database import get_async_db, get_db
+from core.query_stats import query_budget
+from core.responses import JSONResponse
+from crud.sale import AsyncSaleCRUD, SaleBatchError, SaleCRUD
+from schemas.sale import CreateSale, CreateSaleBatch, ReadSale, ReadSaleBatch, SaleBatchItemError
 
 router = APIRouter(prefix="/api/sales", tags=["sales"])
 
@@ -32,6 +35,7 @@ def _to_read(sale, request_base: str = "") -> ReadSale:
         amount=sale.amount,
         notes=sale.notes or "",
         status=sale.status,
+        order_ref=sale.order_ref,
         customer_name=sale.customer_name,
         customer_phone=sale.customer_phone,
         customer_secondary_phone=sale.customer_secondary_phone or "",
@@ -49,30 +53,30 @@ def _to_read(sale, request_base: str = "") -> ReadSale:
 
 # ── LIST (paginated + filterable) ────────────────────────────────
 @router.get("/")
-def get_all_sales(
+async def get_all_sales(
     page: int = Query(1, ge=1),
     pageSize: int = Query(50, ge=1, le=200),
     status_filter: str | None = Query(None, alias="status"),
     store_id: int | None = Query(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    crud = SaleCRUD(db)
+    crud = AsyncSaleCRUD(db)
     try:
-        items, total = crud.all(
+        items, total = await crud.all(
             status=status_filter, store_id=store_id, page=page, page_size=pageSize
         )
         data = [_to_read(s) for s in items]
-        return {"data": data, "total": total, "page": page, "pageSize": pageSize}
+        return JSONResponse({"data": data, "total": total, "page": page, "pageSize": pageSize})
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
 # ── GET single sale ─────────────────────────────────────────────
 @router.get("/{sale_id}")
-def get_sale(sale_id: int, db: Session = Depends(get_db)):
-    crud = SaleCRUD(db)
-    sale = crud.get_by_id(sale_id)
+async def get_sale(sale_id: int, db: AsyncSession = Depends(get_async_db)):
+    crud = AsyncSaleCRUD(db)
+    sale = await crud.get_by_id(sale_id)
     if not sale:
         raise HTTPException(status_code=404, detail="Sale not found")
     return _to_read(sale)
@@ -110,6 +114,48 @@ def create_sale(data: CreateSale, db: Session = Depends(get_db)):
     return _to_read(sale)
 
 
+# ── CREATE several sales in one checkout ─────────────────────────
+@router.post("/batch", response_model=ReadSaleBatch)
+@query_budget(8)
+def create_sale_batch(data: CreateSaleBatch, db: Session = Depends(get_db)):
+    """
+    Sells all the items to one customer in one transaction, under a shared
+    order_ref. If any code is unknown, not in stock in the store or sent
+    twice, nothing is sold and the 400's detail lists each offending item:
+    {"message": ..., "items": [{imei_code, error, detail}, ...]}.
+    """
+    crud = SaleCRUD(db)
+    try:
+        order_ref, sales = crud.create_batch(
+            store_id=data.store_id,
+            store_name=data.store_name,
+            items=[item.model_dump() for item in data.items],
+            customer_name=data.customer_name,
+            customer_phone=data.customer_phone,
+            customer_secondary_phone=data.customer_secondary_phone,
+            next_of_kin_name=data.next_of_kin_name,
+            next_of_kin_relationship=data.next_of_kin_relationship,
+            next_of_kin_phone=data.next_of_kin_phone,
+            next_of_kin_secondary_phone=data.next_of_kin_secondary_phone,
+            seller_id=data.seller_id,
+            seller_name=data.seller_name,
+        )
+    except SaleBatchError as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"message": str(e), "items": [SaleBatchItemError(**item).model_dump() for item in e.items]},
+        )
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return ReadSaleBatch(
+        order_ref=order_ref,
+        total_amount=sum(sale.amount for sale in sales),
+        sales=[_to_read(sale) for sale in sales],
+    )
+
+
 # ── UPLOAD RECEIPT (multipart) ───────────────────────────────────
 @router.post("/{sale_id}/receipt", response_model=ReadSale)
 def upload_receipt(
@@ -1,8 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlmodel import Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from core.database import get_db
-from crud.stock_request import StockRequestCRUD
+from core.database import get_async_db, get_db
+from core.responses import JSONResponse
+from crud.stock_request import AsyncStockRequestCRUD, StockRequestCRUD
 from schemas.stock_request import (
     CreateStockRequest,
     ExecuteReceive,
@@ -38,47 +40,47 @@ def _to_read(sr) -> ReadStockRequest:
 
 
 @router.get("/")
-def get_all_stock_requests(
+async def get_all_stock_requests(
     page: int = Query(1, ge=1),
     pageSize: int = Query(50, ge=1, le=200),
     status_filter: str | None = Query(None, alias="status"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    crud = StockRequestCRUD(db)
+    crud = AsyncStockRequestCRUD(db)
     try:
-        items, total = crud.all(status=status_filter, page=page, page_size=pageSize)
+        items, total = await crud.all(status=status_filter, page=page, page_size=pageSize)
         data = [_to_read(i) for i in items]
-        return {"data": data, "total": total, "page": page, "pageSize": pageSize}
+        return JSONResponse({"data": data, "total": total, "page": page, "pageSize": pageSize})
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
 @router.get("/store/{store_id}")
-def get_stock_requests_by_store(store_id: int, db: Session = Depends(get_db)):
+async def get_stock_requests_by_store(store_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get all stock requests where the given store is either source or destination."""
-    crud = StockRequestCRUD(db)
+    crud = AsyncStockRequestCRUD(db)
     try:
-        items = crud.get_by_store(store_id)
+        items = await crud.get_by_store(store_id)
         data = [_to_read(i) for i in items]
-        return {"data": data, "total": len(data)}
+        return JSONResponse({"data": data, "total": len(data)})
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
 @router.get("/{request_id}")
-def get_stock_request(request_id: int, db: Session = Depends(get_db)):
-    crud = StockRequestCRUD(db)
+async def get_stock_request(request_id: int, db: AsyncSession = Depends(get_async_db)):
+    crud = AsyncStockRequestCRUD(db)
     try:
-        sr = crud.get_by_id(request_id)
+        sr = await crud.get_by_id(request_id)
         if not sr:
             raise HTTPException(status_code=404, detail="Stock request not found")
         return _to_read(sr)
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
@@ -95,7 +97,6 @@ def create_stock_request(payload: CreateStockRequest, db: Session = Depends(get_
             model=payload.model,
             storage=payload.storage,
             requested_quantity=payload.requested_quantity,
-            available_stock=payload.available_stock,
             notes=payload.notes,
             requested_imeis=payload.requested_imeis,
         )
@@ -0,0 +1,132 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlmodel import Session
+
+from core.database import get_db
+from core.query_stats import query_budget
+from crud.stock_take import StockTakeCRUD
+from schemas.stock_take import (
+    CreateStockTake,
+    ReadStockTake,
+    StockTakeCounters,
+    StockTakeReport,
+    StockTakeScanBatch,
+    StockTakeScanResult,
+)
+
+router = APIRouter(prefix="/api/stock-takes", tags=["stock-takes"])
+
+
+def _counters(counters: dict) -> StockTakeCounters:
+    expected = counters["expected"]
+    progress = round(100 * counters["counted"] / expected, 1) if expected else 100.0
+    return StockTakeCounters(**counters, progress=progress)
+
+
+def _to_read(take, counters: dict) -> ReadStockTake:
+    return ReadStockTake(
+        id=take.id,
+        store_id=take.store_id,
+        note=take.note,
+        status=take.status,
+        counters=_counters(counters),
+        created_at=take.created_at,
+        closed_at=take.closed_at,
+    )
+
+
+def _get_or_404(crud: StockTakeCRUD, stock_take_id: int):
+    take = crud.get_by_id(stock_take_id)
+    if not take:
+        raise HTTPException(status_code=404, detail="Stock take not found")
+    return take
+
+
+# ── LIST / START a stock take of one store ───────────────────────
+@router.get("/")
+def get_all_stock_takes(
+    store_id: int | None = Query(None),
+    status_filter: str | None = Query(None, alias="status"),
+    db: Session = Depends(get_db),
+):
+    """Stock takes, newest first, with their closing counters (open ones show zeros; GET one for live counts)."""
+    crud = StockTakeCRUD(db)
+    try:
+        takes = crud.all(store_id=store_id, status=status_filter)
+        return {"data": [_to_read(t, crud.frozen_counters(t)) for t in takes], "total": len(takes)}
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.post("/", response_model=ReadStockTake)
+def create_stock_take(data: CreateStockTake, db: Session = Depends(get_db)):
+    crud = StockTakeCRUD(db)
+    try:
+        take = crud.create(store_id=data.store_id, note=data.note)
+        return _to_read(take, crud.counters(take))
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+# ── PROGRESS ─────────────────────────────────────────────────────
+@router.get("/{stock_take_id}", response_model=ReadStockTake)
+@query_budget(2)
+def get_stock_take(stock_take_id: int, db: Session = Depends(get_db)):
+    crud = StockTakeCRUD(db)
+    take = _get_or_404(crud, stock_take_id)
+    try:
+        return _to_read(take, crud.counters(take))
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+# ── SCAN a batch of codes (any number of handhelds) ──────────────
+@router.post("/{stock_take_id}/scans", response_model=StockTakeScanResult)
+@query_budget(3)
+def scan_codes(stock_take_id: int, data: StockTakeScanBatch, db: Session = Depends(get_db)):
+    """
+    Adds scanned codes to an open stock take. Codes already scanned, by
+    this or another handheld, are counted as duplicates; new codes that do
+    not belong to the store come back in `flagged`.
+    """
+    crud = StockTakeCRUD(db)
+    try:
+        result = crud.scan(stock_take_id, data.codes, scanned_by=data.scanned_by)
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return StockTakeScanResult(**{**result, "counters": _counters(result["counters"])})
+
+
+# ── RECONCILIATION: missing / wrong-store / unexpected items ─────
+@router.get("/{stock_take_id}/report", response_model=StockTakeReport)
+@query_budget(5)
+def get_stock_take_report(stock_take_id: int, db: Session = Depends(get_db)):
+    crud = StockTakeCRUD(db)
+    take = _get_or_404(crud, stock_take_id)
+    try:
+        return StockTakeReport(
+            id=take.id,
+            store_id=take.store_id,
+            status=take.status,
+            counters=_counters(crud.counters(take)),
+            **crud.report(take),
+        )
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+# ── CLOSE: freeze the counters, refuse further scans ─────────────
+@router.post("/{stock_take_id}/close", response_model=ReadStockTake)
+def close_stock_take(stock_take_id: int, db: Session = Depends(get_db)):
+    crud = StockTakeCRUD(db)
+    try:
+        take = crud.close(stock_take_id)
+        return _to_read(take, crud.counters(take))
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
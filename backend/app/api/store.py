@@ -23,6 +23,23 @@ def create_store(data: CreateStore, db: Session = Depends(get_db)):
     return store
 
 
+@router.put("/{store_id}", response_model=ReadStore)
+def update_store(store_id: int, data: CreateStore, db: Session = Depends(get_db)):
+    crud = StoreCRUD(db)
+    try:
+        store = crud.update(
+            id=store_id,
+            name=data.name,
+            type=data.type,
+            client_id=data.client_id
+        )
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return store
+
+
 @router.get("/", response_model=list[ReadStore])
 def list_stores(client_id: int | None = None, db: Session = Depends(get_db)):
     """List stores.
@@ -4,6 +4,7 @@ from sqlmodel import Session
 from schemas.transaction import ReadTransaction, CreateTransaction
 from crud.transaction import TransactionCRUD
 from core.database import get_db
+from core.responses import JSONResponse
 
 
 router = APIRouter(prefix="/api/transactions", tags=["transactions"])
@@ -31,7 +32,7 @@ def create_transaction(data: CreateTransaction, db: Session = Depends(get_db)):
 def get_all_transactions(db: Session = Depends(get_db)):
     crud = TransactionCRUD(db)
     try:
-        return crud.all()
+        return JSONResponse(crud.all())
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
@@ -0,0 +1,6 @@
+"""
+Performance benchmarks. They drive the real FastAPI app in-process against
+the database configured by DATABASE_URL.
+
+Usage: cd backend/app && python -m bench.<module> --help
+"""
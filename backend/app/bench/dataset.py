@@ -0,0 +1,361 @@
+"""
+Synthetic large-shop dataset for the endpoint benchmarks.
+
+Default volumes (--scale 1.0): 1M IMEIs bought in 5k purchases across 200
+stores, the oldest 500k of them sold (500k sales, ~150k distinct customers),
+50k stock requests and 50 users holding every menu permission. Rows are
+bulk-loaded with COPY and generated from a fixed seed, so two runs with the
+same --scale produce the same data.
+
+Every generated row hangs off names starting with "bench-", so the set can
+be dropped again without touching real data.
+
+Usage: cd backend/app && python -m bench.dataset --scale 1.0 [--drop]
+"""
+import argparse
+import csv
+import io
+import random
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+from sqlmodel import Session, select
+
+from core.database import engine
+from core.security import hash_password
+from crud.inventory import REBUILD_SQL
+from models.menu import Menu
+
+PREFIX = "bench-"
+BENCH_PASSWORD = "bench"
+IMEIS_PER_PURCHASE = 200
+
+CATALOG = {
+    "Samsung": ["Galaxy A05", "Galaxy A15", "Galaxy A25", "Galaxy S24"],
+    "Apple": ["iPhone 13", "iPhone 14", "iPhone 15"],
+    "Tecno": ["Spark 20", "Camon 30", "Pova 6"],
+    "Infinix": ["Hot 40", "Note 40", "Smart 8"],
+    "Xiaomi": ["Redmi 13C", "Redmi Note 13"],
+    "itel": ["A70", "P55"],
+}
+MODELS = [(brand, model) for brand, models in CATALOG.items() for model in models]
+STORAGE_SIZES = ["64 GB", "128 GB", "256 GB"]
+STOCK_REQUEST_STATUSES = ["completed"] * 14 + ["pending"] * 3 + ["transferred", "cancelled", "rejected"]
+
+
+def volumes(scale: float) -> dict:
+    return {
+        "stores": max(int(200 * min(scale, 1.0)), 2),
+        "imeis": max(int(1_000_000 * scale), IMEIS_PER_PURCHASE),
+        "sales": int(500_000 * scale),
+        "stock_requests": int(50_000 * scale),
+        "users": max(int(50 * min(scale, 1.0)), 1),
+        "vendors": 20,
+    }
+
+
+def imei_code(n: int) -> str:
+    """Deterministic, Luhn-valid 15-digit IMEI for sequence number n."""
+    body = f"35{n:012d}"
+    total = 0
+    for i, ch in enumerate(reversed(body)):
+        d = int(ch)
+        if i % 2 == 0:
+            d *= 2
+            if d > 9:
+                d -= 9
+        total += d
+    return body + str((10 - total % 10) % 10)
+
+
+def _copy(raw, table: str, columns: list[str], rows, chunk: int = 100_000) -> int:
+    """COPY an iterable of row tuples into `table`, `chunk` rows at a time. None is NULL."""
+    sql = f'COPY "{table}" ({", ".join(columns)}) FROM STDIN WITH (FORMAT csv, NULL \'\\N\')'
+    count = 0
+    with raw.cursor() as cur:
+        while True:
+            buf = io.StringIO()
+            writer = csv.writer(buf)
+            n = 0
+            for row in rows:
+                writer.writerow(["\\N" if value is None else value for value in row])
+                n += 1
+                if n == chunk:
+                    break
+            if not n:
+                break
+            buf.seek(0)
+            cur.copy_expert(sql, buf)
+            count += n
+            if n < chunk:
+                break
+    return count
+
+
+def _ids(conn, sql: str, **params) -> list[int]:
+    return [row[0] for row in conn.execute(text(sql), params)]
+
+
+def _run(conn, statements: list[str]):
+    for sql in statements:
+        result = conn.execute(text(sql))
+        print(f"  {result.rowcount:>9} rows  {sql.split(' WHERE')[0]}")
+
+
+def drop():
+    stores = "(SELECT id FROM store WHERE name LIKE 'bench-%')"
+    purchases = f"(SELECT id FROM purchase WHERE store_id IN {stores})"
+    users = "(SELECT id FROM \"user\" WHERE fullname LIKE 'bench-%')"
+    with engine.begin() as conn:
+        _run(conn, [
+            f"DELETE FROM stock_summary WHERE store_id IN {stores}",
+            f"DELETE FROM inventory_change WHERE store_id IN {stores}",
+            f"DELETE FROM store_inventory_version WHERE store_id IN {stores}",
+            f"DELETE FROM import_job WHERE store_id IN {stores}",
+            f"DELETE FROM stock_take_scan WHERE stock_take_id IN (SELECT id FROM stock_take WHERE store_id IN {stores})",
+            f"DELETE FROM stock_take WHERE store_id IN {stores}",
+            f"DELETE FROM purchaseimeilink WHERE purchase_id IN {purchases}",
+            f"DELETE FROM sale WHERE store_id IN {stores}",
+            f"DELETE FROM stock_request WHERE source_store_id IN {stores}",
+            f"DELETE FROM purchase WHERE id IN {purchases}",
+            "DELETE FROM imei WHERE vendor_id IN (SELECT id FROM vendor WHERE name LIKE 'bench-%')",
+            f"DELETE FROM userpermission WHERE user_id IN {users}",
+            f"DELETE FROM \"user\" WHERE id IN {users}",
+            "DELETE FROM store WHERE name LIKE 'bench-%'",
+            "DELETE FROM vendor WHERE name LIKE 'bench-%'",
+            "DELETE FROM client WHERE name LIKE 'bench-%'",
+        ])
+
+
+def _ensure_menus():
+    with Session(engine) as db:
+        if db.exec(select(Menu)).first() is None:
+            from seed_menus import seed
+            seed()
+
+
+def generate(scale: float, seed: int = 42):
+    rng = random.Random(seed)
+    v = volumes(scale)
+    now = datetime.now().replace(microsecond=0)
+    start = now - timedelta(days=365)
+    _ensure_menus()
+
+    with engine.begin() as conn:
+        if conn.execute(text("SELECT 1 FROM store WHERE name LIKE 'bench-%' LIMIT 1")).first():
+            raise SystemExit("Benchmark data already present; run with --drop first")
+        raw = conn.connection.dbapi_connection
+
+        # ── reference rows ──────────────────────────────────────────
+        client_id = _ids(
+            conn,
+            "INSERT INTO client (name, email, phone, tin, location, is_active, created_at, updated_at) "
+            "VALUES ('bench-client', 'bench@example.com', 'bench-client', 'bench-client', 'Dar es Salaam', "
+            "true, now(), now()) RETURNING id",
+        )[0]
+        vendor_ids = [
+            _ids(
+                conn,
+                "INSERT INTO vendor (name, code, phone, tin, email, is_active, created_at, updated_at) "
+                "VALUES (:name, :name, :name, :name, :email, true, now(), now()) RETURNING id",
+                name=f"{PREFIX}vendor-{i:02d}", email=f"vendor{i}@bench.example.com",
+            )[0]
+            for i in range(v["vendors"])
+        ]
+        stores = []
+        for i in range(v["stores"]):
+            name = f"{PREFIX}store-{i:03d}"
+            store_type = "warehouse" if i == 0 else "shop"
+            store_id = _ids(
+                conn,
+                "INSERT INTO store (name, type, is_active, client_id, created_at, updated_at) "
+                "VALUES (:name, :type, true, :client_id, now(), now()) RETURNING id",
+                name=name, type=store_type, client_id=client_id,
+            )[0]
+            stores.append((store_id, name))
+
+        for type_name in ("Brand", "Model"):
+            conn.execute(text("INSERT INTO categorytype (name) VALUES (:n) ON CONFLICT (name) DO NOTHING"), {"n": type_name})
+        for type_name, names in (("Brand", list(CATALOG)), ("Model", [m for _, m in MODELS])):
+            for name in names:
+                conn.execute(
+                    text(
+                        "INSERT INTO category (name, categorytype_id) "
+                        "SELECT :n, id FROM categorytype WHERE name = :t ON CONFLICT (name) DO NOTHING"
+                    ),
+                    {"n": name, "t": type_name},
+                )
+        category_ids = dict(conn.execute(text("SELECT name, id FROM category")).all())
+
+        password = hash_password(BENCH_PASSWORD)
+        user_ids = [
+            _ids(
+                conn,
+                "INSERT INTO \"user\" (phone, fullname, hashed_password, is_active, role, created_at, updated_at) "
+                "VALUES (:phone, :name, :pw, true, 'user', now(), now()) RETURNING id",
+                phone=f"0799{i:06d}", name=f"{PREFIX}user-{i:02d}", pw=password,
+            )[0]
+            for i in range(v["users"])
+        ]
+        print(f"  reference rows: {len(stores)} stores, {len(vendor_ids)} vendors, {len(user_ids)} users")
+
+        # ── purchases: each one is IMEIS_PER_PURCHASE phones of one model into one store ──
+        n_purchases = v["imeis"] // IMEIS_PER_PURCHASE
+        first_purchase = conn.execute(text("SELECT coalesce(max(id), 0) + 1 FROM purchase")).scalar()
+        purchases = []
+        for p in range(n_purchases):
+            brand, model = MODELS[rng.randrange(len(MODELS))]
+            purchases.append(
+                (
+                    first_purchase + p,
+                    vendor_ids[rng.randrange(len(vendor_ids))],
+                    brand,
+                    model,
+                    stores[p % len(stores)],
+                    STORAGE_SIZES[rng.randrange(len(STORAGE_SIZES))],
+                    start + timedelta(seconds=int(p * 365 * 86400 / n_purchases)),
+                )
+            )
+
+        def purchase_rows():
+            for pid, vendor_id, brand, model, (store_id, _), _, created in purchases:
+                price = IMEIS_PER_PURCHASE * rng.choice((180_000, 250_000, 420_000, 1_900_000))
+                yield (
+                    pid, vendor_id, category_ids[brand], category_ids[model], store_id,
+                    IMEIS_PER_PURCHASE, "completed", price, price, "paid", created, created,
+                )
+
+        n = _copy(
+            raw, "purchase",
+            ["id", "vendor_id", "brand_id", "model_id", "store_id", "quantity", "status",
+             "total_price", "paid_amount", "payment_status", "created_at", "updated_at"],
+            purchase_rows(),
+        )
+        conn.execute(text("SELECT setval(pg_get_serial_sequence('purchase', 'id'), (SELECT max(id) FROM purchase))"))
+        print(f"  {n:>9} purchases")
+
+        # ── IMEIs and their purchase links ──
+        # Ids are assigned here, like the purchase ids, so the links can be copied directly.
+        # The oldest IMEIs are the sold ones; the rest are in the store they were bought into.
+        first_imei = conn.execute(text("SELECT coalesce(max(id), 0) + 1 FROM imei")).scalar()
+
+        def imei_rows():
+            for i in range(v["imeis"]):
+                _, vendor_id, brand, model, (store_id, _), storage, created = purchases[i // IMEIS_PER_PURCHASE]
+                status = "sold" if i < v["sales"] else "in_stock"
+                yield first_imei + i, imei_code(i), vendor_id, brand, model, storage, store_id, status, created, created
+
+        t = time.perf_counter()
+        n = _copy(
+            raw, "imei",
+            ["id", "code", "vendor_id", "brand", "model", "storage_size", "current_store_id", "status", "created_at", "updated_at"],
+            imei_rows(),
+        )
+        conn.execute(text("SELECT setval(pg_get_serial_sequence('imei', 'id'), (SELECT max(id) FROM imei))"))
+        print(f"  {n:>9} imeis ({time.perf_counter() - t:.1f}s)")
+
+        n = _copy(
+            raw, "purchaseimeilink", ["purchase_id", "imei_id"],
+            ((purchases[i // IMEIS_PER_PURCHASE][0], first_imei + i) for i in range(v["imeis"])),
+        )
+        print(f"  {n:>9} purchase links")
+
+        # ── sales ───────────────────────────────────────────────────
+        customers = max(v["sales"] * 3 // 10, 1)
+
+        def sale_rows():
+            for i in range(v["sales"]):
+                _, _, brand, model, (store_id, store_name), storage, bought = purchases[i // IMEIS_PER_PURCHASE]
+                customer = rng.randrange(customers)
+                seller = rng.randrange(len(user_ids))
+                sold = min(bought + timedelta(days=rng.randint(1, 60), minutes=rng.randint(0, 600)), now)
+                yield (
+                    store_id, store_name, imei_code(i), brand, model, storage,
+                    rng.choice((250_000, 320_000, 480_000, 2_300_000)), "",
+                    "cancelled" if rng.random() < 0.01 else "completed",
+                    f"Customer {customer}", f"+2557{customer:08d}", "", "", "", "", "", "",
+                    user_ids[seller], f"{PREFIX}user-{seller:02d}", sold, sold,
+                )
+
+        t = time.perf_counter()
+        n = _copy(
+            raw, "sale",
+            ["store_id", "store_name", "imei_code", "brand", "model", "storage", "amount", "notes", "status",
+             "customer_name", "customer_phone", "customer_secondary_phone", "next_of_kin_name",
+             "next_of_kin_relationship", "next_of_kin_phone", "next_of_kin_secondary_phone", "receipt_path",
+             "seller_id", "seller_name", "created_at", "updated_at"],
+            sale_rows(),
+        )
+        print(f"  {n:>9} sales ({time.perf_counter() - t:.1f}s)")
+
+        # ── stock requests ──────────────────────────────────────────
+        def stock_request_rows():
+            for i in range(v["stock_requests"]):
+                (src_id, src_name), (dst_id, dst_name) = rng.sample(stores, 2)
+                brand, model = MODELS[rng.randrange(len(MODELS))]
+                requested = rng.randint(1, 10)
+                status = rng.choice(STOCK_REQUEST_STATUSES)
+                moved = requested if status in {"completed", "transferred"} else 0
+                created = start + timedelta(seconds=int(i * 365 * 86400 / max(v["stock_requests"], 1)))
+                yield (
+                    src_id, src_name, dst_id, dst_name, brand, model, rng.choice(STORAGE_SIZES),
+                    requested, requested, moved, status, "", "", "", "", created, created,
+                )
+
+        n = _copy(
+            raw, "stock_request",
+            ["source_store_id", "source_store_name", "destination_store_id", "destination_store_name",
+             "brand", "model", "storage", "requested_quantity", "available_stock", "moved_quantity",
+             "status", "notes", "requested_imeis", "transferred_imeis", "received_imeis",
+             "created_at", "updated_at"],
+            stock_request_rows(),
+        )
+        print(f"  {n:>9} stock requests")
+
+        # ── full permission sets for every bench user ───────────────
+        menus = conn.execute(text("SELECT id FROM menu")).scalars().all()
+        subs = conn.execute(text("SELECT id, menu_id, access FROM submenu")).all()
+        with_subs = {menu_id for _, menu_id, _ in subs}
+
+        def permission_rows():
+            for user_id in user_ids:
+                for menu_id in menus:
+                    if menu_id not in with_subs:
+                        yield user_id, menu_id, None, "read", now
+                for sub_id, menu_id, access in subs:
+                    for perm in access.split(","):
+                        yield user_id, menu_id, sub_id, perm.strip(), now
+
+        n = _copy(raw, "userpermission", ["user_id", "menu_id", "submenu_id", "permission", "created_at"], permission_rows())
+        print(f"  {n:>9} user permissions")
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        # COPY bypasses InventoryCRUD; recount the stock summary from the IMEIs.
+        conn.execute(text(REBUILD_SQL))
+        for table in ("imei", "stock_summary", "purchaseimeilink", "purchase", "sale", "stock_request", "userpermission"):
+            conn.execute(text(f"ANALYZE {table}"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=float, default=1.0, help="fraction of the default volumes (default 1.0)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--drop", action="store_true", help="delete existing benchmark rows first")
+    parser.add_argument("--drop-only", action="store_true", help="delete benchmark rows and exit")
+    args = parser.parse_args()
+
+    if args.drop or args.drop_only:
+        print("Dropping benchmark data")
+        drop()
+        if args.drop_only:
+            return
+
+    print(f"Generating benchmark data at scale {args.scale}: {volumes(args.scale)}")
+    t = time.perf_counter()
+    generate(args.scale, args.seed)
+    print(f"Done in {time.perf_counter() - t:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
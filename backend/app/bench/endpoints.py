@@ -0,0 +1,241 @@
+"""
+Latency and throughput of the hot endpoints on the synthetic dataset
+(load it first with `python -m bench.dataset`).
+
+Scenarios:
+  imei_lookup        GET  /api/imeis/code/{code}
+  imei_batch_lookup  POST /api/imeis/lookup of 200 codes of one store (a stock count in one call)
+  sale_create        POST /api/sales/                        (sells a different in-stock IMEI each call)
+  transfer_receive   POST /api/stock-requests/{id}/transfer + /receive of a fresh 3-IMEI request
+  imei_list          GET  /api/imeis/?pageSize=50 followed by its next page
+  customer_list      GET  /api/customers/?page=N
+  purchase_list      GET  /api/purchases/
+  sale_list          GET  /api/sales/?page=N&pageSize=200
+  stock_request_list GET  /api/stock-requests/?page=N&pageSize=200
+  menu_tree          GET  /api/menus/permissions/user/{id}/menu
+
+sale_create and transfer_receive change stock; re-create the dataset
+(`--drop`) before comparing runs that include them.
+
+Usage: cd backend/app && python -m bench.endpoints --requests 500 --concurrency 10 \\
+           [--only imei_lookup,menu_tree] [--out after.json] [--compare before.json]
+"""
+import argparse
+import asyncio
+import json
+import random
+from collections import defaultdict
+
+from sqlalchemy import text
+
+from bench.harness import drive, print_table, write_report
+from core.database import SessionLocal
+from models.stock_request import StockRequest
+
+WARMUP = 20
+
+
+def _bench_stock(limit: int) -> list:
+    """Random in-stock (code, store_id, store_name, brand, model, storage) rows of the bench stores."""
+    with SessionLocal() as db:
+        return db.exec(
+            text(
+                "SELECT i.code, s.id, s.name, i.brand, i.model, coalesce(i.storage_size, '') "
+                "FROM imei i JOIN store s ON s.id = i.current_store_id "
+                "WHERE i.status = 'in_stock' AND s.name LIKE 'bench-%' ORDER BY random() LIMIT :n"
+            ).bindparams(n=limit)
+        ).all()
+
+
+def _require_dataset():
+    with SessionLocal() as db:
+        if not db.exec(text("SELECT 1 FROM store WHERE name LIKE 'bench-%' LIMIT 1")).first():
+            raise SystemExit("No benchmark data; run `python -m bench.dataset` first")
+
+
+# ── scenarios: each returns make_request(client, i) ───────────────
+def imei_lookup(n: int):
+    codes = [row[0] for row in _bench_stock(1000)]
+    return lambda client, i: client.get(f"/api/imeis/code/{codes[i % len(codes)]}")
+
+
+def imei_batch_lookup(n: int):
+    stock = _bench_stock(2000)
+    batches = [stock[i:i + 200] for i in range(0, len(stock), 200)]
+    return lambda client, i: client.post(
+        "/api/imeis/lookup",
+        json={"codes": [row[0] for row in batches[i % len(batches)]], "store_id": batches[i % len(batches)][0][1]},
+    )
+
+
+def sale_create(n: int):
+    stock = iter(_bench_stock(n + WARMUP))
+
+    def make_request(client, i):
+        code, store_id, store_name, brand, model, storage = next(stock)
+        return client.post(
+            "/api/sales/",
+            json={
+                "store_id": store_id,
+                "store_name": store_name,
+                "imei_code": code,
+                "brand": brand,
+                "model": model,
+                "storage": storage,
+                "amount": 320000,
+                "customer_name": f"Bench Customer {i}",
+                "customer_phone": f"+2557{random.randrange(10**8):08d}",
+            },
+        )
+
+    return make_request
+
+
+def transfer_receive(n: int, per_request: int = 3):
+    # Transfers must match the request's brand/model, so batch per store and model.
+    by_store = defaultdict(list)
+    for row in _bench_stock((n + WARMUP) * per_request * 4):
+        by_store[row[1:]].append(row)
+    with SessionLocal() as db:
+        stores = db.exec(text("SELECT id, name FROM store WHERE name LIKE 'bench-%'")).all()
+
+    # One pending request per call, each moving `per_request` IMEIs out of one store.
+    pending = []
+    with SessionLocal() as db:
+        for (store_id, store_name, *_), rows in by_store.items():
+            for k in range(0, len(rows) - per_request + 1, per_request):
+                if len(pending) == n + WARMUP:
+                    break
+                batch = rows[k:k + per_request]
+                dst_id, dst_name = random.choice([s for s in stores if s[0] != store_id])
+                codes = [r[0] for r in batch]
+                sr = StockRequest(
+                    source_store_id=store_id,
+                    source_store_name=store_name,
+                    destination_store_id=dst_id,
+                    destination_store_name=dst_name,
+                    brand=batch[0][3],
+                    model=batch[0][4],
+                    storage=batch[0][5],
+                    requested_quantity=len(codes),
+                    requested_imeis=",".join(codes),
+                )
+                db.add(sr)
+                pending.append((sr, codes))
+        db.commit()
+        pending = [(sr.id, codes) for sr, codes in pending]
+    if len(pending) < n + WARMUP:
+        raise SystemExit(f"Only {len(pending)} transfer batches available for {n + WARMUP} calls")
+    work = iter(pending)
+
+    async def make_request(client, i):
+        request_id, codes = next(work)
+        response = await client.post(
+            f"/api/stock-requests/{request_id}/transfer", json={"transferred_imeis": codes}
+        )
+        if response.status_code >= 400:
+            return response
+        return await client.post(f"/api/stock-requests/{request_id}/receive", json={"received_imeis": codes})
+
+    return make_request
+
+
+def imei_list(n: int):
+    async def make_request(client, i):
+        first = await client.get("/api/imeis/?pageSize=50")
+        cursor = first.json().get("nextCursor") if first.status_code == 200 else None
+        if not cursor:
+            return first
+        return await client.get(f"/api/imeis/?pageSize=50&cursor={cursor}")
+
+    return make_request
+
+
+def customer_list(n: int):
+    return lambda client, i: client.get(f"/api/customers/?page={1 + i % 20}&pageSize=50")
+
+
+def purchase_list(n: int):
+    return lambda client, i: client.get("/api/purchases/")
+
+
+def sale_list(n: int):
+    return lambda client, i: client.get(f"/api/sales/?page={1 + i % 20}&pageSize=200")
+
+
+def stock_request_list(n: int):
+    return lambda client, i: client.get(f"/api/stock-requests/?page={1 + i % 20}&pageSize=200")
+
+
+def menu_tree(n: int):
+    with SessionLocal() as db:
+        user_ids = db.exec(text("SELECT id FROM \"user\" WHERE fullname LIKE 'bench-%'")).scalars().all()
+    return lambda client, i: client.get(f"/api/menus/permissions/user/{user_ids[i % len(user_ids)]}/menu")
+
+
+SCENARIOS = {
+    "imei_lookup": imei_lookup,
+    "imei_batch_lookup": imei_batch_lookup,
+    "sale_create": sale_create,
+    "transfer_receive": transfer_receive,
+    "imei_list": imei_list,
+    "customer_list": customer_list,
+    "purchase_list": purchase_list,
+    "sale_list": sale_list,
+    "stock_request_list": stock_request_list,
+    "menu_tree": menu_tree,
+}
+
+
+async def run(names: list[str], requests: int, concurrency: int) -> dict:
+    from main import app
+
+    results = {}
+    for name in names:
+        make_request = SCENARIOS[name](requests)
+        results[name] = await drive(
+            app, make_request, requests=requests, concurrency=concurrency, warmup=WARMUP
+        )
+    return results
+
+
+def compare(results: dict, baseline_path: str):
+    baseline = json.loads(open(baseline_path).read())["results"]
+    print(f"\nvs {baseline_path}")
+    for name, row in results.items():
+        old = baseline.get(name)
+        if not old:
+            continue
+        deltas = []
+        for key in ("rps", "p50_ms", "p95_ms", "p99_ms"):
+            if old.get(key):
+                deltas.append(f"{key} {(row[key] - old[key]) / old[key] * 100:+.1f}%")
+        print(f"  {name:<20} " + "  ".join(deltas))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500, help="calls per scenario")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--only", help="comma-separated scenarios (default: all)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", help="write the JSON report here")
+    parser.add_argument("--compare", help="JSON report of an earlier run to diff against")
+    args = parser.parse_args()
+
+    names = args.only.split(",") if args.only else list(SCENARIOS)
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    random.seed(args.seed)
+    _require_dataset()
+    results = asyncio.run(run(names, args.requests, args.concurrency))
+    print_table(results)
+    write_report(args.out, "endpoints", results, vars(args))
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
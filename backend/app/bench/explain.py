@@ -0,0 +1,247 @@
+"""
+Query-plan check for the CRUD layer.
+
+Runs every CRUD read path (and the sale / stock-transfer write paths) against
+the seeded benchmark database inside one transaction that is rolled back,
+captures each SELECT it issues, and re-runs it under
+EXPLAIN (ANALYZE, BUFFERS). Flags:
+
+  seq_scan   a sequential scan of a table with at least --min-rows rows
+  estimate   a plan node whose row estimate is off by --blowup× or more
+
+Usage: cd backend/app && python -m bench.explain [--out plans.json] [--fail-on-issues] [--verbose]
+"""
+import argparse
+import sys
+from contextvars import ContextVar
+
+from sqlalchemy import event, text
+from sqlmodel import Session
+
+from bench.harness import write_report
+from core.database import engine
+from core.query_stats import statement_shape
+from crud.category import CategoryCRUD
+from crud.customer import CustomerCRUD
+from crud.imei import ImeiCRUD
+from crud.inventory import InventoryCRUD
+from crud.menu import UserPermissionCRUD
+from crud.purchase import PurchaseCRUD
+from crud.sale import SaleCRUD
+from crud.stock_request import StockRequestCRUD
+from crud.store import StoreCRUD
+
+_label: ContextVar[str] = ContextVar("explain_label", default="")
+
+
+def _sample(db: Session) -> dict:
+    """Realistic arguments taken from the benchmark dataset."""
+    row = db.exec(
+        text(
+            "SELECT i.code, s.id, s.name, i.id, i.brand, i.model, coalesce(i.storage_size, '') "
+            "FROM imei i JOIN store s ON s.id = i.current_store_id "
+            "WHERE i.status = 'in_stock' AND s.name LIKE 'bench-%' ORDER BY s.id, i.id LIMIT 1"
+        )
+    ).first()
+    if row is None:
+        raise SystemExit("No benchmark data; run `python -m bench.dataset` first")
+    code, store_id, store_name, imei_id, brand, model, storage = row
+    other_store = db.exec(
+        text("SELECT id, name FROM store WHERE name LIKE 'bench-%' AND id <> :id LIMIT 1").bindparams(id=store_id)
+    ).first()
+    return {
+        "code": code,
+        "imei_id": imei_id,
+        "store_id": store_id,
+        "store_name": store_name,
+        "other_store": other_store,
+        "brand": brand,
+        "model": model,
+        "storage": storage,
+        "sale_id": db.exec(text("SELECT max(id) FROM sale")).scalar(),
+        "user_id": db.exec(text("SELECT id FROM \"user\" WHERE fullname LIKE 'bench-%' LIMIT 1")).scalar(),
+        "purchase_ids": db.exec(text("SELECT id FROM purchase ORDER BY id DESC LIMIT 50")).scalars().all(),
+    }
+
+
+def _transfer_and_receive(db: Session, s: dict):
+    crud = StockRequestCRUD(db)
+    sr = crud.create(
+        source_store_id=s["store_id"],
+        source_store_name=s["store_name"],
+        destination_store_id=s["other_store"][0],
+        destination_store_name=s["other_store"][1],
+        brand=s["brand"],
+        model=s["model"],
+        storage=s["storage"],
+        requested_quantity=1,
+        requested_imeis=[s["code"]],
+    )
+    crud.execute_transfer(sr.id, transferred_imeis=[s["code"]])
+    crud.execute_receive(sr.id, received_imeis=[s["code"]])
+
+
+def _sell(db: Session, s: dict):
+    SaleCRUD(db).create(
+        store_id=s["other_store"][0],
+        store_name=s["other_store"][1],
+        imei_code=s["code"],
+        brand=s["brand"],
+        model=s["model"],
+        storage=s["storage"],
+        amount=1.0,
+        customer_name="Explain",
+        customer_phone="+255700000000",
+    )
+
+
+# label -> call(db, sample). Write paths run last, in order, on the rolled-back transaction.
+CALLS = {
+    "ImeiCRUD.get_by_code": lambda db, s: ImeiCRUD(db).get_by_code(f" {s['code']} "),
+    "ImeiCRUD.get_by_id": lambda db, s: ImeiCRUD(db).get_by_id(s["imei_id"]),
+    "ImeiCRUD.all_by_store_id": lambda db, s: ImeiCRUD(db).all_by_store_id(s["store_id"]),
+    "ImeiCRUD.page": lambda db, s: ImeiCRUD(db).page(51),
+    "ImeiCRUD.page(store_id)": lambda db, s: ImeiCRUD(db).page(51, store_id=s["store_id"]),
+    "ImeiCRUD.page(brand, model)": lambda db, s: ImeiCRUD(db).page(51, brand=s["brand"], model=s["model"]),
+    "SaleCRUD.all": lambda db, s: SaleCRUD(db).all(),
+    "SaleCRUD.all(status)": lambda db, s: SaleCRUD(db).all(status="cancelled"),
+    "SaleCRUD.all(store_id)": lambda db, s: SaleCRUD(db).all(store_id=s["store_id"]),
+    "SaleCRUD.get_by_id": lambda db, s: SaleCRUD(db).get_by_id(s["sale_id"]),
+    "CustomerCRUD.all": lambda db, s: CustomerCRUD(db).all(),
+    "CustomerCRUD.all(search)": lambda db, s: CustomerCRUD(db).all(search="Customer 1234"),
+    "StockRequestCRUD.all": lambda db, s: StockRequestCRUD(db).all(),
+    "StockRequestCRUD.all(status)": lambda db, s: StockRequestCRUD(db).all(status="pending"),
+    "StockRequestCRUD.get_by_store": lambda db, s: StockRequestCRUD(db).get_by_store(s["store_id"]),
+    "PurchaseCRUD.all": lambda db, s: PurchaseCRUD(db).all(),
+    "PurchaseCRUD.read_details": lambda db, s: PurchaseCRUD(db).read_details(s["purchase_ids"]),
+    "UserPermissionCRUD.get_user_menu": lambda db, s: UserPermissionCRUD(db).get_user_menu(s["user_id"]),
+    "StoreCRUD.all": lambda db, s: StoreCRUD(db).all(),
+    "InventoryCRUD.summary(store_id)": lambda db, s: InventoryCRUD(db).summary(store_id=s["store_id"]),
+    "InventoryCRUD.quantity": lambda db, s: InventoryCRUD(db).quantity(s["store_id"], s["brand"], s["model"], s["storage"]),
+    "InventoryCRUD.locations": lambda db, s: InventoryCRUD(db).locations([s["code"]]),
+    "InventoryCRUD.changes": lambda db, s: InventoryCRUD(db).changes(s["store_id"], 0, 1 << 30, 500),
+    "CategoryCRUD.paginated(search)": lambda db, s: CategoryCRUD(db).paginated(search="Gal"),
+    "StockRequestCRUD.transfer+receive": _transfer_and_receive,
+    "SaleCRUD.create": _sell,
+}
+
+
+def _walk(node: dict, limited: bool = False):
+    """Yields (node, limited); nodes under a Limit stop early, so their row estimates are not comparable."""
+    yield node, limited
+    limited = limited or node["Node Type"] == "Limit"
+    for child in node.get("Plans", []):
+        yield from _walk(child, limited)
+
+
+def analyze_plan(plan: dict, table_rows: dict[str, float], *, min_rows: int, blowup: float) -> list[dict]:
+    issues = []
+    for node, limited in _walk(plan["Plan"]):
+        relation = node.get("Relation Name")
+        if "Seq Scan" in node["Node Type"] and table_rows.get(relation, 0) >= min_rows:
+            issues.append({
+                "kind": "seq_scan",
+                "relation": relation,
+                "table_rows": int(table_rows[relation]),
+                "filter": node.get("Filter"),
+            })
+        estimated = node.get("Plan Rows", 0)
+        actual = node.get("Actual Rows", 0)
+        if not limited and node.get("Actual Loops") and max(estimated, actual) >= min_rows / 10:
+            ratio = max(actual, 1) / max(estimated, 1)
+            if ratio >= blowup or ratio <= 1 / blowup:
+                issues.append({
+                    "kind": "estimate",
+                    "node": node["Node Type"],
+                    "relation": relation,
+                    "estimated_rows": estimated,
+                    "actual_rows": actual,
+                })
+    return issues
+
+
+def capture_and_explain(min_rows: int, blowup: float) -> list[dict]:
+    captured: dict[str, dict] = {}
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if executemany or not statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            return
+        shape = statement_shape(statement)
+        if shape not in captured:
+            captured[shape] = {"label": _label.get(), "statement": statement, "parameters": parameters}
+
+    with engine.connect() as conn:
+        outer = conn.begin()
+        try:
+            # Commits inside CRUD methods only release savepoints; everything is rolled back below.
+            db = Session(bind=conn, join_transaction_mode="create_savepoint")
+            sample = _sample(db)
+            event.listen(engine, "before_cursor_execute", before_cursor_execute)
+            try:
+                for label, call in CALLS.items():
+                    _label.set(label)
+                    call(db, sample)
+            finally:
+                event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+            table_rows = dict(
+                conn.execute(
+                    text("SELECT relname, reltuples FROM pg_class WHERE relkind = 'r' AND relnamespace = 'public'::regnamespace")
+                ).all()
+            )
+            cursor = conn.connection.dbapi_connection.cursor()
+            results = []
+            for entry in captured.values():
+                cursor.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + entry["statement"], entry["parameters"])
+                plan = cursor.fetchone()[0][0]
+                results.append({
+                    "label": entry["label"],
+                    "statement": entry["statement"],
+                    "execution_ms": round(plan["Execution Time"], 3),
+                    "shared_hit": plan["Plan"].get("Shared Hit Blocks", 0),
+                    "shared_read": plan["Plan"].get("Shared Read Blocks", 0),
+                    "issues": analyze_plan(plan, table_rows, min_rows=min_rows, blowup=blowup),
+                    "plan": plan["Plan"],
+                })
+            cursor.close()
+        finally:
+            outer.rollback()
+    return results
+
+
+def _describe(issue: dict) -> str:
+    if issue["kind"] == "seq_scan":
+        return f"seq scan on {issue['relation']} ({issue['table_rows']} rows) filter={issue['filter']}"
+    return (
+        f"estimate {issue['node']} on {issue['relation'] or '-'}: "
+        f"{issue['estimated_rows']} estimated vs {issue['actual_rows']} actual"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--min-rows", type=int, default=10_000, help="tables this large must not be seq-scanned")
+    parser.add_argument("--blowup", type=float, default=10.0, help="flag estimates off by this factor")
+    parser.add_argument("--out", help="write plans and issues as JSON here")
+    parser.add_argument("--fail-on-issues", action="store_true", help="exit 1 when anything is flagged")
+    parser.add_argument("--verbose", action="store_true", help="print each flagged statement")
+    args = parser.parse_args()
+
+    results = capture_and_explain(args.min_rows, args.blowup)
+    flagged = [r for r in results if r["issues"]]
+    for r in sorted(results, key=lambda r: -r["execution_ms"]):
+        mark = "!!" if r["issues"] else "ok"
+        print(f"{mark} {r['execution_ms']:>10.3f} ms  {r['label']}")
+        for issue in r["issues"]:
+            print(f"      {_describe(issue)}")
+        if args.verbose and r["issues"]:
+            print(f"      {statement_shape(r['statement'])[:400]}")
+    print(f"\n{len(results)} statements, {len(flagged)} flagged")
+
+    write_report(args.out, "explain", {"statements": results}, vars(args))
+    if args.fail_on_issues and flagged:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
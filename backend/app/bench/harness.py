@@ -0,0 +1,86 @@
+"""Shared helpers: in-process HTTP driver, latency stats and JSON reports."""
+import asyncio
+import json
+import platform
+import statistics
+import time
+from datetime import datetime
+from pathlib import Path
+
+import httpx
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def summarize(latencies: list[float], wall: float, errors: int = 0) -> dict:
+    """Latencies in seconds -> ms percentiles and throughput."""
+    ordered = sorted(latencies)
+    ms = lambda v: round(v * 1000, 3)  # noqa: E731
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "wall_s": round(wall, 3),
+        "rps": round(len(ordered) / wall, 1) if wall else 0.0,
+        "mean_ms": ms(statistics.fmean(ordered)) if ordered else 0.0,
+        "p50_ms": ms(percentile(ordered, 50)),
+        "p95_ms": ms(percentile(ordered, 95)),
+        "p99_ms": ms(percentile(ordered, 99)),
+    }
+
+
+async def drive(app, make_request, *, requests: int, concurrency: int, warmup: int = 20) -> dict:
+    """
+    Run `requests` calls of `make_request(client, i)` with `concurrency`
+    in-flight callers against `app` over ASGI (no sockets involved).
+    `make_request` returns an httpx.Response.
+    """
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for i in range(warmup):
+            await make_request(client, i)
+
+        latencies: list[float] = []
+        errors = 0
+        counter = iter(range(requests))
+
+        async def worker():
+            nonlocal errors
+            for i in counter:
+                start = time.perf_counter()
+                response = await make_request(client, i)
+                latencies.append(time.perf_counter() - start)
+                if response.status_code >= 400:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        wall = time.perf_counter() - start
+
+    return summarize(latencies, wall, errors)
+
+
+def write_report(path: str | None, name: str, results: dict, params: dict | None = None) -> dict:
+    report = {
+        "benchmark": name,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "params": params or {},
+        "results": results,
+    }
+    if path:
+        Path(path).write_text(json.dumps(report, indent=2, default=str))
+    return report
+
+
+def print_table(results: dict[str, dict], columns=("rps", "p50_ms", "p95_ms", "p99_ms", "errors")):
+    width = max(len(k) for k in results) + 2
+    print("".ljust(width) + "".join(c.rjust(12) for c in columns))
+    for name, row in results.items():
+        print(name.ljust(width) + "".join(str(row.get(c, "")).rjust(12) for c in columns))
@@ -0,0 +1,140 @@
+"""
+Varchar (imei.code) vs integer (imei.id) keys on the IMEI link tables.
+
+Copies the current purchase links, and store links made from the phones
+in stock (the store <-> IMEI link table that preceded imei.current_store_id),
+into a scratch schema twice, once keyed by code and once by id, each
+freshly built and analysed the same way, so both layouts are measured on
+identical data:
+
+  size             table and index sizes per layout
+  store inventory  phones of one store joined to imei (the old store inventory query)
+  purchase detail  phones of one purchase joined to imei (GET /api/purchases/{id})
+  summary join     every store link joined to imei and grouped (stock summary rebuild)
+
+Usage: cd backend/app && python -m bench.link_keys [--calls 200] [--out link_keys.json]
+"""
+import argparse
+import random
+import statistics
+import time
+
+from sqlalchemy import text
+
+from bench.harness import percentile, print_table, write_report
+from core.database import engine
+
+SCHEMA = "bench_link_keys"
+
+LAYOUTS = {
+    "code": ("varchar", "code"),
+    "id": ("integer", "id"),
+}
+
+SETUP = """
+DROP SCHEMA IF EXISTS {schema} CASCADE;
+CREATE SCHEMA {schema};
+"""
+
+BUILD = """
+CREATE TABLE {schema}.store_{layout} (store_id integer NOT NULL, imei_key {type} NOT NULL, PRIMARY KEY (store_id, imei_key));
+INSERT INTO {schema}.store_{layout} SELECT current_store_id, {column} FROM imei WHERE status = 'in_stock' AND current_store_id IS NOT NULL;
+CREATE INDEX ON {schema}.store_{layout} (imei_key);
+CREATE TABLE {schema}.purchase_{layout} (purchase_id integer NOT NULL, imei_key {type} NOT NULL, PRIMARY KEY (purchase_id, imei_key));
+INSERT INTO {schema}.purchase_{layout} SELECT l.purchase_id, i.{column} FROM purchaseimeilink l JOIN imei i ON i.id = l.imei_id;
+VACUUM ANALYZE {schema}.store_{layout};
+VACUUM ANALYZE {schema}.purchase_{layout};
+"""
+
+QUERIES = {
+    "store inventory": (
+        "SELECT i.* FROM {schema}.store_{layout} l JOIN imei i ON i.{column} = l.imei_key WHERE l.store_id = :key",
+        "SELECT store_id FROM stock_summary GROUP BY store_id ORDER BY sum(quantity) DESC LIMIT 20",
+    ),
+    "purchase detail": (
+        "SELECT i.* FROM {schema}.purchase_{layout} l JOIN imei i ON i.{column} = l.imei_key WHERE l.purchase_id = :key",
+        "SELECT DISTINCT purchase_id FROM purchaseimeilink LIMIT 1000",
+    ),
+    "summary join": (
+        "SELECT l.store_id, i.brand, i.model, count(*) FROM {schema}.store_{layout} l "
+        "JOIN imei i ON i.{column} = l.imei_key WHERE :key IS NOT NULL GROUP BY 1, 2, 3",
+        "SELECT 0",
+    ),
+}
+
+
+def sizes(conn) -> dict:
+    results = {}
+    for layout in LAYOUTS:
+        for table in (f"store_{layout}", f"purchase_{layout}"):
+            row = conn.execute(
+                text(
+                    "SELECT pg_relation_size(c.oid), pg_indexes_size(c.oid) FROM pg_class c "
+                    "JOIN pg_namespace n ON n.oid = c.relnamespace WHERE n.nspname = :s AND c.relname = :t"
+                ),
+                {"s": SCHEMA, "t": table},
+            ).one()
+            results[f"size {table}"] = {"table_kb": row[0] // 1024, "indexes_kb": row[1] // 1024}
+    return results
+
+
+def timings(conn, calls: int, seed: int) -> dict:
+    results = {}
+    for name, (sql, keys_sql) in QUERIES.items():
+        keys = [row[0] for row in conn.execute(text(keys_sql))]
+        if not keys:
+            continue
+        picks = random.Random(seed).choices(keys, k=calls if len(keys) > 1 else max(calls // 20, 5))
+        for layout, (_, column) in LAYOUTS.items():
+            stmt = text(sql.format(schema=SCHEMA, layout=layout, column=column))
+            for key in picks[:5]:
+                conn.execute(stmt, {"key": key}).all()
+            latencies = []
+            rows = 0
+            for key in picks:
+                start = time.perf_counter()
+                rows += len(conn.execute(stmt, {"key": key}).all())
+                latencies.append(time.perf_counter() - start)
+            ordered = sorted(latencies)
+            results[f"{name} [{layout}]"] = {
+                "calls": len(picks),
+                "rows_per_call": rows // len(picks),
+                "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+                "p50_ms": round(percentile(ordered, 50) * 1000, 3),
+                "p95_ms": round(percentile(ordered, 95) * 1000, 3),
+            }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200, help="queries per scenario and layout")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--keep", action="store_true", help=f"keep the {SCHEMA} schema afterwards")
+    parser.add_argument("--out", help="write the JSON report here")
+    args = parser.parse_args()
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        if not conn.execute(text("SELECT 1 FROM purchaseimeilink LIMIT 1")).first():
+            raise SystemExit("No stock in the database; run `python -m bench.dataset` first")
+        try:
+            conn.execute(text(SETUP.format(schema=SCHEMA)))
+            for layout, (type_, column) in LAYOUTS.items():
+                # One statement at a time: VACUUM cannot run in a multi-statement string.
+                for sql in BUILD.format(schema=SCHEMA, layout=layout, type=type_, column=column).split(";"):
+                    if sql.strip():
+                        conn.execute(text(sql))
+            size_results = sizes(conn)
+            time_results = timings(conn, args.calls, args.seed)
+        finally:
+            if not args.keep:
+                conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+
+    print_table(size_results, columns=("table_kb", "indexes_kb"))
+    print()
+    print_table(time_results, columns=("calls", "rows_per_call", "mean_ms", "p50_ms", "p95_ms"))
+    write_report(args.out, "link_keys", {**size_results, **time_results}, vars(args))
+
+
+if __name__ == "__main__":
+    main()
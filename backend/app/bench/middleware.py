@@ -0,0 +1,109 @@
+"""
+Requests/sec of the pure-ASGI middleware stack vs the same stack written
+with BaseHTTPMiddleware (what core/middleware.py used to be).
+
+Usage: cd backend/app && python -m bench.middleware --requests 2000 --concurrency 20
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+from sqlmodel import select
+
+from bench.harness import drive, print_table, write_report
+from core.database import SessionLocal
+from models.imei import Imei
+
+
+# ── "before": BaseHTTPMiddleware versions of the same stack ─────────
+class LegacyDBSessionMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        request.state.db = SessionLocal()
+        try:
+            response = await call_next(request)
+        finally:
+            request.state.db.close()
+        return response
+
+
+class LegacyRequestIDMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+        request.state.request_id = request_id
+        response = await call_next(request)
+        response.headers["X-Request-ID"] = request_id
+        return response
+
+
+class LegacyTimingMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        start = time.perf_counter()
+        response = await call_next(request)
+        response.headers.append("Server-Timing", f"app;dur={(time.perf_counter() - start) * 1000:.1f}")
+        return response
+
+
+class LegacyErrorHandlingMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        try:
+            return await call_next(request)
+        except Exception:
+            return JSONResponse({"detail": "Internal server error"}, status_code=500)
+
+
+def build_legacy_app(app: FastAPI) -> FastAPI:
+    legacy = FastAPI()
+    legacy.router.routes.extend(app.router.routes)
+    legacy.add_middleware(LegacyDBSessionMiddleware)
+    legacy.add_middleware(LegacyErrorHandlingMiddleware)
+    legacy.add_middleware(LegacyTimingMiddleware)
+    legacy.add_middleware(LegacyRequestIDMiddleware)
+    return legacy
+
+
+def pick_imei_code() -> str:
+    with SessionLocal() as db:
+        imei = db.exec(select(Imei.code).limit(1)).first()
+    if not imei:
+        raise SystemExit("No IMEI in the database; seed one or pass --code")
+    return imei
+
+
+async def run(requests: int, concurrency: int, code: str) -> dict:
+    from main import app
+
+    apps = {"before (BaseHTTPMiddleware)": build_legacy_app(app), "after (pure ASGI)": app}
+    endpoints = {
+        "/api/stores/": lambda client, i: client.get("/api/stores/"),
+        f"/api/imeis/code/{code}": lambda client, i: client.get(f"/api/imeis/code/{code}"),
+    }
+
+    results = {}
+    for endpoint, make_request in endpoints.items():
+        for label, target in apps.items():
+            results[f"{endpoint} {label}"] = await drive(
+                target, make_request, requests=requests, concurrency=concurrency
+            )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--code", help="IMEI code to look up (default: any IMEI in the DB)")
+    parser.add_argument("--out", help="write the JSON report here")
+    args = parser.parse_args()
+
+    code = args.code or pick_imei_code()
+    results = asyncio.run(run(args.requests, args.concurrency, code))
+    print_table(results)
+    write_report(args.out, "middleware", results, vars(args))
+
+
+if __name__ == "__main__":
+    main()
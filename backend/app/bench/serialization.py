@@ -0,0 +1,118 @@
+"""
+CPU and peak memory of building an IMEI list response, per path:
+
+  orm      Imei objects + selectinload(current_store), ReadImei.model_validate
+           and model_dump per row, json.dumps (what the list endpoints did)
+  columns  READ_COLUMNS rows (the store joined in SQL) shaped into dicts, one
+           ReadImeiList validate_python + dump_json pass (ImeiCRUD.page /
+           all_by_store_id)
+
+Each path is timed in two phases, fetch (query + row/object construction)
+and serialize (rows -> JSON bytes), best of --repeat runs; peak memory is
+measured in a separate tracemalloc run, since tracing slows Python down.
+Both paths are checked to produce the same JSON.
+
+Usage: cd backend/app && python -m bench.serialization [--rows 100000] [--repeat 3] [--out serialization.json]
+"""
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+
+from sqlalchemy.orm import selectinload
+from sqlmodel import select
+
+from bench.harness import print_table, write_report
+from core.database import SessionLocal
+from crud.imei import ImeiCRUD
+from models.imei import Imei
+from schemas.imei import ReadImei, ReadImeiList
+
+
+def fetch_orm(db, rows: int):
+    return db.exec(
+        select(Imei)
+        .order_by(Imei.created_at.desc(), Imei.id.desc())
+        .limit(rows)
+        .options(selectinload(Imei.current_store))
+    ).all()
+
+
+def serialize_orm(imeis) -> bytes:
+    data = [ReadImei.model_validate(i).model_dump(mode="json") for i in imeis]
+    return json.dumps({"data": data, "total": len(data)}).encode()
+
+
+def fetch_columns(db, rows: int):
+    return ImeiCRUD(db).page(rows)
+
+
+def serialize_columns(rows) -> bytes:
+    data = ReadImeiList.dump_json(ReadImeiList.validate_python(rows))
+    return b'{"data":%s,"total":%d}' % (data, len(rows))
+
+
+PATHS = {
+    "orm": (fetch_orm, serialize_orm),
+    "columns": (fetch_columns, serialize_columns),
+}
+
+
+def run(fetch, serialize, rows: int) -> tuple[float, float, bytes]:
+    with SessionLocal() as db:
+        gc.collect()
+        start = time.perf_counter()
+        fetched = fetch(db, rows)
+        fetched_at = time.perf_counter()
+        body = serialize(fetched)
+        done = time.perf_counter()
+    return fetched_at - start, done - fetched_at, body
+
+
+def peak_memory(fetch, serialize, rows: int) -> int:
+    with SessionLocal() as db:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            serialize(fetch(db, rows))
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--out", help="write the JSON report here")
+    args = parser.parse_args()
+
+    results = {}
+    bodies = {}
+    for name, (fetch, serialize) in PATHS.items():
+        runs = [run(fetch, serialize, args.rows) for _ in range(args.repeat)]
+        fetch_s = min(r[0] for r in runs)
+        serialize_s = min(r[1] for r in runs)
+        bodies[name] = runs[-1][2]
+        n = json.loads(bodies[name])["total"]
+        if not n:
+            raise SystemExit("No IMEIs in the database; run `python -m bench.dataset` first")
+        results[name] = {
+            "rows": n,
+            "fetch_ms": round(fetch_s * 1000, 1),
+            "serialize_ms": round(serialize_s * 1000, 1),
+            "us_per_row": round((fetch_s + serialize_s) / n * 1e6, 2),
+            "peak_mb": round(peak_memory(fetch, serialize, args.rows) / 2**20, 1),
+            "body_mb": round(len(bodies[name]) / 2**20, 1),
+        }
+
+    if json.loads(bodies["orm"]) != json.loads(bodies["columns"]):
+        raise SystemExit("The two paths produced different responses")
+
+    print_table(results, columns=("rows", "fetch_ms", "serialize_ms", "us_per_row", "peak_mb", "body_mb"))
+    write_report(args.out, "serialization", results, vars(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Per-call overhead of the hot lookups as plain select() vs the lambda
+statements in crud/statements.py, on the scan workflow (IMEI lookup per
+scanned code; the row carries its store and status), plus asyncpg with and
+without its prepared statement cache.
+
+  build        construct the statement and its cache key, no database
+  scan         the lookup per code against the database (sync, psycopg2)
+  async user   user_by_id on asyncpg, prepared-statement cache off vs on
+
+Usage: cd backend/app && python -m bench.statements --calls 5000 [--out statements.json]
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from bench.harness import print_table, write_report
+from core.database import ASYNC_DATABASE_URL, SessionLocal
+from crud import statements
+from models.imei import Imei
+from models.user import User
+
+
+def _plain_imei(code):
+    return select(Imei).where(Imei.code == code)
+
+
+def _timed(calls: int, fn) -> dict:
+    for i in range(min(calls, 100)):
+        fn(i)
+    start = time.perf_counter()
+    for i in range(calls):
+        fn(i)
+    elapsed = time.perf_counter() - start
+    return {"calls": calls, "us_per_call": round(elapsed / calls * 1e6, 2)}
+
+
+def _sample_codes(limit: int) -> list[str]:
+    with SessionLocal() as db:
+        rows = db.exec(select(Imei.code).where(Imei.status == "in_stock").limit(limit)).all()
+    if not rows:
+        raise SystemExit("No stock in the database; run `python -m bench.dataset` first")
+    return rows
+
+
+def bench_build(calls: int, codes) -> dict:
+    def plain(i):
+        _plain_imei(codes[i % len(codes)])._generate_cache_key()
+
+    def cached(i):
+        statements.imei_by_code(codes[i % len(codes)])._generate_cache_key()
+
+    return {"build plain": _timed(calls, plain), "build lambda": _timed(calls, cached)}
+
+
+def bench_scan(calls: int, codes) -> dict:
+    with SessionLocal() as db:
+        def plain(i):
+            db.exec(_plain_imei(codes[i % len(codes)])).first()
+            db.expunge_all()
+
+        def cached(i):
+            db.scalars(statements.imei_by_code(codes[i % len(codes)])).first()
+            db.expunge_all()
+
+        return {"scan plain": _timed(calls, plain), "scan lambda": _timed(calls, cached)}
+
+
+async def bench_async_user(calls: int) -> dict:
+    results = {}
+    for label, cache_size in (("async user unprepared", 0), ("async user prepared", 100)):
+        url = ASYNC_DATABASE_URL.update_query_dict({"prepared_statement_cache_size": str(cache_size)})
+        engine = create_async_engine(url, pool_size=1)
+        async with AsyncSession(engine) as db:
+            user_id = (await db.exec(select(User.id).limit(1))).first()
+            if user_id is None:
+                raise SystemExit("No users in the database")
+            for _ in range(100):
+                await db.scalars(statements.user_by_id(user_id))
+            start = time.perf_counter()
+            for _ in range(calls):
+                (await db.scalars(statements.user_by_id(user_id))).first()
+                db.expunge_all()
+            elapsed = time.perf_counter() - start
+        await engine.dispose()
+        results[label] = {"calls": calls, "us_per_call": round(elapsed / calls * 1e6, 2)}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=5000)
+    parser.add_argument("--out", help="write the JSON report here")
+    args = parser.parse_args()
+
+    codes = _sample_codes(1000)
+    results = {}
+    results.update(bench_build(args.calls * 4, codes))
+    results.update(bench_scan(args.calls, codes))
+    results.update(asyncio.run(bench_async_user(args.calls)))
+    print_table(results, columns=("calls", "us_per_call"))
+    write_report(args.out, "statements", results, vars(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Runtime settings, read once from the environment.
+Every value has a default that matches the docker-compose dev stack.
+"""
+import os
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in {"1", "true", "yes", "on"}
+
+
+# ── Database ─────────────────────────────────────────────────────
+DATABASE_URL = os.getenv(
+    "DATABASE_URL", "postgresql+psycopg2://postgres:secure_password@db:5432/miliki_db"
+)
+DB_ECHO = _env_bool("DB_ECHO", False)
+
+# ── Connection pool (per engine, per uvicorn worker) ─────────────
+# Total server connections ≈ workers × engines × (pool_size + max_overflow);
+# keep that below Postgres max_connections.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+# True = pessimistic (ping on every checkout), False = optimistic
+# (rely on DB_POOL_RECYCLE and reconnect after a failed statement).
+DB_POOL_PRE_PING = _env_bool("DB_POOL_PRE_PING", True)
+# Server-side statement_timeout in ms, 0 disables it.
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+
+# ── Statement caching ────────────────────────────────────────────
+# SQLAlchemy's compiled-SQL cache, entries per engine.
+DB_COMPILED_CACHE_SIZE = int(os.getenv("DB_COMPILED_CACHE_SIZE", "500"))
+# asyncpg prepared statements kept per connection. Set 0 behind PgBouncer
+# in transaction pooling mode, which cannot keep prepared statements.
+DB_PREPARED_STATEMENT_CACHE_SIZE = int(os.getenv("DB_PREPARED_STATEMENT_CACHE_SIZE", "100"))
+
+# ── Read replicas ────────────────────────────────────────────────
+# Comma-separated DSNs. When set, GET/HEAD requests read from a replica.
+DATABASE_REPLICA_URLS = [
+    url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()
+]
+# After a write, the client reads from the primary for this long (read-your-writes).
+DB_REPLICA_STICKY_SECONDS = int(os.getenv("DB_REPLICA_STICKY_SECONDS", "10"))
+# A replica that refused a connection is skipped for this long.
+DB_REPLICA_RETRY_SECONDS = int(os.getenv("DB_REPLICA_RETRY_SECONDS", "30"))
+DB_REPLICA_CONNECT_TIMEOUT = int(os.getenv("DB_REPLICA_CONNECT_TIMEOUT", "2"))
+
+# ── SQL instrumentation ──────────────────────────────────────────
+# Per-request query count / DB time in Server-Timing and the log.
+SQL_STATS_ENABLED = _env_bool("SQL_STATS_ENABLED", True)
+# The same statement shape this many times in one request is logged as a likely N+1.
+SQL_N_PLUS_ONE_THRESHOLD = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", "5"))
+# Fail requests that exceed their @query_budget (for tests / CI), instead of only logging.
+SQL_STRICT_QUERY_BUDGET = _env_bool("SQL_STRICT_QUERY_BUDGET", False)
+
+# ── Sales ────────────────────────────────────────────────────────
+# Phones sold by one POST /api/sales/batch checkout.
+SALE_BATCH_MAX_ITEMS = int(os.getenv("SALE_BATCH_MAX_ITEMS", "200"))
+
+# ── Stock intake ─────────────────────────────────────────────────
+# Codes accepted by one POST /api/imeis/bulk.
+IMEI_BULK_MAX_CODES = int(os.getenv("IMEI_BULK_MAX_CODES", "10000"))
+# Codes resolved by one POST /api/imeis/lookup, or sent in one stock-take scan batch.
+IMEI_LOOKUP_MAX_CODES = int(os.getenv("IMEI_LOOKUP_MAX_CODES", "5000"))
+# GET /api/imeis/search: shortest term accepted, most results returned.
+IMEI_SEARCH_MIN_CHARS = int(os.getenv("IMEI_SEARCH_MIN_CHARS", "4"))
+IMEI_SEARCH_MAX_RESULTS = int(os.getenv("IMEI_SEARCH_MAX_RESULTS", "50"))
+# Background stock-file imports (POST /api/imports/).
+IMPORT_UPLOAD_DIR = os.getenv("IMPORT_UPLOAD_DIR", "/app/uploads/imports")
+IMPORT_MAX_BYTES = int(os.getenv("IMPORT_MAX_BYTES", str(50 * 1024 * 1024)))
+IMPORT_WORKERS = int(os.getenv("IMPORT_WORKERS", "2"))
+# Rows loaded and committed per step; bounds a worker's memory.
+IMPORT_CHUNK_ROWS = int(os.getenv("IMPORT_CHUNK_ROWS", "2000"))
+# Rejected rows kept on the job for display; the count is always exact.
+IMPORT_MAX_ERRORS = int(os.getenv("IMPORT_MAX_ERRORS", "200"))
+
+# ── Response caching ─────────────────────────────────────────────
+# Memory for store inventory snapshots per worker process, in MB; the
+# latest one of each store is kept (0 disables the cache; ETag / 304
+# handling still applies).
+INVENTORY_SNAPSHOT_CACHE_MB = int(os.getenv("INVENTORY_SNAPSHOT_CACHE_MB", "128"))
+
+# ── Delta sync ───────────────────────────────────────────────────
+# Changes kept in inventory_change by prune_inventory_changes.py; clients
+# further behind get a full snapshot.
+INVENTORY_CHANGES_RETENTION_DAYS = int(os.getenv("INVENTORY_CHANGES_RETENTION_DAYS", "30"))
+# Change rows returned per GET /api/imeis/stores/{id}/changes.
+INVENTORY_CHANGES_PAGE_SIZE = int(os.getenv("INVENTORY_CHANGES_PAGE_SIZE", "5000"))
+
+# ── Logging ──────────────────────────────────────────────────────
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
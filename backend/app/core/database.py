@@ -1,41 +1,129 @@
-from sqlalchemy import text
-from sqlmodel import SQLModel, Session, create_engine
+from fastapi import Request
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import Session, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-# Import all models so SQLModel.metadata.create_all picks them up
+from core import config
+from core.pool import AsyncStatsQueuePool, StatsQueuePool
+from core.replicas import FailoverConnector, wants_replica
+
+# Import models so their mappers are configured before first use
 import models.stock_request  # noqa: F401
 import models.sale  # noqa: F401
 
-DATABASE_URL = "postgresql+psycopg2://postgres:secure_password@db:5432/miliki_db"
+DATABASE_URL = config.DATABASE_URL
 
-engine = create_engine(DATABASE_URL, echo=True, pool_pre_ping=True)
+# Same database, asyncpg driver. Used by `async def` routes so they never
+# block the event loop on a psycopg2 socket.
+ASYNC_DATABASE_URL = make_url(DATABASE_URL).set(drivername="postgresql+asyncpg").update_query_dict(
+    {"prepared_statement_cache_size": str(config.DB_PREPARED_STATEMENT_CACHE_SIZE)}
+)
 
+POOL_OPTIONS = dict(
+    echo=config.DB_ECHO,
+    query_cache_size=config.DB_COMPILED_CACHE_SIZE,
+    pool_size=config.DB_POOL_SIZE,
+    max_overflow=config.DB_MAX_OVERFLOW,
+    pool_timeout=config.DB_POOL_TIMEOUT,
+    pool_recycle=config.DB_POOL_RECYCLE,
+    pool_pre_ping=config.DB_POOL_PRE_PING,
+)
 
-def apply_legacy_migrations():
-    """Best-effort schema updates for dev environments.
 
-    SQLModel's create_all will not ALTER existing tables. This keeps older DBs
-    running when we add new columns.
-    """
+def _connect_args(driver: str, read_only: bool = False) -> dict:
+    settings = {}
+    if config.DB_STATEMENT_TIMEOUT_MS:
+        settings["statement_timeout"] = str(config.DB_STATEMENT_TIMEOUT_MS)
+    if read_only:
+        settings["default_transaction_read_only"] = "on"
+    if not settings:
+        return {}
+    if driver == "asyncpg":
+        return {"server_settings": settings}
+    return {"options": " ".join(f"-c {k}={v}" for k, v in settings.items())}
+
+
+engine = create_engine(
+    DATABASE_URL,
+    poolclass=StatsQueuePool,
+    connect_args=_connect_args("psycopg2"),
+    **POOL_OPTIONS,
+)
 
-    statements = [
-        "ALTER TABLE IF EXISTS imei ADD COLUMN IF NOT EXISTS vendor_id INTEGER",
-        "ALTER TABLE IF EXISTS imei ADD COLUMN IF NOT EXISTS storage_size VARCHAR",
-    ]
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    poolclass=AsyncStatsQueuePool,
+    connect_args=_connect_args("asyncpg"),
+    **POOL_OPTIONS,
+)
+
+# Read engines exist only when replicas are configured. Their pools connect
+# to a replica, or to the primary (read-only) when no replica is reachable.
+read_engine = None
+async_read_engine = None
+if config.DATABASE_REPLICA_URLS:
+    _failover = FailoverConnector(config.DATABASE_REPLICA_URLS, DATABASE_URL)
+    _read_args = _connect_args("psycopg2", read_only=True)
+    _async_read_args = _connect_args("asyncpg", read_only=True)
+    read_engine = create_engine(
+        "postgresql+psycopg2://",
+        creator=lambda: _failover.connect(**_read_args),
+        poolclass=StatsQueuePool,
+        **POOL_OPTIONS,
+    )
+    async_read_engine = create_async_engine(
+        "postgresql+asyncpg://",
+        async_creator=lambda: _failover.connect_async(**_async_read_args),
+        poolclass=AsyncStatsQueuePool,
+        **POOL_OPTIONS,
+    )
 
-    with engine.begin() as conn:
-        for stmt in statements:
-            conn.execute(text(stmt))
 
 def SessionLocal():
     return Session(bind=engine)
 
-def init_db():
-    SQLModel.metadata.create_all(engine)
-    apply_legacy_migrations()
+def AsyncSessionLocal():
+    # expire_on_commit=False: attributes cannot be lazily re-fetched on an
+    # AsyncSession, so objects must stay readable after commit.
+    return AsyncSession(bind=async_engine, expire_on_commit=False)
 
-def get_db():
-    db = SessionLocal()
+def get_request_db(request: Request) -> Session:
+    """
+    The request's Session, created on first use and cached on request.state.db.
+    A Session only checks out a pooled connection on its first query, so
+    requests that never touch the DB cost nothing. Reads go to a replica
+    when one is configured (see core.replicas).
+    """
+    db = getattr(request.state, "db", None)
+    if db is None:
+        if read_engine is not None and wants_replica(request.method, request.cookies):
+            db = Session(bind=read_engine)
+        else:
+            db = SessionLocal()
+        request.state.db = db
+    return db
+
+async def get_request_async_db(request: Request) -> AsyncSession:
+    db = getattr(request.state, "async_db", None)
+    if db is None:
+        if async_read_engine is not None and wants_replica(request.method, request.cookies):
+            db = AsyncSession(bind=async_read_engine, expire_on_commit=False)
+        else:
+            db = AsyncSessionLocal()
+        request.state.async_db = db
+    return db
+
+def get_db(request: Request):
+    db = get_request_db(request)
     try:
         yield db
     finally:
         db.close()
+
+async def get_async_db(request: Request):
+    db = await get_request_async_db(request)
+    try:
+        yield db
+    finally:
+        await db.close()
@@ -0,0 +1,71 @@
+"""
+Canonical form of IMEI and serial codes.
+
+Codes are stored in canonical form and every lookup canonicalises its input
+the same way, so lookups are equality matches on the unique indexes of
+imei.code / imei.secondary_code.
+
+  - whitespace and hyphens are removed and letters upper-cased
+    (" 35-209900-176148-1 " -> "352099001761481", "r58m12abc" -> "R58M12ABC")
+  - a 15-digit code is an IMEI and must carry a valid Luhn check digit
+  - anything else alphanumeric is a serial number
+  - a dual-SIM pair is written "IMEI1/IMEI2" or the two IMEIs run together
+    (30 digits, as printed under one barcode on some boxes)
+
+The migration in migrations/versions/v0004_imei_code_backfill.py applies
+normalize() in SQL; keep the two in step.
+"""
+import re
+
+_SEPARATORS = re.compile(r"[\s\-]+")
+_SERIAL = re.compile(r"[0-9A-Z]+")
+IMEI_LENGTH = 15
+
+
+class InvalidCode(ValueError):
+    pass
+
+
+def normalize(raw: str | None) -> str:
+    """Canonical form for lookups. Never raises; an unknown code simply does not match."""
+    return _SEPARATORS.sub("", raw or "").upper()
+
+
+def luhn_valid(digits: str) -> bool:
+    total = 0
+    for i, ch in enumerate(reversed(digits)):
+        d = int(ch)
+        if i % 2 == 1:
+            d *= 2
+            if d > 9:
+                d -= 9
+        total += d
+    return total % 10 == 0
+
+
+def validate(raw: str | None) -> str:
+    """Canonical form for writes; raises InvalidCode for anything that cannot be an IMEI or serial."""
+    code = normalize(raw)
+    if not code:
+        raise InvalidCode("IMEI code is required")
+    if not _SERIAL.fullmatch(code):
+        raise InvalidCode(f"Invalid IMEI or serial {raw!r}: only letters and digits are allowed")
+    if code.isdigit() and len(code) == IMEI_LENGTH and not luhn_valid(code):
+        raise InvalidCode(f"Invalid IMEI {code}: check digit does not match")
+    return code
+
+
+def parse_pair(raw: str | None) -> tuple[str, str | None]:
+    """(primary, secondary) for a scanned code that may be a dual-SIM pair."""
+    if raw and "/" in raw:
+        first, _, second = raw.partition("/")
+        primary, secondary = validate(first), validate(second)
+    else:
+        code = normalize(raw)
+        if code.isdigit() and len(code) == 2 * IMEI_LENGTH:
+            primary, secondary = validate(code[:IMEI_LENGTH]), validate(code[IMEI_LENGTH:])
+        else:
+            return validate(raw), None
+    if primary == secondary:
+        raise InvalidCode(f"Dual-SIM pair {raw!r} repeats the same IMEI")
+    return primary, secondary
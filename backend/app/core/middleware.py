@@ -1,12 +1,228 @@
-from starlette.middleware.base import BaseHTTPMiddleware
-from fastapi import Request
-from core.database import SessionLocal
+"""
+Pure ASGI middleware.
+
+Each class wraps `send` instead of subclassing BaseHTTPMiddleware, so there is
+no extra task per request and streaming responses pass straight through.
+"""
+import json
+import logging
+import time
+import uuid
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core import config, query_stats
+from core.replicas import READ_METHODS, sticky_cookie
+
+logger = logging.getLogger(__name__)
+sql_logger = logging.getLogger("core.query_stats")
+
+REQUEST_ID_HEADER = "X-Request-ID"
+
+
+def _state(scope: Scope) -> dict:
+    # Backing dict of `request.state`, shared by every Request built from this scope.
+    return scope.setdefault("state", {})
+
+
+class DBSessionMiddleware:
+    """
+    Closes the request-scoped sessions once the response is done.
+    Sessions are created lazily by core.database.get_request_db /
+    get_request_async_db, never here.
+
+    With read replicas configured, a successful write also sets the
+    read-your-writes cookie so the client's next reads hit the primary.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        state = _state(scope)
+        pin_reads = bool(config.DATABASE_REPLICA_URLS) and scope["method"] not in READ_METHODS
+
+        async def send_with_cookie(message: Message):
+            if (
+                message["type"] == "http.response.start"
+                and message["status"] < 400
+                and ("db" in state or "async_db" in state)
+            ):
+                MutableHeaders(scope=message).append("Set-Cookie", sticky_cookie())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_cookie if pin_reads else send)
+        finally:
+            db = state.pop("db", None)
+            if db is not None:
+                db.close()
+            async_db = state.pop("async_db", None)
+            if async_db is not None:
+                await async_db.close()
+
+
+class QueryStatsMiddleware:
+    """
+    Counts the SQL each request runs (see core.query_stats) and reports it as
+    `Server-Timing: db;dur=<ms>;desc="<n> queries"` plus one JSON log line.
+    Repeated statement shapes are logged as likely N+1s, and an endpoint over
+    its @query_budget gets a 500 when SQL_STRICT_QUERY_BUDGET is on.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not config.SQL_STATS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        stats = query_stats.start()
+        status_code = None
+        budget = None
+        replaced = False
+
+        async def send_with_stats(message: Message):
+            nonlocal status_code, budget, replaced
+            if replaced:
+                return
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                # Routing stored the matched endpoint in the (shared) scope.
+                budget = query_stats.budget_for(scope.get("endpoint"))
+                timing = f'db;dur={stats.duration_ms:.1f};desc="{stats.count} queries"'
+                if budget is not None and stats.count > budget and config.SQL_STRICT_QUERY_BUDGET:
+                    replaced = True
+                    status_code = 500
+                    response = JSONResponse(
+                        {
+                            "detail": f"Query budget exceeded: {stats.count} queries, budget {budget}",
+                            "request_id": _state(scope).get("request_id"),
+                        },
+                        status_code=500,
+                        headers={"Server-Timing": timing},
+                    )
+                    await response(scope, receive, send)
+                    return
+                MutableHeaders(scope=message).append("Server-Timing", timing)
+            await send(message)
 
-class DBSessionMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        request.state.db = SessionLocal()
         try:
-            response = await call_next(request)
+            await self.app(scope, receive, send_with_stats)
         finally:
-            request.state.db.close()
-        return response
+            self._log(scope, stats, status_code, budget)
+
+    @staticmethod
+    def _log(scope: Scope, stats: query_stats.QueryStats, status_code, budget):
+        method, path = scope.get("method"), scope.get("path")
+        request_id = _state(scope).get("request_id")
+        sql_logger.info(json.dumps({
+            "event": "sql",
+            "method": method,
+            "path": path,
+            "status": status_code,
+            "request_id": request_id,
+            "queries": stats.count,
+            "db_ms": round(stats.duration_ms, 2),
+            "budget": budget,
+        }))
+        for shape, times in stats.repeated(config.SQL_N_PLUS_ONE_THRESHOLD):
+            sql_logger.warning(
+                "Possible N+1 on %s %s (request_id=%s): %d× %s",
+                method, path, request_id, times, shape[:300],
+            )
+        if budget is not None and stats.count > budget:
+            sql_logger.warning(
+                "Query budget exceeded on %s %s (request_id=%s): %d queries, budget %d",
+                method, path, request_id, stats.count, budget,
+            )
+
+
+class RequestIDMiddleware:
+    """Propagates the caller's X-Request-ID (or a new one) to request.state and the response."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = Headers(scope=scope).get(REQUEST_ID_HEADER) or uuid.uuid4().hex
+        _state(scope)["request_id"] = request_id
+
+        async def send_with_id(message: Message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)[REQUEST_ID_HEADER] = request_id
+            await send(message)
+
+        await self.app(scope, receive, send_with_id)
+
+
+class TimingMiddleware:
+    """Adds `Server-Timing: app;dur=<ms>` measured up to the response headers."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+
+        async def send_with_timing(message: Message):
+            if message["type"] == "http.response.start":
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                MutableHeaders(scope=message).append("Server-Timing", f"app;dur={elapsed_ms:.1f}")
+            await send(message)
+
+        await self.app(scope, receive, send_with_timing)
+
+
+class ErrorHandlingMiddleware:
+    """
+    Turns unhandled exceptions into a JSON 500 carrying the request id,
+    instead of a bare text response from Starlette's ServerErrorMiddleware.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def send_tracking(message: Message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_tracking)
+        except Exception:
+            request_id = _state(scope).get("request_id")
+            logger.exception(
+                "Unhandled error on %s %s (request_id=%s)",
+                scope.get("method"), scope.get("path"), request_id,
+            )
+            if response_started:
+                raise
+            response = JSONResponse(
+                {"detail": "Internal server error", "request_id": request_id},
+                status_code=500,
+            )
+            await response(scope, receive, send_tracking)
@@ -0,0 +1,23 @@
+"""
+Opaque cursors for keyset pagination on (created_at, id).
+
+A cursor is the sort key of the last row of a page; the next page starts
+strictly after it, so paging cost does not grow with depth the way
+OFFSET does, and rows inserted meanwhile do not shift later pages.
+"""
+import base64
+from datetime import datetime
+
+
+def encode_cursor(created_at: datetime, id: int) -> str:
+    raw = f"{created_at.isoformat()}|{id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, id = raw.split("|")
+        return datetime.fromisoformat(created_at), int(id)
+    except ValueError:
+        raise ValueError("Invalid cursor")
@@ -0,0 +1,96 @@
+"""
+Connection pools that keep live checkout statistics.
+
+SQLAlchemy only exposes point-in-time counters (checkedout / overflow).
+These subclasses also track how many callers are waiting for a connection
+and how long checkouts take, so pool sizing can be based on numbers.
+Stats are per process, i.e. per uvicorn worker.
+"""
+import os
+import threading
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class PoolStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.waiters = 0
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def wait_started(self):
+        with self._lock:
+            self.waiters += 1
+
+    def wait_finished(self, elapsed: float, timed_out: bool = False):
+        with self._lock:
+            self.waiters -= 1
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.wait_total += elapsed
+            self.wait_max = max(self.wait_max, elapsed)
+
+
+class _StatsPoolMixin:
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def _do_get(self):
+        self.stats.wait_started()
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            self.stats.wait_finished(time.perf_counter() - start, timed_out=True)
+            raise
+        except BaseException:
+            self.stats.wait_finished(time.perf_counter() - start)
+            raise
+        self.stats.wait_finished(time.perf_counter() - start)
+        return conn
+
+
+class StatsQueuePool(_StatsPoolMixin, QueuePool):
+    pass
+
+
+class AsyncStatsQueuePool(_StatsPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_snapshot(pool) -> dict:
+    """Current counters for one pool, safe to serialize as JSON."""
+    stats: PoolStats | None = getattr(pool, "stats", None)
+    snapshot = {
+        "pid": os.getpid(),
+        "pool_class": type(pool).__name__,
+        "size": pool.size(),
+        "max_overflow": pool._max_overflow,
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        # QueuePool counts overflow from -pool_size; only report connections
+        # actually opened beyond pool_size.
+        "overflow": max(pool.overflow(), 0),
+        "timeout_s": pool.timeout(),
+    }
+    if stats is not None:
+        avg = stats.wait_total / stats.checkouts if stats.checkouts else 0.0
+        snapshot.update(
+            {
+                "waiters": stats.waiters,
+                "checkouts": stats.checkouts,
+                "checkout_timeouts": stats.timeouts,
+                "checkout_wait_ms_avg": round(avg * 1000, 3),
+                "checkout_wait_ms_max": round(stats.wait_max * 1000, 3),
+                "checkout_wait_ms_total": round(stats.wait_total * 1000, 3),
+            }
+        )
+    return snapshot
@@ -0,0 +1,96 @@
+"""
+Per-request SQL statistics.
+
+Engine-wide event hooks count every statement executed on any engine
+(sync, async, primary or replica) into the QueryStats of the current
+request, held in a ContextVar. The ContextVar follows the request into
+threadpool routes and into SQLAlchemy's asyncio greenlets, so one object
+collects everything a request did. QueryStatsMiddleware reports it.
+"""
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_current: ContextVar["QueryStats | None"] = ContextVar("query_stats", default=None)
+
+# `IN (%(id_1)s, %(id_2)s, ...)` expands to a different length per call;
+# collapse it so one query shape stays one shape.
+_IN_LIST = re.compile(r"\bIN\s*\((?:[^()]|\([^()]*\))*\)", re.IGNORECASE)
+_SPACES = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    return _SPACES.sub(" ", _IN_LIST.sub("IN (...)", statement)).strip()
+
+
+class QueryStats:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes: Counter[str] = Counter()
+
+    def record(self, statement: str, elapsed: float):
+        self.count += 1
+        self.duration += elapsed
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Statement shapes run at least `threshold` times, i.e. likely N+1 loops."""
+        return [(shape, n) for shape, n in self.shapes.most_common() if n >= threshold]
+
+    @property
+    def duration_ms(self) -> float:
+        return self.duration * 1000
+
+
+def start() -> QueryStats:
+    stats = QueryStats()
+    _current.set(stats)
+    return stats
+
+
+def current() -> QueryStats | None:
+    return _current.get()
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def query_budget(limit: int):
+    """
+    Declares the most queries an endpoint may run per request:
+
+        @router.get("/")
+        @query_budget(3)
+        def get_all_purchases(...): ...
+
+    Over budget is logged, and fails the request when SQL_STRICT_QUERY_BUDGET is on.
+    """
+    def decorator(func):
+        func.__query_budget__ = limit
+        return func
+    return decorator
+
+
+def budget_for(endpoint) -> int | None:
+    return getattr(endpoint, "__query_budget__", None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _current.get() is not None:
+        # Kept on the execution context so a failed statement leaves nothing behind.
+        context._query_stats_start = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    started = getattr(context, "_query_stats_start", None)
+    if stats is not None and started is not None:
+        stats.record(statement, time.perf_counter() - started)
@@ -0,0 +1,87 @@
+"""
+Read-replica routing.
+
+GET/HEAD requests get a session on the read engine. Its pool opens
+connections on the replicas in rotation and falls back to the primary when
+none is reachable, so a dead replica costs one failed connect per
+DB_REPLICA_RETRY_SECONDS instead of failed requests.
+
+After a write the client gets a short-lived cookie that pins its reads to
+the primary, so it always sees its own writes despite replication lag.
+"""
+import itertools
+import logging
+import threading
+import time
+
+import asyncpg
+import psycopg2
+from sqlalchemy.engine import make_url
+
+from core import config
+
+logger = logging.getLogger(__name__)
+
+STICKY_COOKIE = "db_primary_until"
+READ_METHODS = {"GET", "HEAD"}
+
+
+def libpq_dsn(url: str) -> str:
+    """SQLAlchemy URL -> plain postgresql:// DSN understood by psycopg2 and asyncpg."""
+    return make_url(url).set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+class FailoverConnector:
+    """Picks the DSN for each new pooled connection: healthy replicas first, then the primary."""
+
+    def __init__(self, replica_urls: list[str], primary_url: str):
+        self.replicas = [libpq_dsn(u) for u in replica_urls]
+        self.primary = libpq_dsn(primary_url)
+        self._rotation = itertools.cycle(range(len(self.replicas)))
+        self._down_until: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def candidates(self) -> list[str]:
+        now = time.monotonic()
+        with self._lock:
+            start = next(self._rotation)
+        ordered = self.replicas[start:] + self.replicas[:start]
+        return [dsn for dsn in ordered if self._down_until.get(dsn, 0) <= now]
+
+    def mark_down(self, dsn: str, error: Exception):
+        logger.warning("Read replica unavailable, using fallback for %ss: %s", config.DB_REPLICA_RETRY_SECONDS, error)
+        self._down_until[dsn] = time.monotonic() + config.DB_REPLICA_RETRY_SECONDS
+
+    def connect(self, **kwargs):
+        for dsn in self.candidates():
+            try:
+                return psycopg2.connect(dsn, connect_timeout=config.DB_REPLICA_CONNECT_TIMEOUT, **kwargs)
+            except psycopg2.OperationalError as e:
+                self.mark_down(dsn, e)
+        return psycopg2.connect(self.primary, **kwargs)
+
+    async def connect_async(self, **kwargs):
+        for dsn in self.candidates():
+            try:
+                return await asyncpg.connect(dsn, timeout=config.DB_REPLICA_CONNECT_TIMEOUT, **kwargs)
+            except (OSError, asyncpg.PostgresError, TimeoutError) as e:
+                self.mark_down(dsn, e)
+        return await asyncpg.connect(self.primary, **kwargs)
+
+
+def wants_replica(method: str, cookies: dict) -> bool:
+    if method not in READ_METHODS:
+        return False
+    try:
+        pinned_until = float(cookies.get(STICKY_COOKIE, 0))
+    except ValueError:
+        pinned_until = 0
+    return pinned_until <= time.time()
+
+
+def sticky_cookie() -> str:
+    until = time.time() + config.DB_REPLICA_STICKY_SECONDS
+    return (
+        f"{STICKY_COOKIE}={until:.0f}; Max-Age={config.DB_REPLICA_STICKY_SECONDS}; "
+        "Path=/; HttpOnly; SameSite=Lax"
+    )
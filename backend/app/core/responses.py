@@ -0,0 +1,23 @@
+"""
+The app's JSON response class (FastAPI default_response_class in main.py).
+
+orjson writes the body; whatever it cannot encode natively (pydantic and
+SQLModel objects, Decimal, sets) is handed to pydantic's serializer. Dates
+and datetimes come out as isoformat() did before, UUIDs (Transaction.code)
+as their canonical string.
+
+FastAPI still turns a route's return value into plain data first
+(jsonable_encoder, or the response_model's serializer) and only then
+renders it. List endpoints skip that pass by returning the response
+themselves:
+
+    return JSONResponse({"data": [ReadSale(...), ...], "total": n})
+"""
+import orjson
+from fastapi.responses import ORJSONResponse
+from pydantic_core import to_jsonable_python
+
+
+class JSONResponse(ORJSONResponse):
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, default=to_jsonable_python, option=orjson.OPT_NON_STR_KEYS)
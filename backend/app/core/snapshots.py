@@ -0,0 +1,59 @@
+"""
+In-process LRU cache of serialized responses, one per key, tagged with
+the version of the data it was built from (e.g. a store's inventory
+version).
+
+Only the latest version of each key is kept: a request that finds an
+older one rebuilds and replaces it, so stale bodies never pile up. The
+cache is bounded by the total size of the bodies, least recently used
+first out. Each worker process has its own cache; the versions live in
+the database, so all workers agree on them.
+"""
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+from core import config
+
+
+class SnapshotCache:
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[Hashable, tuple[int, bytes]] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(self, key: Hashable, version: int, build: Callable[[], bytes]) -> bytes:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        # Built outside the lock; two concurrent misses both build, which is harmless.
+        body = build()
+        with self._lock:
+            entry = self._entries.get(key)
+            # A slower request may finish building an older version last.
+            if entry is not None and entry[0] > version:
+                return body
+            if entry is not None:
+                self._size -= len(self._entries.pop(key)[1])
+            if len(body) <= self.max_bytes:
+                self._entries[key] = (version, body)
+                self._size += len(body)
+                while self._size > self.max_bytes:
+                    self._size -= len(self._entries.popitem(last=False)[1][1])
+        return body
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+# GET /api/imeis/stores/{id} bodies, by store_id at its inventory version.
+store_inventory = SnapshotCache(config.INVENTORY_SNAPSHOT_CACHE_MB * 1024 * 1024)
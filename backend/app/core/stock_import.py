@@ -0,0 +1,269 @@
+"""
+Background import of stock files (CSV or XLSX lists of IMEIs).
+
+The route streams the upload to IMPORT_UPLOAD_DIR, records an ImportJob and
+hands its id to a small thread pool, so the request returns at once. The
+worker reads the file row by row, checks brand and model against the Brand
+and Model categories and loads IMPORT_CHUNK_ROWS rows at a time through
+ImeiCRUD.bulk_upsert, committing the job's counters after every chunk.
+Memory is bounded by the chunk, not by the file.
+
+Columns are found by their header, case-insensitively:
+  code (imei, serial)             required
+  brand, model                    required unless given with the upload
+  storage (storage_size, capacity) optional
+
+Jobs run in the process that accepted the upload, holding an advisory
+lock on the job id for as long as they run. At startup recover() resubmits
+the jobs still queued and fails the "running" ones whose lock nobody holds
+(their process was restarted mid-import); such a file can simply be
+uploaded again, rows already loaded come back as updated. The upload is
+deleted once its job has finished either way.
+"""
+import csv
+import logging
+import os
+import threading
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import BinaryIO, Iterator
+
+from sqlalchemy import text
+
+from core import config
+from core.database import SessionLocal, engine
+from crud.category import CategoryCRUD
+from crud.imei import ImeiCRUD
+from crud.import_job import ImportJobCRUD
+from models.import_job import ImportJob
+
+logger = logging.getLogger(__name__)
+
+HEADERS = {
+    "code": ("code", "imei", "imei1", "serial", "serial number"),
+    "brand": ("brand",),
+    "model": ("model",),
+    "storage_size": ("storage", "storage_size", "storage size", "capacity"),
+}
+
+# Arbitrary, fixed first key of the per-job pg_advisory_lock(key, job_id).
+JOB_LOCK_KEY = 7_240_002
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+# ── readers: path -> rows of strings, header first ───────────────
+def _read_csv(path: str) -> Iterator[list[str]]:
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        yield from csv.reader(f)
+
+
+def _cell(value) -> str:
+    if value is None:
+        return ""
+    # Excel stores long digit strings typed as numbers as floats.
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _read_xlsx(path: str) -> Iterator[list[str]]:
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ValueError("XLSX import needs the openpyxl package")
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        for row in workbook.active.iter_rows(values_only=True):
+            yield [_cell(v) for v in row]
+    finally:
+        workbook.close()
+
+
+READERS = {".csv": _read_csv, ".xlsx": _read_xlsx}
+
+
+def save_upload(src: BinaryIO, ext: str) -> str:
+    """Copies an upload to IMPORT_UPLOAD_DIR in 1 MB blocks; returns its path."""
+    os.makedirs(config.IMPORT_UPLOAD_DIR, exist_ok=True)
+    path = os.path.join(config.IMPORT_UPLOAD_DIR, f"{uuid.uuid4().hex}{ext}")
+    size = 0
+    try:
+        with open(path, "wb") as dst:
+            while block := src.read(1024 * 1024):
+                size += len(block)
+                if size > config.IMPORT_MAX_BYTES:
+                    raise ValueError(f"File is larger than {config.IMPORT_MAX_BYTES // (1024 * 1024)} MB")
+                dst.write(block)
+    except Exception:
+        os.remove(path)
+        raise
+    return path
+
+
+# ── worker ───────────────────────────────────────────────────────
+def submit(job_id: int):
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=config.IMPORT_WORKERS, thread_name_prefix="stock-import")
+    _executor.submit(run, job_id)
+
+
+def _remove_upload(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _try_lock(lock_conn, job_id: int) -> bool:
+    return lock_conn.execute(
+        text("SELECT pg_try_advisory_lock(:k, :id)"), {"k": JOB_LOCK_KEY, "id": job_id}
+    ).scalar()
+
+
+def run(job_id: int):
+    # The lock is held on its own connection until the job is finished, so
+    # recover() in any worker can tell a running job from an orphaned one,
+    # and a job submitted twice runs once.
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as lock_conn:
+        if not _try_lock(lock_conn, job_id):
+            return
+        try:
+            _run(job_id)
+        finally:
+            lock_conn.execute(text("SELECT pg_advisory_unlock(:k, :id)"), {"k": JOB_LOCK_KEY, "id": job_id})
+
+
+def _run(job_id: int):
+    with SessionLocal() as db:
+        jobs = ImportJobCRUD(db)
+        job = jobs.get_by_id(job_id)
+        if not job or job.status != "queued":
+            return
+        jobs.start(job)
+        try:
+            _load(db, jobs, job)
+        except ValueError as e:
+            # A bad file, not a bug: no traceback.
+            db.rollback()
+            logger.warning("Import job %s failed: %s", job_id, e)
+            jobs.finish(job, failed=str(e))
+        except Exception as e:
+            db.rollback()
+            logger.exception("Import job %s failed", job_id)
+            jobs.finish(job, failed=str(e))
+        else:
+            jobs.finish(job)
+        _remove_upload(job.path)
+
+
+def recover():
+    """
+    Picks up the jobs a restart left behind: queued ones are submitted
+    again, running ones that no live worker holds the lock of are failed.
+    Called once per worker at startup.
+    """
+    with SessionLocal() as db:
+        jobs = ImportJobCRUD(db)
+        pending = jobs.unfinished()
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as lock_conn:
+            for job in pending:
+                if job.status == "queued":
+                    submit(job.id)
+                elif _try_lock(lock_conn, job.id):
+                    try:
+                        db.refresh(job)
+                        if job.status == "running":
+                            logger.warning("Import job %s was interrupted by a restart", job.id)
+                            jobs.finish(job, failed="Interrupted by a server restart; upload the file again")
+                            _remove_upload(job.path)
+                    finally:
+                        lock_conn.execute(
+                            text("SELECT pg_advisory_unlock(:k, :id)"), {"k": JOB_LOCK_KEY, "id": job.id}
+                        )
+
+
+def _columns(header: list[str]) -> dict[str, int]:
+    names = [h.strip().lower() for h in header]
+    columns = {}
+    for field, aliases in HEADERS.items():
+        for alias in aliases:
+            if alias in names:
+                columns[field] = names.index(alias)
+                break
+    if "code" not in columns:
+        raise ValueError(f"No IMEI column; expected one of: {', '.join(HEADERS['code'])}")
+    return columns
+
+
+def _load(db, jobs: ImportJobCRUD, job: ImportJob):
+    ext = os.path.splitext(job.path)[1].lower()
+    rows = READERS[ext](job.path)
+    header = next(rows, None)
+    if header is None:
+        raise ValueError("The file is empty")
+    columns = _columns(header)
+
+    categories = CategoryCRUD(db)
+    brands = {name.lower(): name for name in categories.names_by_type("Brand")}
+    models = {name.lower(): name for name in categories.names_by_type("Model")}
+
+    def value(row: list[str], field: str) -> str:
+        i = columns.get(field)
+        return row[i].strip() if i is not None and i < len(row) else ""
+
+    line = 1
+    while chunk := list(islice(rows, config.IMPORT_CHUNK_ROWS)):
+        # (brand, model, storage) -> [(line, code)]; bulk_upsert shares them per call.
+        groups = defaultdict(list)
+        errors = []
+        processed = 0
+        for row in chunk:
+            line += 1
+            code = value(row, "code")
+            if not code and not any(c.strip() for c in row):
+                continue
+            processed += 1
+            brand = value(row, "brand") or job.brand
+            model = value(row, "model") or job.model
+            if brand.lower() not in brands:
+                errors.append(f"row {line}: {code}: unknown brand {brand!r}")
+                continue
+            if model.lower() not in models:
+                errors.append(f"row {line}: {code}: unknown model {model!r}")
+                continue
+            storage = value(row, "storage_size") or job.storage_size
+            groups[(brands[brand.lower()], models[model.lower()], storage)].append((line, code))
+
+        created = updated = 0
+        for (brand, model, storage), items in groups.items():
+            results = ImeiCRUD(db).bulk_upsert(
+                [code for _, code in items],
+                brand=brand,
+                model=model,
+                store_id=job.store_id,
+                vendor_id=job.vendor_id,
+                storage_size=storage,
+            )
+            for (row_line, _), result in zip(items, results):
+                if result["status"] == "created":
+                    created += 1
+                elif result["status"] == "updated":
+                    updated += 1
+                else:
+                    errors.append(f"row {row_line}: {result['code']}: {result['detail']}")
+
+        jobs.record_chunk(
+            job,
+            processed=processed,
+            created=created,
+            updated=updated,
+            errors=errors,
+            max_errors=config.IMPORT_MAX_ERRORS,
+        )
@@ -1,4 +1,5 @@
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from models.blacklist import BlackListedToken
 
@@ -20,3 +21,22 @@ class BlackListCRUD:
             select(BlackListedToken).where(BlackListedToken.token == token)
         ).first()
         return result is not None
+
+
+class AsyncBlackListCRUD:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def add(self, token: str):
+        blacklist = BlackListedToken(token=token)
+        self.db.add(blacklist)
+        await self.db.commit()
+        await self.db.refresh(blacklist)
+        return blacklist
+
+    async def is_blacklisted(self, token: str) -> bool:
+        result = (await self.db.exec(
+            select(BlackListedToken).where(BlackListedToken.token == token)
+        )).first()
+        return result is not None
+
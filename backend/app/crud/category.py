@@ -21,6 +21,14 @@ class CategoryCRUD:
 
     def all(self):
         return self.db.exec(select(Category)).all()
+
+    def names_by_type(self, category_type_name: str) -> list[str]:
+        """Names of every category of one type, e.g. all "Brand" names."""
+        return self.db.exec(
+            select(Category.name)
+            .join(CategoryType, Category.categorytype_id == CategoryType.id)
+            .where(func.lower(CategoryType.name) == category_type_name.lower())
+        ).all()
     
     def update(self, id: int, name: str, categorytype_id: int):
         category = self.get_by_id(id)
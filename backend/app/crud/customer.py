@@ -19,33 +19,24 @@ class CustomerCRUD:
         Return deduplicated customers grouped by customer_phone.
         Each row contains the latest name/kin info and aggregated totals.
         """
-        # Sub-query: latest sale id per phone (to grab name / kin info)
-        latest_sub = (
-            select(
-                Sale.customer_phone,
-                func.max(Sale.id).label("latest_id"),
-            )
-            .where(Sale.status == "completed", Sale.customer_phone != "")
-            .group_by(Sale.customer_phone)
-            .subquery()
-        )
+        completed = (Sale.status == "completed", Sale.customer_phone != "")
 
-        # Aggregated totals per phone
-        agg_sub = (
+        # One pass over completed sales (index-only on ix_sale_completed_customer):
+        # latest sale id per phone, to grab name / kin info, plus the totals.
+        agg = (
             select(
                 Sale.customer_phone,
+                func.max(Sale.id).label("latest_id"),
                 func.count(Sale.id).label("total_purchases"),
                 func.sum(Sale.amount).label("total_amount"),
                 func.max(Sale.created_at).label("last_purchase"),
             )
-            .where(Sale.status == "completed", Sale.customer_phone != "")
+            .where(*completed)
             .group_by(Sale.customer_phone)
-            .subquery()
         )
 
-        # Join latest sale row + aggregates
-        query = (
-            select(
+        def with_latest_sale(agg_sub):
+            return select(
                 Sale.customer_name,
                 Sale.customer_phone,
                 Sale.customer_secondary_phone,
@@ -55,29 +46,36 @@ class CustomerCRUD:
                 agg_sub.c.total_purchases,
                 agg_sub.c.total_amount,
                 agg_sub.c.last_purchase,
-            )
-            .join(latest_sub, Sale.id == latest_sub.c.latest_id)
-            .join(agg_sub, Sale.customer_phone == agg_sub.c.customer_phone)
-        )
+            ).join(agg_sub, Sale.id == agg_sub.c.latest_id)
 
-        # Optional search filter
         if search:
+            # The filter applies to the latest sale row, so join first, then paginate.
+            agg_sub = agg.subquery()
             pattern = f"%{search}%"
-            query = query.where(
+            query = with_latest_sale(agg_sub).where(
                 col(Sale.customer_name).ilike(pattern)
                 | col(Sale.customer_phone).ilike(pattern)
             )
-
-        # Count (before pagination)
-        count_q = select(func.count()).select_from(query.subquery())
-        total = self.db.exec(count_q).one()
-
-        # Paginate
-        rows = self.db.exec(
-            query.order_by(agg_sub.c.last_purchase.desc())
-            .offset((page - 1) * page_size)
-            .limit(page_size)
-        ).all()
+            total = self.db.exec(select(func.count()).select_from(query.subquery())).one()
+            rows = self.db.exec(
+                query.order_by(agg_sub.c.last_purchase.desc())
+                .offset((page - 1) * page_size)
+                .limit(page_size)
+            ).all()
+        else:
+            # Paginate the aggregate, then fetch name / kin info for this page only.
+            total = self.db.exec(
+                select(func.count(func.distinct(Sale.customer_phone))).where(*completed)
+            ).one()
+            page_sub = (
+                agg.order_by(func.max(Sale.created_at).desc())
+                .offset((page - 1) * page_size)
+                .limit(page_size)
+                .subquery()
+            )
+            rows = self.db.exec(
+                with_latest_sale(page_sub).order_by(page_sub.c.last_purchase.desc())
+            ).all()
 
         customers = [
             {
@@ -1,68 +1,373 @@
+from datetime import datetime
+
+from sqlalchemy import String, any_, bindparam, func, literal_column, or_, text, tuple_
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
 from sqlalchemy.orm import selectinload
-from sqlmodel import Session, func, select
-from models.imei import Imei
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from core import config, imei_codes
+from crud.inventory import InventoryCRUD
+from models.imei import IN_STOCK, Imei
 from models.store import Store
-from models.links import StoreImeiLink
 
 
+def _code_matches(code: str):
+    """Either IMEI of the phone, as an equality on the unique code indexes."""
+    clean = imei_codes.normalize(code)
+    return or_(Imei.code == clean, Imei.secondary_code == clean)
+
+
+def codes_match(codes: list[str]):
+    """
+    Either IMEI of each phone, as `= ANY(:codes)` on the unique code
+    indexes. One array parameter, so the statement (and asyncpg's prepared
+    statement) is the same however many codes are sent; IN would render one
+    placeholder per code.
+    """
+    codes = bindparam("codes", codes, type_=ARRAY(String))
+    return or_(Imei.code == any_(codes), Imei.secondary_code == any_(codes))
+
+
+# ReadImei's fields as plain columns, plus the current store's name and
+# client, for list endpoints that validate rows in one pass
+# (schemas.imei.ReadImeiList) instead of loading ORM objects.
+READ_COLUMNS = (
+    Imei.id,
+    Imei.code,
+    Imei.secondary_code,
+    Imei.vendor_id,
+    Imei.brand,
+    Imei.model,
+    Imei.storage_size,
+    Imei.current_store_id,
+    Imei.status,
+    Imei.created_at,
+    Imei.updated_at,
+    Store.name,
+    Store.client_id,
+)
+_READ_FIELDS = tuple(column.key for column in READ_COLUMNS[:-2])
+
+
+def _select_read_columns():
+    return select(*READ_COLUMNS).select_from(Imei).outerjoin(Store, Store.id == Imei.current_store_id)
+
+
+def _read_dicts(rows) -> list[dict]:
+    """READ_COLUMNS rows as ReadImei-shaped dicts; `stores` as Imei.stores gives it."""
+    items = []
+    for row in rows:
+        item = dict(zip(_READ_FIELDS, row))
+        store_name, client_id = row[-2:]
+        in_stock = item["status"] == IN_STOCK and store_name is not None
+        item["stores"] = [{"id": item["current_store_id"], "name": store_name, "client_id": client_id}] if in_stock else []
+        items.append(item)
+    return items
+
+
+# Whether ix_imei_code_trgm exists (migration 0014 skips it without pg_trgm);
+# checked on the first search of the process.
+_substring_indexed: bool | None = None
+
 
 class ImeiCRUD:
     def __init__(self, db: Session):
         self.db = db
 
     def get_by_id(self, id: int):
-        stmt = select(Imei).where(Imei.id == id).options(selectinload(Imei.stores))
+        stmt = select(Imei).where(Imei.id == id).options(selectinload(Imei.current_store))
         return self.db.exec(stmt).first()
 
     def get_by_code(self, code: str):
-        clean = code.strip()
-        stmt = select(Imei).where(
-            func.lower(func.trim(Imei.code)) == clean.lower()
-        ).options(selectinload(Imei.stores))
+        stmt = select(Imei).where(_code_matches(code)).options(selectinload(Imei.current_store))
         return self.db.exec(stmt).first()
 
-    def create(self, code: str, brand: str, model: str, store_id: int, vendor_id: int | None = None, storage_size: str | None = None):
+    def create(self, code: str, brand: str, model: str, store_id: int, vendor_id: int | None = None, storage_size: str | None = None, secondary_code: str | None = None):
         store = self.db.exec(select(Store).where(Store.id == store_id)).first()
         if not store:
             raise ValueError("Store not found")
 
+        if secondary_code:
+            code, secondary_code = imei_codes.validate(code), imei_codes.validate(secondary_code)
+        else:
+            code, secondary_code = imei_codes.parse_pair(code)
+
         existing = self.get_by_code(code)
+        stock = InventoryCRUD(self.db).track([existing.code if existing else code])
         if existing:
             existing.brand = brand
             existing.model = model
             existing.vendor_id = vendor_id
             existing.storage_size = storage_size
-
-            if store not in (existing.stores or []):
-                existing.stores.append(store)
+            if secondary_code:
+                existing.secondary_code = secondary_code
+            # Registering a phone again puts it in stock here, wherever it was.
+            existing.current_store = store
+            existing.status = IN_STOCK
 
             self.db.add(existing)
+            stock.apply()
             self.db.commit()
             self.db.refresh(existing)
             return existing
 
         imei = Imei(
-            code=code.strip(),
+            code=code,
+            secondary_code=secondary_code,
             brand=brand,
             model=model,
             vendor_id=vendor_id,
             storage_size=storage_size,
-            stores=[store],
+            current_store=store,
+            status=IN_STOCK,
         )
         self.db.add(imei)
+        stock.apply()
         self.db.commit()
         self.db.refresh(imei)
         return imei
 
+    def bulk_upsert(
+        self,
+        codes: list[str],
+        brand: str,
+        model: str,
+        store_id: int,
+        vendor_id: int | None = None,
+        storage_size: str | None = None,
+    ) -> list[dict]:
+        """
+        Receives a carton into `store_id` in one transaction: each valid code
+        is inserted or has its details updated (INSERT ... ON CONFLICT on
+        imei.code) and put in stock at the store. Returns one
+        {code, status, detail} per input code, status being created, updated
+        or rejected; rejected codes do not stop the others.
+        """
+        if not self.db.exec(select(Store.id).where(Store.id == store_id)).first():
+            raise ValueError("Store not found")
+
+        results: list[dict] = []
+        pairs: dict[str, str | None] = {}
+        for raw in codes:
+            try:
+                code, secondary = imei_codes.parse_pair(raw)
+            except imei_codes.InvalidCode as e:
+                results.append({"code": raw, "status": "rejected", "detail": str(e)})
+                continue
+            if code in pairs:
+                results.append({"code": code, "status": "rejected", "detail": "Duplicate of an earlier code in this batch"})
+                continue
+            pairs[code] = secondary
+            results.append({"code": code, "status": None, "detail": None})
+
+        # A scanned code may be the secondary IMEI of a known phone, and a
+        # new secondary must not belong to another phone.
+        scanned = set(pairs) | {s for s in pairs.values() if s}
+        owner = {}
+        for code, secondary in self.db.exec(
+            select(Imei.code, Imei.secondary_code).where(
+                or_(Imei.code.in_(scanned), Imei.secondary_code.in_(scanned))
+            )
+        ):
+            owner[code] = code
+            if secondary:
+                owner[secondary] = code
+        for code, secondary in pairs.items():
+            if secondary:
+                owner.setdefault(secondary, owner.get(code, code))
+
+        rows = {}
+        for result in results:
+            if result["status"]:
+                continue
+            scanned_code = result["code"]
+            code = owner.get(scanned_code, scanned_code)
+            secondary = pairs[scanned_code]
+            if secondary == code:
+                secondary = None
+            if secondary and owner.get(secondary, code) != code:
+                result.update(status="rejected", detail=f"IMEI {secondary} belongs to phone {owner[secondary]}")
+                continue
+            if code in rows:
+                rows[code] = rows[code] or secondary
+                result.update(status="rejected", detail=f"Same phone as {code} earlier in this batch")
+                continue
+            result["code"] = code
+            rows[code] = secondary
+
+        stock = InventoryCRUD(self.db).track(rows)
+        now = datetime.now()
+        imei_table = Imei.__table__
+        stmt = pg_insert(imei_table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[imei_table.c.code],
+            set_={
+                "secondary_code": func.coalesce(stmt.excluded.secondary_code, imei_table.c.secondary_code),
+                "vendor_id": stmt.excluded.vendor_id,
+                "brand": stmt.excluded.brand,
+                "model": stmt.excluded.model,
+                "storage_size": stmt.excluded.storage_size,
+                "current_store_id": stmt.excluded.current_store_id,
+                "status": stmt.excluded.status,
+                "updated_at": stmt.excluded.updated_at,
+            },
+        ).returning(imei_table.c.code, literal_column("(xmax = 0)"))
+        # Executed with a parameter list, SQLAlchemy batches the rows into
+        # multi-VALUES statements ("insertmanyvalues") from one cached
+        # compilation. xmax is 0 only on rows the statement inserted.
+        conn = self.db.connection()
+        inserted = dict(conn.execute(stmt, [
+            {
+                "code": code,
+                "secondary_code": secondary,
+                "vendor_id": vendor_id,
+                "brand": brand,
+                "model": model,
+                "storage_size": storage_size,
+                "current_store_id": store_id,
+                "status": IN_STOCK,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for code, secondary in rows.items()
+        ]).all()) if rows else {}
+        stock.apply()
+        self.db.commit()
+
+        for result in results:
+            if not result["status"]:
+                result["status"] = "created" if inserted[result["code"]] else "updated"
+        return results
+
     def all_by_store_id(self, store_id: int):
+        """Every phone in stock in the store, as ReadImei-shaped dicts."""
+        stmt = _select_read_columns().where(Imei.current_store_id == store_id, Imei.status == IN_STOCK)
+        return _read_dicts(self.db.exec(stmt))
+    
+    def page(
+        self,
+        limit: int,
+        after: tuple[datetime, int] | None = None,
+        store_id: int | None = None,
+        brand: str | None = None,
+        model: str | None = None,
+        storage_size: str | None = None,
+        vendor_id: int | None = None,
+    ):
+        """
+        Newest first, `limit` ReadImei-shaped dicts strictly after the
+        (created_at, id) key `after`. Filters are equality matches served by
+        the composite ix_imei_* (..., created_at, id) indexes.
+        """
+        stmt = _select_read_columns()
+        if store_id is not None:
+            stmt = stmt.where(Imei.current_store_id == store_id, Imei.status == IN_STOCK)
+        if brand:
+            stmt = stmt.where(Imei.brand == brand)
+        if model:
+            stmt = stmt.where(Imei.model == model)
+        if storage_size:
+            stmt = stmt.where(Imei.storage_size == storage_size)
+        if vendor_id is not None:
+            stmt = stmt.where(Imei.vendor_id == vendor_id)
+        if after is not None:
+            stmt = stmt.where(tuple_(Imei.created_at, Imei.id) < tuple_(*after))
+        stmt = stmt.order_by(Imei.created_at.desc(), Imei.id.desc()).limit(limit)
+        return _read_dicts(self.db.exec(stmt))
+
+
+class AsyncImeiCRUD:
+    """Read-side ImeiCRUD for `async def` routes (scan lookups)."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_by_id(self, id: int):
+        stmt = select(Imei).where(Imei.id == id).options(selectinload(Imei.current_store))
+        return (await self.db.exec(stmt)).first()
+
+    async def get_by_code(self, code: str):
+        stmt = select(Imei).where(_code_matches(code)).options(selectinload(Imei.current_store))
+        return (await self.db.exec(stmt)).first()
+
+    async def all_by_store_id(self, store_id: int):
         stmt = (
             select(Imei)
-            .join(StoreImeiLink, StoreImeiLink.imei_id == Imei.code)
-            .where(StoreImeiLink.store_id == store_id)
-            .options(selectinload(Imei.stores))
+            .where(Imei.current_store_id == store_id, Imei.status == IN_STOCK)
+            .options(selectinload(Imei.current_store))
         )
-        return self.db.exec(stmt).all()
-    
-    def all(self):
-        stmt = select(Imei).options(selectinload(Imei.stores))
-        return self.db.exec(stmt).all()
\ No newline at end of file
+        return (await self.db.exec(stmt)).all()
+
+    async def search(self, q: str, store_id: int | None = None, limit: int = 20) -> list[Imei]:
+        """
+        Typeahead over imei.code: codes ending with `q` first, then, where
+        the trigram index exists, codes containing it; each group by code.
+        With `store_id`, only phones in stock there.
+        """
+        global _substring_indexed
+        term = imei_codes.normalize(q)
+        if len(term) < config.IMEI_SEARCH_MIN_CHARS or not term.isalnum():
+            raise ValueError(f"Search for at least {config.IMEI_SEARCH_MIN_CHARS} letters or digits")
+        if _substring_indexed is None:
+            # Valid only: an interrupted CREATE INDEX CONCURRENTLY leaves an
+            # INVALID index the planner ignores, and LIKE '%q%' would scan imei.
+            found = await self.db.execute(text(
+                "SELECT EXISTS (SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                "WHERE c.relname = 'ix_imei_code_trgm' AND i.indisvalid)"
+            ))
+            _substring_indexed = found.scalar()
+
+        # Matches ix_imei_code_reverse: reverse(code) LIKE 'reversed%'.
+        suffix = func.reverse(Imei.code).like(term[::-1] + "%")
+        match = or_(suffix, Imei.code.like(f"%{term}%")) if _substring_indexed else suffix
+        stmt = select(Imei).where(match)
+        if store_id is not None:
+            stmt = stmt.where(Imei.current_store_id == store_id, Imei.status == IN_STOCK)
+        stmt = (
+            stmt.order_by(suffix.desc(), Imei.code)
+            .limit(limit)
+            .options(selectinload(Imei.current_store))
+        )
+        return (await self.db.exec(stmt)).all()
+
+    async def lookup(self, codes: list[str], store_id: int | None = None) -> list[dict]:
+        """
+        Resolves a burst of scanned codes in one query. Returns one result
+        per input code, in order: found or missing, the phone's status and
+        current store, and with `store_id` whether it is in stock there.
+        Either IMEI of a dual-SIM phone matches it.
+        """
+        clean = {imei_codes.normalize(code) for code in codes} - {""}
+        phones = {}
+        if clean:
+            rows = await self.db.exec(
+                select(Imei, Store.name)
+                .outerjoin(Store, Store.id == Imei.current_store_id)
+                .where(codes_match(sorted(clean)))
+            )
+            for imei, store_name in rows:
+                phones[imei.code] = phones[imei.secondary_code] = (imei, store_name)
+
+        results = []
+        for code in codes:
+            found = phones.get(imei_codes.normalize(code))
+            if not found:
+                results.append({"code": code, "found": False})
+                continue
+            imei, store_name = found
+            result = {
+                "code": code,
+                "found": True,
+                "id": imei.id,
+                "imei_code": imei.code,
+                "brand": imei.brand,
+                "model": imei.model,
+                "storage_size": imei.storage_size,
+                "status": imei.status,
+                "current_store_id": imei.current_store_id,
+                "current_store_name": store_name,
+            }
+            if store_id is not None:
+                result["in_store"] = imei.current_store_id == store_id and imei.status == IN_STOCK
+            results.append(result)
+        return results
@@ -0,0 +1,70 @@
+from datetime import datetime
+
+from sqlmodel import Session, select
+from models.import_job import ImportJob
+from models.store import Store
+
+
+class ImportJobCRUD:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_by_id(self, job_id: int) -> ImportJob | None:
+        return self.db.exec(select(ImportJob).where(ImportJob.id == job_id)).first()
+
+    def create(
+        self,
+        *,
+        filename: str,
+        path: str,
+        store_id: int,
+        vendor_id: int | None = None,
+        brand: str = "",
+        model: str = "",
+        storage_size: str | None = None,
+    ) -> ImportJob:
+        if not self.db.exec(select(Store.id).where(Store.id == store_id)).first():
+            raise ValueError("Store not found")
+        job = ImportJob(
+            filename=filename,
+            path=path,
+            store_id=store_id,
+            vendor_id=vendor_id,
+            brand=brand,
+            model=model,
+            storage_size=storage_size,
+        )
+        self.db.add(job)
+        self.db.commit()
+        self.db.refresh(job)
+        return job
+
+    def unfinished(self) -> list[ImportJob]:
+        """Queued and running jobs, oldest first."""
+        stmt = select(ImportJob).where(ImportJob.status.in_(("queued", "running"))).order_by(ImportJob.id)
+        return self.db.exec(stmt).all()
+
+    def start(self, job: ImportJob) -> ImportJob:
+        job.status = "running"
+        job.started_at = datetime.now()
+        self.db.add(job)
+        self.db.commit()
+        return job
+
+    def record_chunk(self, job: ImportJob, *, processed: int, created: int, updated: int, errors: list[str], max_errors: int):
+        job.rows_processed += processed
+        job.rows_created += created
+        job.rows_updated += updated
+        job.rows_rejected += len(errors)
+        if errors and len(job.errors) < max_errors:
+            # Reassign: in-place changes to a JSON column are not tracked.
+            job.errors = job.errors + errors[: max_errors - len(job.errors)]
+        self.db.add(job)
+        self.db.commit()
+
+    def finish(self, job: ImportJob, *, failed: str | None = None):
+        job.status = "failed" if failed else "completed"
+        job.detail = failed or ""
+        job.finished_at = datetime.now()
+        self.db.add(job)
+        self.db.commit()
@@ -0,0 +1,243 @@
+from collections import Counter
+from datetime import datetime
+
+from sqlalchemy import or_, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlmodel import Session, func, select
+from models.imei import IN_STOCK, Imei
+from models.inventory_change import InventoryChange
+from models.stock_summary import StockSummary
+from models.store_inventory_version import StoreInventoryVersion
+
+# (store_id, brand, model, storage_size) -> quantity change; stock_summary
+# keeps brand and model lowercased (see canonical_bucket)
+Bucket = tuple[int, str, str, str]
+# (store_id, imei code, "added" | "removed")
+Change = tuple[int, str, str]
+
+REBUILD_SQL = """
+DELETE FROM stock_summary;
+INSERT INTO stock_summary (store_id, brand, model, storage_size, quantity, updated_at)
+SELECT current_store_id, lower(brand), lower(model), coalesce(storage_size, ''), count(*), now()
+FROM imei WHERE status = 'in_stock' AND current_store_id IS NOT NULL
+GROUP BY 1, 2, 3, 4
+"""
+
+
+def canonical_bucket(bucket: Bucket) -> Bucket:
+    """The stock_summary key of a bucket: brand and model lowercased, so lookups match them directly."""
+    store_id, brand, model, storage_size = bucket
+    return store_id, brand.lower(), model.lower(), storage_size
+
+PRUNE_SQL = """
+WITH gone AS (
+    DELETE FROM inventory_change WHERE created_at < :before RETURNING store_id, version
+), floors AS (
+    UPDATE store_inventory_version v SET changes_floor = g.version
+    FROM (SELECT store_id, max(version) AS version FROM gone GROUP BY store_id) g
+    WHERE v.store_id = g.store_id AND v.changes_floor < g.version
+)
+SELECT count(*) FROM gone
+"""
+
+
+class StockTracker:
+    """
+    Records where `codes` are in stock, and in which buckets, before and
+    after a change, applies the bucket difference to stock_summary and logs
+    the phones that entered or left a store's stock. Create it before
+    touching the IMEIs and call apply() before the commit:
+
+        tracker = InventoryCRUD(db).track(codes)
+        ... change current_store_id / status / brand / model / storage ...
+        tracker.apply()
+        db.commit()
+
+    Works for any mix of moves and attribute edits, at two queries.
+    Every store holding one of the IMEIs before or after is a touched store
+    and gets its inventory version bumped, even when its counts net to zero.
+    A phone that stays in a store but changes bucket is logged as "added"
+    again, so delta-sync clients refresh it.
+    """
+
+    def __init__(self, inventory: "InventoryCRUD", codes):
+        self.inventory = inventory
+        self.codes = list(set(codes))
+        self.before = inventory.locations(self.codes)
+
+    def apply(self):
+        after = self.inventory.locations(self.codes)
+        delta = Counter(after.values())
+        delta.subtract(self.before.values())
+        changes = [(store, code, "removed") for store, code in self.before.keys() - after.keys()]
+        changes += [
+            (store, code, "added")
+            for (store, code), bucket in after.items()
+            if self.before.get((store, code)) != bucket
+        ]
+        touched = {store for store, _ in (*self.before, *after)}
+        self.inventory.adjust(delta, changes=changes, touched_stores=touched)
+
+
+class InventoryCRUD:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def locations(self, codes: list[str]) -> dict[tuple[int, str], Bucket]:
+        """(store_id, imei code) -> stock bucket for those of the given IMEIs (either code of a phone) in stock."""
+        if not codes:
+            return {}
+        rows = self.db.exec(
+            select(
+                Imei.current_store_id,
+                Imei.code,
+                Imei.brand,
+                Imei.model,
+                func.coalesce(Imei.storage_size, ""),
+            )
+            .where(or_(Imei.code.in_(codes), Imei.secondary_code.in_(codes)))
+            .where(Imei.status == IN_STOCK, Imei.current_store_id.is_not(None))
+        ).all()
+        return {(store, code): (store, brand, model, storage) for store, code, brand, model, storage in rows}
+
+    def track(self, codes) -> StockTracker:
+        return StockTracker(self, codes)
+
+    def adjust(self, delta: dict[Bucket, int], changes: list[Change] = (), touched_stores=()):
+        """
+        Adds `delta` to the summary rows, creating missing ones, bumps the
+        inventory version of every store in `delta`, `changes` and
+        `touched_stores`, and appends `changes` to the change log under the
+        new versions. Does not commit.
+        """
+        versions = self.bump_versions(
+            {bucket[0] for bucket in delta} | {change[0] for change in changes} | set(touched_stores)
+        )
+        now = datetime.now()
+        if changes:
+            self.db.connection().execute(InventoryChange.__table__.insert(), [
+                {"store_id": s, "version": versions[s], "imei_code": code, "change": change, "created_at": now}
+                for s, code, change in changes
+            ])
+        canonical = Counter()
+        for bucket, n in delta.items():
+            canonical[canonical_bucket(bucket)] += n
+        moves = sorted((bucket, n) for bucket, n in canonical.items() if n)
+        if not moves:
+            return
+        table = StockSummary.__table__
+        stmt = pg_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.store_id, table.c.brand, table.c.model, table.c.storage_size],
+            set_={"quantity": table.c.quantity + stmt.excluded.quantity, "updated_at": stmt.excluded.updated_at},
+        )
+        # Sorted, so concurrent movements lock summary rows in the same order.
+        self.db.connection().execute(stmt, [
+            {"store_id": s, "brand": b, "model": m, "storage_size": st, "quantity": n, "updated_at": now}
+            for (s, b, m, st), n in moves
+        ])
+
+    def bump_versions(self, store_ids) -> dict[int, int]:
+        """Increments the stores' versions; returns store_id -> new version."""
+        if not store_ids:
+            return {}
+        table = StoreInventoryVersion.__table__
+        stmt = pg_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.store_id],
+            set_={"version": table.c.version + 1, "updated_at": stmt.excluded.updated_at},
+        ).returning(table.c.store_id, table.c.version)
+        now = datetime.now()
+        # The row lock taken here is held to the commit, so a store's
+        # versions (and the changes logged under them) commit in order.
+        rows = self.db.connection().execute(
+            stmt, [{"store_id": s, "version": 1, "updated_at": now} for s in sorted(store_ids)]
+        )
+        return dict(rows.all())
+
+    def version(self, store_id: int) -> int:
+        return self.db.exec(
+            select(StoreInventoryVersion.version).where(StoreInventoryVersion.store_id == store_id)
+        ).first() or 0
+
+    def version_row(self, store_id: int) -> StoreInventoryVersion:
+        """The store's version row, or an unsaved one at version 0 for a store that never changed."""
+        row = self.db.get(StoreInventoryVersion, store_id)
+        return row or StoreInventoryVersion(store_id=store_id)
+
+    def codes(self, store_id: int) -> list[str]:
+        """Codes of every IMEI in stock in the store."""
+        return self.db.exec(
+            select(Imei.code).where(Imei.current_store_id == store_id, Imei.status == IN_STOCK)
+        ).all()
+
+    def changes(self, store_id: int, since: int, until: int, limit: int) -> tuple[list[InventoryChange], int]:
+        """
+        Logged changes of a store after version `since`, up to `until`, in
+        commit order, and the version they bring a client to. At most
+        `limit` rows, cut at a version boundary so a page never holds half
+        a transaction; a single version larger than `limit` comes whole.
+        """
+        base = (
+            select(InventoryChange)
+            .where(InventoryChange.store_id == store_id)
+            .order_by(InventoryChange.version, InventoryChange.id)
+        )
+        rows = self.db.exec(
+            base.where(InventoryChange.version > since, InventoryChange.version <= until).limit(limit + 1)
+        ).all()
+        if len(rows) <= limit:
+            return rows, until
+        cut = rows[limit].version
+        rows = [row for row in rows if row.version < cut]
+        if rows:
+            return rows, cut - 1
+        return self.db.exec(base.where(InventoryChange.version == cut)).all(), cut
+
+    def prune_changes(self, before: datetime) -> int:
+        """
+        Deletes changes logged before `before` and raises the stores'
+        changes_floor past them, in one statement. Returns the rows deleted.
+        """
+        deleted = self.db.exec(text(PRUNE_SQL), params={"before": before}).scalar()
+        self.db.commit()
+        return deleted or 0
+
+    def quantity(self, store_id: int, brand: str, model: str, storage_size: str | None = None) -> int:
+        """
+        Stock of one product in a store, as a stock_summary primary-key
+        lookup (a key-prefix range without storage, meaning any); brand and
+        model match case-insensitively.
+        """
+        stmt = select(func.coalesce(func.sum(StockSummary.quantity), 0)).where(
+            StockSummary.store_id == store_id,
+            StockSummary.brand == brand.lower(),
+            StockSummary.model == model.lower(),
+        )
+        if storage_size:
+            stmt = stmt.where(StockSummary.storage_size == storage_size)
+        return self.db.exec(stmt).one()
+
+    def summary(
+        self,
+        store_id: int | None = None,
+        brand: str | None = None,
+        model: str | None = None,
+        storage_size: str | None = None,
+    ) -> list[StockSummary]:
+        stmt = select(StockSummary).where(StockSummary.quantity > 0)
+        if store_id is not None:
+            stmt = stmt.where(StockSummary.store_id == store_id)
+        if brand:
+            stmt = stmt.where(StockSummary.brand == brand.lower())
+        if model:
+            stmt = stmt.where(StockSummary.model == model.lower())
+        if storage_size:
+            stmt = stmt.where(StockSummary.storage_size == storage_size)
+        stmt = stmt.order_by(StockSummary.store_id, StockSummary.brand, StockSummary.model, StockSummary.storage_size)
+        return self.db.exec(stmt).all()
+
+    def rebuild(self):
+        """Recomputes the whole table from the IMEIs in stock, e.g. after bulk loads that bypass the CRUDs."""
+        self.db.exec(text(REBUILD_SQL))
+        self.db.commit()
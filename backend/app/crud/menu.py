@@ -1,3 +1,4 @@
+from sqlalchemy.orm import selectinload
 from sqlmodel import Session, select
 from models.menu import Menu, SubMenu, UserPermission
 
@@ -14,7 +15,9 @@ class MenuCRUD:
         return menu
 
     def get_all(self) -> list[Menu]:
-        return self.db.exec(select(Menu).order_by(Menu.sort_order)).all()
+        return self.db.exec(
+            select(Menu).options(selectinload(Menu.submenus)).order_by(Menu.sort_order)
+        ).all()
 
     def get_by_id(self, menu_id: int) -> Menu | None:
         return self.db.get(Menu, menu_id)
@@ -200,7 +203,9 @@ class UserPermissionCRUD:
 
     def get_user_menu(self, user_id: int) -> list[dict]:
         """Get menu tree filtered by user permissions."""
-        menus = self.db.exec(select(Menu).order_by(Menu.sort_order)).all()
+        menus = self.db.exec(
+            select(Menu).options(selectinload(Menu.submenus)).order_by(Menu.sort_order)
+        ).all()
 
         # Get all user permission menu_ids and submenu_ids
         user_perms = self.db.exec(
@@ -1,11 +1,21 @@
-from sqlalchemy.orm import selectinload
-from sqlmodel import Session, select
+from datetime import datetime
 
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import aliased, selectinload
+from sqlmodel import Session, func, select, update
+
+from core.imei_codes import parse_pair
 from crud.category import CategoryCRUD
 from crud.category_type import CategoryTypeCRUD
-from models.imei import Imei
+from crud.inventory import InventoryCRUD
+from crud import statements
+from models.category import Category
+from models.client import Client
+from models.imei import IN_STOCK, IN_TRANSIT, SOLD, Imei
+from models.links import PurchaseImeiLink
 from models.purchase import Purchase
 from models.store import Store
+from models.vendor import Vendor
 
 
 class PurchaseCRUD:
@@ -23,6 +33,54 @@ class PurchaseCRUD:
     def all(self) -> list[Purchase]:
         return self.db.exec(select(Purchase).order_by(Purchase.id.desc())).all()
 
+    def read_details(self, purchase_ids: list[int]) -> dict[int, dict]:
+        """
+        Display names (vendor, brand, model, store, company) and storage size
+        for many purchases in one query, keyed by purchase id.
+        """
+        if not purchase_ids:
+            return {}
+
+        brand = aliased(Category)
+        model = aliased(Category)
+        # All IMEIs of a purchase share a storage size; read it from any one.
+        storage_size = (
+            select(Imei.storage_size)
+            .join(PurchaseImeiLink, PurchaseImeiLink.imei_id == Imei.id)
+            .where(PurchaseImeiLink.purchase_id == Purchase.id)
+            .limit(1)
+            .scalar_subquery()
+        )
+        rows = self.db.exec(
+            select(
+                Purchase.id,
+                Vendor.name,
+                brand.name,
+                model.name,
+                Store.name,
+                Store.client_id,
+                Client.name,
+                storage_size,
+            )
+            .outerjoin(Vendor, Vendor.id == Purchase.vendor_id)
+            .outerjoin(brand, brand.id == Purchase.brand_id)
+            .outerjoin(model, model.id == Purchase.model_id)
+            .outerjoin(Store, Store.id == Purchase.store_id)
+            .outerjoin(Client, Client.id == Store.client_id)
+            .where(Purchase.id.in_(purchase_ids))
+        ).all()
+
+        return {
+            row[0]: dict(
+                zip(
+                    ("vendor_name", "brand_name", "model_name", "store_name",
+                     "company_id", "company_name", "storage_size"),
+                    row[1:],
+                )
+            )
+            for row in rows
+        }
+
     def create(
         self,
         *,
@@ -41,16 +99,17 @@ class PurchaseCRUD:
         if not store:
             raise ValueError("Store not found")
 
-        clean_codes: list[str] = []
+        # (primary, secondary) per phone, in canonical form.
+        clean_codes: list[tuple[str, str | None]] = []
         seen = set()
         for c in imei_codes or []:
-            code = (c or "").strip()
-            if not code:
+            if not (c or "").strip():
                 continue
+            code, secondary = parse_pair(c)
             if code in seen:
                 continue
             seen.add(code)
-            clean_codes.append(code)
+            clean_codes.append((code, secondary))
 
         if not clean_codes:
             raise ValueError("No IMEI codes provided")
@@ -84,42 +143,46 @@ class PurchaseCRUD:
         )
 
         self.db.add(purchase)
-        self.db.commit()
-        self.db.refresh(purchase)
 
-        # Create or update IMEIs and attach to this purchase.
-        for code in clean_codes:
-            existing = self.db.exec(select(Imei).where(Imei.code == code)).first()
+        # Create or update IMEIs and attach to this purchase, all in one
+        # transaction with the stock summary change.
+        stock = InventoryCRUD(self.db).track(code for code, _ in clean_codes)
+        for code, secondary in clean_codes:
+            existing = self.db.scalars(statements.imei_by_code(code)).first()
             if existing:
                 existing.vendor_id = vendor_id
                 existing.brand = brand.name
                 existing.model = model.name
                 existing.storage_size = storage_size
+                if secondary:
+                    existing.secondary_code = secondary
                 imei = existing
             else:
                 imei = Imei(
                     code=code,
+                    secondary_code=secondary,
                     vendor_id=vendor_id,
                     brand=brand.name,
                     model=model.name,
                     storage_size=storage_size,
                 )
 
-            # Only count into inventory when completed.
+            # Only count into inventory when completed; new phones on a
+            # pending purchase are on their way to the store. Known ones keep
+            # their state until completion (see update_status).
             if resolved_status == "completed":
-                if imei.stores is None:
-                    imei.stores = []
-                if store not in imei.stores:
-                    imei.stores.append(store)
+                imei.current_store = store
+                imei.status = IN_STOCK
+            elif imei.id is None:
+                imei.current_store = store
+                imei.status = IN_TRANSIT
 
             self.db.add(imei)
-            self.db.commit()
-            self.db.refresh(imei)
-
             if imei not in (purchase.imeis or []):
                 purchase.imeis.append(imei)
 
         self.db.add(purchase)
+        stock.apply()
         self.db.commit()
         self.db.refresh(purchase)
         return purchase
@@ -144,12 +207,32 @@ class PurchaseCRUD:
             if not store:
                 raise ValueError("Store not found")
 
-            for imei in purchase.imeis or []:
-                if imei.stores is None:
-                    imei.stores = []
-                if store not in imei.stores:
-                    imei.stores.append(store)
-                self.db.add(imei)
+            imeis = purchase.imeis or []
+            ids = [imei.id for imei in imeis]
+            stock = InventoryCRUD(self.db).track(imei.code for imei in imeis)
+            # Phones arrive if they are on their way to this store (or to no
+            # store) or sold, e.g. a known phone bought back; one in stock or
+            # in transit elsewhere stays put.
+            moved = self.db.exec(
+                update(Imei)
+                .where(
+                    Imei.id.in_(ids),
+                    or_(
+                        and_(Imei.status == IN_TRANSIT, or_(Imei.current_store_id == store.id, Imei.current_store_id.is_(None))),
+                        Imei.status == SOLD,
+                    ),
+                )
+                .values(current_store_id=store.id, status=IN_STOCK, updated_at=datetime.now())
+            ).rowcount if ids else 0
+            # The rest must already be in stock there.
+            if moved != len(ids):
+                in_store = self.db.exec(
+                    select(func.count()).select_from(Imei)
+                    .where(Imei.id.in_(ids), Imei.current_store_id == store.id, Imei.status == IN_STOCK)
+                ).one()
+                if in_store != len(ids):
+                    raise ValueError("Some IMEIs of this purchase are in stock or in transit in another store")
+            stock.apply()
 
         self.db.add(purchase)
         self.db.commit()
@@ -1,7 +1,23 @@
-from sqlmodel import Session, select, func
+import uuid
+from collections import Counter
+from datetime import datetime
+
+from sqlmodel import Session, select, func, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+from core import imei_codes
+from models.imei import IN_STOCK, SOLD, Imei
 from models.sale import Sale
-from models.imei import Imei
-from models.links import StoreImeiLink
+from crud import statements
+from crud.imei import codes_match
+from crud.inventory import InventoryCRUD
+
+
+class SaleBatchError(ValueError):
+    """A checkout refused as a whole; `items` holds one {imei_code, error, detail} per offending item."""
+
+    def __init__(self, message: str, items: list[dict]):
+        super().__init__(message)
+        self.items = items
 
 
 class SaleCRUD:
@@ -62,23 +78,24 @@ class SaleCRUD:
         seller_name: str = "",
         receipt_path: str = "",
     ) -> Sale:
-        code = imei_code.strip()
+        code = imei_codes.normalize(imei_code)
         if not code:
             raise ValueError("IMEI code is required")
 
-        # 1. Verify IMEI exists
-        imei = self.db.exec(select(Imei).where(Imei.code == code)).first()
+        # 1. Verify IMEI exists (either IMEI of a dual-SIM phone)
+        imei = self.db.scalars(statements.imei_by_code(code)).first()
         if not imei:
             raise ValueError(f"IMEI {code} not found in the database")
+        code = imei.code
 
-        # 2. Verify IMEI is in the store
-        link = self.db.exec(
-            select(StoreImeiLink).where(
-                StoreImeiLink.store_id == store_id,
-                StoreImeiLink.imei_id == code,
-            )
-        ).first()
-        if not link:
+        # 2. Mark it sold if it is in stock in this store: one conditional
+        #    UPDATE, so two concurrent sales of the same phone cannot both succeed.
+        sold = self.db.exec(
+            update(Imei)
+            .where(Imei.id == imei.id, Imei.current_store_id == store_id, Imei.status == IN_STOCK)
+            .values(status=SOLD, updated_at=datetime.now())
+        ).rowcount
+        if not sold:
             raise ValueError(f"IMEI {code} is not available in this store")
 
         # 3. Auto-fill brand/model/storage from IMEI if not provided
@@ -86,8 +103,11 @@ class SaleCRUD:
         sale_model = model or imei.model or ""
         sale_storage = storage or imei.storage_size or ""
 
-        # 4. Remove IMEI from store (deduct stock)
-        self.db.delete(link)
+        # 4. Deduct stock
+        InventoryCRUD(self.db).adjust(
+            {(store_id, imei.brand, imei.model, imei.storage_size or ""): -1},
+            changes=[(store_id, code, "removed")],
+        )
 
         # 5. Create sale record
         sale = Sale(
@@ -116,6 +136,90 @@ class SaleCRUD:
         self.db.refresh(sale)
         return sale
 
+    # ── create several sales in one checkout ─────────────────────
+    def create_batch(self, *, store_id: int, store_name: str, items: list[dict], **customer) -> tuple[str, list[Sale]]:
+        """
+        Sells every phone in `items` ({imei_code, amount, brand, model,
+        storage, notes}) from one store to one customer, all or nothing,
+        under a new shared order_ref. `customer` holds the customer,
+        next-of-kin and seller fields of create(). If any item cannot be
+        sold, nothing is and SaleBatchError lists why, per item.
+        Returns (order_ref, sales).
+        """
+        codes = [imei_codes.normalize(item["imei_code"]) for item in items]
+
+        # 1. Lock every phone in one query (either IMEI of a dual-SIM phone),
+        #    in id order so overlapping checkouts cannot deadlock.
+        phones = self.db.exec(
+            select(Imei).where(codes_match(sorted({c for c in codes if c}))).order_by(Imei.id).with_for_update()
+        ).all()
+        by_code = {}
+        for imei in phones:
+            by_code[imei.code] = imei
+            if imei.secondary_code:
+                by_code[imei.secondary_code] = imei
+
+        # 2. Check them all before touching anything
+        errors, seen = [], set()
+        for item, code in zip(items, codes):
+            imei = by_code.get(code)
+            if not imei:
+                error, detail = "not_found", f"IMEI {code} not found in the database"
+            elif imei.id in seen:
+                error, detail = "duplicate", f"IMEI {imei.code} is already in this checkout"
+            elif imei.current_store_id != store_id or imei.status != IN_STOCK:
+                error, detail = "not_available", f"IMEI {imei.code} is not available in this store ({imei.status})"
+            else:
+                seen.add(imei.id)
+                continue
+            errors.append({"imei_code": item["imei_code"], "error": error, "detail": detail})
+        if errors:
+            raise SaleBatchError(f"{len(errors)} of {len(items)} items cannot be sold; nothing was sold", errors)
+        sold = [by_code[code] for code in codes]
+
+        # 3. Mark them all sold in one UPDATE; the rows are locked, so only
+        #    a bug could make it miss one, and then the whole batch rolls back.
+        updated = self.db.exec(
+            update(Imei)
+            .where(Imei.id.in_([imei.id for imei in sold]), Imei.current_store_id == store_id, Imei.status == IN_STOCK)
+            .values(status=SOLD, updated_at=datetime.now())
+        ).rowcount
+        if updated != len(sold):
+            raise ValueError("Stock changed during checkout; nothing was sold")
+
+        # 4. Deduct stock
+        delta = Counter()
+        for imei in sold:
+            delta[(store_id, imei.brand, imei.model, imei.storage_size or "")] -= 1
+        InventoryCRUD(self.db).adjust(delta, changes=[(store_id, imei.code, "removed") for imei in sold])
+
+        # 5. Create the sale records: one multi-row INSERT
+        order_ref = f"ORD-{uuid.uuid4().hex[:10].upper()}"
+        sales = [
+            Sale(
+                store_id=store_id,
+                store_name=store_name,
+                imei_code=imei.code,
+                brand=item.get("brand") or imei.brand or "",
+                model=item.get("model") or imei.model or "",
+                storage=item.get("storage") or imei.storage_size or "",
+                amount=item["amount"],
+                notes=item.get("notes") or "",
+                status="completed",
+                order_ref=order_ref,
+                **customer,
+            )
+            for item, imei in zip(items, sold)
+        ]
+        self.db.add_all(sales)
+        self.db.flush()
+        # Detached before the commit, so they are returned as flushed
+        # instead of being reloaded one SELECT each.
+        for sale in sales:
+            self.db.expunge(sale)
+        self.db.commit()
+        return order_ref, sales
+
     # ── upload receipt (update path) ─────────────────────────────
     def set_receipt(self, sale_id: int, receipt_path: str) -> Sale:
         sale = self.get_by_id(sale_id)
@@ -139,3 +243,39 @@ class SaleCRUD:
         self.db.commit()
         self.db.refresh(sale)
         return sale
+
+
+class AsyncSaleCRUD:
+    """Read-side SaleCRUD for `async def` routes."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_by_id(self, sale_id: int) -> Sale | None:
+        return (await self.db.exec(select(Sale).where(Sale.id == sale_id))).first()
+
+    async def all(
+        self,
+        *,
+        status: str | None = None,
+        store_id: int | None = None,
+        page: int = 1,
+        page_size: int = 50,
+    ) -> tuple[list[Sale], int]:
+        base = select(Sale)
+        count_base = select(func.count()).select_from(Sale)
+
+        if status:
+            base = base.where(Sale.status == status)
+            count_base = count_base.where(Sale.status == status)
+        if store_id:
+            base = base.where(Sale.store_id == store_id)
+            count_base = count_base.where(Sale.store_id == store_id)
+
+        total = (await self.db.exec(count_base)).one()
+        items = (await self.db.exec(
+            base.order_by(Sale.id.desc())
+            .offset((page - 1) * page_size)
+            .limit(page_size)
+        )).all()
+        return items, total
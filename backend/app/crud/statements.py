@@ -0,0 +1,27 @@
+"""
+Hot-path lookups as lambda statements.
+
+A plain `select(...)` is rebuilt on every call and its cache key recomputed
+before the compiled-SQL cache can be consulted. A lambda statement is
+analysed once per call site; later calls only extract the closure variables
+as bound parameters. On asyncpg the compiled SQL is additionally a
+server-side prepared statement (see DB_PREPARED_STATEMENT_CACHE_SIZE).
+
+Run the statements with `db.scalars(stmt)`; they are not SQLModel selects,
+so `db.exec` would return rows instead of objects. Codes must already be
+canonical (core.imei_codes.normalize).
+"""
+from sqlalchemy import lambda_stmt, or_
+from sqlmodel import select
+
+from models.imei import Imei
+from models.user import User
+
+
+def imei_by_code(code: str):
+    """Matches either IMEI of a dual-SIM phone."""
+    return lambda_stmt(lambda: select(Imei).where(or_(Imei.code == code, Imei.secondary_code == code)))
+
+
+def user_by_id(user_id: int):
+    return lambda_stmt(lambda: select(User).where(User.id == user_id))
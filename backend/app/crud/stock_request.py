@@ -1,7 +1,16 @@
-from sqlmodel import Session, select
+from datetime import datetime
+
+from sqlmodel import Session, func, select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+from core import imei_codes
+from models.imei import IN_STOCK, IN_TRANSIT, Imei
 from models.stock_request import StockRequest
-from models.links import StoreImeiLink
-from models.imei import Imei
+from crud import statements
+from crud.inventory import InventoryCRUD
+
+
+def _split_codes(imeis: str) -> list[str]:
+    return [c for c in (imeis or "").split(",") if c]
 
 
 class StockRequestCRUD:
@@ -13,6 +22,20 @@ class StockRequestCRUD:
             select(StockRequest).where(StockRequest.id == request_id)
         ).first()
 
+    def _move(self, codes, *, store_id: int, status: str, to_store_id: int, to_status: str) -> int:
+        """
+        Moves the IMEIs among `codes` that are at (store_id, status) to
+        (to_store_id, to_status) in one UPDATE; returns how many moved.
+        Callers track the stock change around it.
+        """
+        if not codes:
+            return 0
+        return self.db.exec(
+            update(Imei)
+            .where(Imei.code.in_(list(codes)), Imei.current_store_id == store_id, Imei.status == status)
+            .values(current_store_id=to_store_id, status=to_status, updated_at=datetime.now())
+        ).rowcount
+
     def all(self, *, status: str | None = None, page: int = 1, page_size: int = 50) -> tuple[list[StockRequest], int]:
         """Return paginated list of stock requests, optionally filtered by status."""
         base = select(StockRequest)
@@ -20,7 +43,6 @@ class StockRequestCRUD:
             base = base.where(StockRequest.status == status)
 
         # Count
-        from sqlmodel import func
         count_stmt = select(func.count()).select_from(StockRequest)
         if status:
             count_stmt = count_stmt.where(StockRequest.status == status)
@@ -53,10 +75,11 @@ class StockRequestCRUD:
         model: str,
         storage: str,
         requested_quantity: int,
-        available_stock: int = 0,
         notes: str = "",
         requested_imeis: list[str] | None = None,
     ) -> StockRequest:
+        # What the source store holds right now, from the stock summary.
+        available_stock = InventoryCRUD(self.db).quantity(source_store_id, brand, model, storage)
         sr = StockRequest(
             source_store_id=source_store_id,
             source_store_name=source_store_name,
@@ -70,7 +93,7 @@ class StockRequestCRUD:
             moved_quantity=0,
             status="pending",
             notes=notes,
-            requested_imeis=",".join(requested_imeis or []),
+            requested_imeis=",".join(imei_codes.normalize(c) for c in requested_imeis or [] if c.strip()),
             transferred_imeis="",
             received_imeis="",
         )
@@ -126,22 +149,16 @@ class StockRequestCRUD:
 
         # Validate each IMEI: must exist in source store and match brand/model/storage
         errors = []
+        codes = []
         for code in transferred_imeis:
-            imei = self.db.exec(
-                select(Imei).where(Imei.code == code.strip())
-            ).first()
+            imei = self.db.scalars(statements.imei_by_code(imei_codes.normalize(code))).first()
             if not imei:
                 errors.append(f"IMEI {code} not found in database")
                 continue
+            codes.append(imei.code)
 
-            # Check it's linked to the source store
-            link = self.db.exec(
-                select(StoreImeiLink).where(
-                    StoreImeiLink.store_id == sr.source_store_id,
-                    StoreImeiLink.imei_id == code.strip(),
-                )
-            ).first()
-            if not link:
+            # Check it's in stock in the source store
+            if imei.current_store_id != sr.source_store_id or imei.status != IN_STOCK:
                 errors.append(f"IMEI {code} is not in the source store")
                 continue
 
@@ -153,11 +170,21 @@ class StockRequestCRUD:
 
         if errors:
             raise ValueError("; ".join(errors))
+        codes = list(dict.fromkeys(codes))
+
+        # Out of the source store's stock until received.
+        stock = InventoryCRUD(self.db).track(codes)
+        moved = self._move(
+            codes, store_id=sr.source_store_id, status=IN_STOCK, to_store_id=sr.source_store_id, to_status=IN_TRANSIT
+        )
+        if moved != len(codes):
+            raise ValueError("Some of these IMEIs were sold or moved meanwhile; scan again")
 
         sr.status = "transferred"
-        sr.transferred_imeis = ",".join(transferred_imeis)
-        sr.moved_quantity = len(transferred_imeis)
+        sr.transferred_imeis = ",".join(codes)
+        sr.moved_quantity = len(codes)
         self.db.add(sr)
+        stock.apply()
         self.db.commit()
         self.db.refresh(sr)
         return sr
@@ -171,8 +198,8 @@ class StockRequestCRUD:
         """
         Destination store scans IMEIs to confirm receipt.
         Validates each received IMEI was in the transferred list.
-        Moves IMEIs: deletes StoreImeiLink from source, inserts for destination.
-        Sets status to 'completed'.
+        Received IMEIs go into the destination's stock, transferred ones that
+        were not received back into the source's. Sets status to 'completed'.
         """
         sr = self.get_by_id(request_id)
         if not sr:
@@ -183,42 +210,41 @@ class StockRequestCRUD:
         if not received_imeis:
             raise ValueError("Must scan at least one IMEI to receive")
 
-        # Validate each received IMEI was actually transferred
-        transferred_set = set(c.strip() for c in sr.transferred_imeis.split(",") if c.strip())
-        invalid = [c for c in received_imeis if c.strip() not in transferred_set]
+        # Validate each received IMEI was actually transferred. transferred_imeis
+        # holds primary codes; a scanned secondary IMEI is resolved to its phone.
+        transferred_set = set(_split_codes(sr.transferred_imeis))
+        codes = []
+        invalid = []
+        for raw in received_imeis:
+            code = imei_codes.normalize(raw)
+            if code not in transferred_set:
+                imei = self.db.scalars(statements.imei_by_code(code)).first()
+                code = imei.code if imei else code
+            if code in transferred_set:
+                codes.append(code)
+            else:
+                invalid.append(raw)
         if invalid:
             raise ValueError(f"These IMEIs were not in the transfer: {', '.join(invalid)}")
 
-        # Move each IMEI from source store to destination store
-        for code in received_imeis:
-            code = code.strip()
-            # Remove from source store
-            old_link = self.db.exec(
-                select(StoreImeiLink).where(
-                    StoreImeiLink.store_id == sr.source_store_id,
-                    StoreImeiLink.imei_id == code,
-                )
-            ).first()
-            if old_link:
-                self.db.delete(old_link)
-
-            # Add to destination store (check if not already there)
-            existing = self.db.exec(
-                select(StoreImeiLink).where(
-                    StoreImeiLink.store_id == sr.destination_store_id,
-                    StoreImeiLink.imei_id == code,
-                )
-            ).first()
-            if not existing:
-                new_link = StoreImeiLink(
-                    store_id=sr.destination_store_id,
-                    imei_id=code,
-                )
-                self.db.add(new_link)
+        codes = list(dict.fromkeys(codes))
+
+        stock = InventoryCRUD(self.db).track(transferred_set)
+        moved = self._move(
+            codes, store_id=sr.source_store_id, status=IN_TRANSIT,
+            to_store_id=sr.destination_store_id, to_status=IN_STOCK,
+        )
+        if moved != len(codes):
+            raise ValueError("Some of these IMEIs are no longer in transit from the source store")
+        self._move(
+            transferred_set.difference(codes), store_id=sr.source_store_id, status=IN_TRANSIT,
+            to_store_id=sr.source_store_id, to_status=IN_STOCK,
+        )
 
         sr.status = "completed"
-        sr.received_imeis = ",".join(received_imeis)
+        sr.received_imeis = ",".join(codes)
         self.db.add(sr)
+        stock.apply()
         self.db.commit()
         self.db.refresh(sr)
         return sr
@@ -240,15 +266,62 @@ class StockRequestCRUD:
         if clean not in valid:
             raise ValueError(f"Invalid status: {status}")
 
+        stock = None
+        if sr.status == "transferred" and clean != "transferred":
+            # Overridden past the receive step: what is still in transit goes
+            # back into the source store's stock.
+            codes = _split_codes(sr.transferred_imeis)
+            stock = InventoryCRUD(self.db).track(codes)
+            self._move(
+                codes, store_id=sr.source_store_id, status=IN_TRANSIT,
+                to_store_id=sr.source_store_id, to_status=IN_STOCK,
+            )
+
         sr.status = clean
 
         if moved_quantity is not None:
             sr.moved_quantity = moved_quantity
 
         if received_imeis is not None:
-            sr.received_imeis = ",".join(received_imeis)
+            sr.received_imeis = ",".join(imei_codes.normalize(c) for c in received_imeis if c.strip())
 
         self.db.add(sr)
+        if stock:
+            stock.apply()
         self.db.commit()
         self.db.refresh(sr)
         return sr
+
+
+class AsyncStockRequestCRUD:
+    """Read-side StockRequestCRUD for `async def` routes."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_by_id(self, request_id: int) -> StockRequest | None:
+        return (await self.db.exec(
+            select(StockRequest).where(StockRequest.id == request_id)
+        )).first()
+
+    async def all(self, *, status: str | None = None, page: int = 1, page_size: int = 50) -> tuple[list[StockRequest], int]:
+        base = select(StockRequest)
+        count_stmt = select(func.count()).select_from(StockRequest)
+        if status:
+            base = base.where(StockRequest.status == status)
+            count_stmt = count_stmt.where(StockRequest.status == status)
+        total = (await self.db.exec(count_stmt)).one()
+
+        stmt = base.order_by(StockRequest.id.desc()).offset((page - 1) * page_size).limit(page_size)
+        items = (await self.db.exec(stmt)).all()
+        return items, total
+
+    async def get_by_store(self, store_id: int) -> list[StockRequest]:
+        return (await self.db.exec(
+            select(StockRequest)
+            .where(
+                (StockRequest.source_store_id == store_id)
+                | (StockRequest.destination_store_id == store_id)
+            )
+            .order_by(StockRequest.id.desc())
+        )).all()
@@ -0,0 +1,180 @@
+"""
+Stock-take sessions: reconciling scanned codes against the phones in stock
+in a store, in SQL, however many handhelds scan into the same session.
+
+  counted      in stock in this store and scanned
+  missing      in stock in this store, not scanned (yet)
+  wrong_store  scanned here, in stock in another store
+  unexpected   scanned here, unknown or not in stock anywhere (sold, in transit)
+
+Each is computed from the live stock, so a phone sold or received during
+the count moves between the lists. Closing freezes the counters and the
+lists, so the report of a closed session stops changing.
+"""
+from datetime import datetime
+
+from sqlalchemy import text
+from sqlmodel import Session, select
+from core import imei_codes
+from models.stock_take import StockTake
+from models.store import Store
+
+# Insert the batch, resolving each code to its phone through either unique
+# code index; codes already scanned in the session are skipped. Returns the
+# new scans with where their phone is now.
+SCAN_SQL = """
+WITH new AS (
+    INSERT INTO stock_take_scan (stock_take_id, code, imei_id, scanned_by, scanned_at)
+    SELECT :id, c.code, (
+        SELECT i.id FROM imei i WHERE i.code = c.code
+        UNION ALL
+        SELECT i.id FROM imei i WHERE i.secondary_code = c.code
+        LIMIT 1
+    ), :scanned_by, now()
+    FROM unnest(CAST(:codes AS varchar[])) AS c(code)
+    ON CONFLICT DO NOTHING
+    RETURNING code, imei_id
+)
+SELECT new.code, i.current_store_id, i.status
+FROM new LEFT JOIN imei i ON i.id = new.imei_id
+"""
+
+COUNTERS_SQL = """
+SELECT
+    (SELECT count(*) FROM imei WHERE current_store_id = :store_id AND status = 'in_stock') AS expected,
+    count(DISTINCT s.imei_id) FILTER (WHERE i.current_store_id = :store_id AND i.status = 'in_stock') AS counted,
+    count(DISTINCT s.imei_id) FILTER (WHERE i.current_store_id <> :store_id AND i.status = 'in_stock') AS wrong_store,
+    count(DISTINCT coalesce(s.imei_id::text, s.code)) FILTER (WHERE i.status IS DISTINCT FROM 'in_stock') AS unexpected,
+    count(*) AS scanned
+FROM stock_take_scan s LEFT JOIN imei i ON i.id = s.imei_id
+WHERE s.stock_take_id = :id
+"""
+
+MISSING_SQL = """
+SELECT i.code, i.brand, i.model, i.storage_size
+FROM imei i
+WHERE i.current_store_id = :store_id AND i.status = 'in_stock'
+  AND NOT EXISTS (SELECT 1 FROM stock_take_scan s WHERE s.stock_take_id = :id AND s.imei_id = i.id)
+ORDER BY i.brand, i.model, i.code
+"""
+
+WRONG_STORE_SQL = """
+SELECT s.code, i.code AS imei_code, i.brand, i.model, i.current_store_id, st.name AS current_store_name
+FROM stock_take_scan s
+JOIN imei i ON i.id = s.imei_id
+JOIN store st ON st.id = i.current_store_id
+WHERE s.stock_take_id = :id AND i.status = 'in_stock' AND i.current_store_id <> :store_id
+ORDER BY s.code
+"""
+
+UNEXPECTED_SQL = """
+SELECT s.code, i.code AS imei_code, i.brand, i.model, i.status, s.scanned_by
+FROM stock_take_scan s
+LEFT JOIN imei i ON i.id = s.imei_id
+WHERE s.stock_take_id = :id AND i.status IS DISTINCT FROM 'in_stock'
+ORDER BY s.code
+"""
+
+
+class StockTakeCRUD:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_by_id(self, stock_take_id: int) -> StockTake | None:
+        return self.db.exec(select(StockTake).where(StockTake.id == stock_take_id)).first()
+
+    def _get_open(self, stock_take_id: int, *, share: bool) -> StockTake:
+        # Scan batches from several handhelds share the row lock and run
+        # together; closing takes it exclusively and waits for them.
+        stmt = select(StockTake).where(StockTake.id == stock_take_id).with_for_update(read=share)
+        take = self.db.exec(stmt).first()
+        if not take:
+            raise ValueError("Stock take not found")
+        if take.status != "open":
+            raise ValueError("Stock take is closed")
+        return take
+
+    def all(self, store_id: int | None = None, status: str | None = None) -> list[StockTake]:
+        stmt = select(StockTake)
+        if store_id is not None:
+            stmt = stmt.where(StockTake.store_id == store_id)
+        if status:
+            stmt = stmt.where(StockTake.status == status)
+        return self.db.exec(stmt.order_by(StockTake.created_at.desc())).all()
+
+    def create(self, store_id: int, note: str = "") -> StockTake:
+        if not self.db.exec(select(Store.id).where(Store.id == store_id)).first():
+            raise ValueError("Store not found")
+        take = StockTake(store_id=store_id, note=note)
+        self.db.add(take)
+        self.db.commit()
+        self.db.refresh(take)
+        return take
+
+    def scan(self, stock_take_id: int, codes: list[str], scanned_by: str = "") -> dict:
+        """
+        Adds a batch of scanned codes to an open session. Returns how many
+        were new, the new ones that do not belong to the store (wrong_store /
+        unexpected) so the handheld can flag them at once, and the session's
+        counters; codes scanned before, by any handheld, count as duplicates.
+        """
+        take = self._get_open(stock_take_id, share=True)
+        clean = list(dict.fromkeys(c for c in (imei_codes.normalize(code) for code in codes) if c))
+        rows = self.db.exec(
+            text(SCAN_SQL), params={"id": take.id, "codes": clean, "scanned_by": scanned_by}
+        ).all() if clean else []
+        counters = self.counters(take)
+        store_id = take.store_id
+        self.db.commit()
+
+        flagged = []
+        for code, current_store_id, status in rows:
+            if status != "in_stock":
+                flagged.append({"code": code, "result": "unexpected", "status": status, "current_store_id": current_store_id})
+            elif current_store_id != store_id:
+                flagged.append({"code": code, "result": "wrong_store", "status": status, "current_store_id": current_store_id})
+        return {"accepted": len(rows), "duplicates": len(clean) - len(rows), "flagged": flagged, "counters": counters}
+
+    @staticmethod
+    def frozen_counters(take: StockTake) -> dict:
+        """The counters stored on the session: as of closing, zeros while open."""
+        return {
+            "expected": take.expected,
+            "counted": take.counted,
+            "missing": take.missing,
+            "wrong_store": take.wrong_store,
+            "unexpected": take.unexpected,
+            "scanned": take.scanned,
+        }
+
+    def counters(self, take: StockTake) -> dict:
+        """Live counters of an open session, the frozen ones of a closed one."""
+        if take.status != "open":
+            return self.frozen_counters(take)
+        row = self.db.exec(
+            text(COUNTERS_SQL), params={"id": take.id, "store_id": take.store_id}
+        ).mappings().one()
+        return {**row, "missing": row["expected"] - row["counted"]}
+
+    def report(self, take: StockTake) -> dict:
+        """The missing, wrong-store and unexpected items: from the live stock while open, as of closing after."""
+        if take.status != "open":
+            return take.report or {"missing": [], "wrong_store": [], "unexpected": []}
+        params = {"id": take.id, "store_id": take.store_id}
+        return {
+            "missing": self.db.exec(text(MISSING_SQL), params=params).mappings().all(),
+            "wrong_store": self.db.exec(text(WRONG_STORE_SQL), params=params).mappings().all(),
+            "unexpected": self.db.exec(text(UNEXPECTED_SQL), params=params).mappings().all(),
+        }
+
+    def close(self, stock_take_id: int) -> StockTake:
+        take = self._get_open(stock_take_id, share=False)
+        for name, value in self.counters(take).items():
+            setattr(take, name, value)
+        take.report = {name: [dict(row) for row in rows] for name, rows in self.report(take).items()}
+        take.status = "closed"
+        take.closed_at = datetime.now()
+        self.db.add(take)
+        self.db.commit()
+        self.db.refresh(take)
+        return take
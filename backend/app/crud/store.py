@@ -1,4 +1,5 @@
 from sqlmodel import Session, select
+from crud.inventory import InventoryCRUD
 from models.store import Store
 
 
@@ -20,5 +21,20 @@ class StoreCRUD:
         self.db.refresh(store)
         return store
 
+    def update(self, id: int, name: str, type: str, client_id: int):
+        store = self.get_by_id(id)
+        if not store:
+            raise ValueError("Store not found")
+
+        store.name = name
+        store.type = type
+        store.client_id = client_id
+        self.db.add(store)
+        # The store's inventory body carries its name and client: new ETag.
+        InventoryCRUD(self.db).bump_versions([id])
+        self.db.commit()
+        self.db.refresh(store)
+        return store
+
     def all(self):
         return self.db.exec(select(Store)).all()
\ No newline at end of file
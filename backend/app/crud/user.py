@@ -1,6 +1,9 @@
 # app/crud/user.py
+from sqlalchemy.orm import selectinload
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from models.user import User
+from crud import statements
 from bcrypt import hashpw, gensalt
 
 
@@ -13,11 +16,11 @@ class UserCRUD:
         return self.db.exec(select(User).where(User.phone == phone)).first()
     
     def get_by_id(self, id: int):
-        return self.db.exec(select(User).where(User.id == id)).first()
+        return self.db.scalars(statements.user_by_id(id)).first()
     
     def get_user_client(self, id: int):
         
-        return self.db.exec(select(User).where(User.id == id)).first().clients
+        return self.get_by_id(id).clients
 
     def create(self, phone: str, fullname: str, password: str):
         hashed = hashpw(password.encode('utf-8'), gensalt()).decode("utf-8")
@@ -29,4 +32,19 @@ class UserCRUD:
     
     def all(self):
         return self.db.exec(select(User)).all()
-    
+
+
+class AsyncUserCRUD:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_by_id(self, id: int):
+        return (await self.db.scalars(statements.user_by_id(int(id)))).first()
+
+    async def get_user_client(self, id: int):
+        # Relationships cannot lazy-load on an AsyncSession, so eager-load them.
+        user = (await self.db.exec(
+            select(User).where(User.id == int(id)).options(selectinload(User.clients))
+        )).first()
+        return user.clients
+
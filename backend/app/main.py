@@ -1,48 +1,70 @@
+import logging
+
 from fastapi import FastAPI
 from api import menu
-from core.middleware import DBSessionMiddleware
-from core.database import init_db
-from api import auth, user, client, vendor,  category_type, category, store, imei, permission, transaction, purchase
+from core import config, stock_import
+from core.responses import JSONResponse
+from core.middleware import (
+    DBSessionMiddleware,
+    ErrorHandlingMiddleware,
+    QueryStatsMiddleware,
+    RequestIDMiddleware,
+    TimingMiddleware,
+)
+from migrations import check_schema_version
+from api import auth, user, client, vendor,  category_type, category, store, imei, permission, transaction, purchase, admin
 from fastapi.middleware.cors import CORSMiddleware
 
 
+logging.basicConfig(level=config.LOG_LEVEL, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+
 """
 start fastapi application
 """
 app = FastAPI(
     title="X-WING API",
     version="1.0.0",
-    description="APIs for XWING Application"
+    description="APIs for XWING Application",
+    default_response_class=JSONResponse,
     )
 
 
+"""
+refuse to serve on an outdated schema (run `python -m migrations upgrade` first)
+"""
+check_schema_version()
+
+"""
+resume the stock imports a restart interrupted (core/stock_import.py)
+"""
+stock_import.recover()
+
+"""
+add all middlewares (the last one added runs first)
+"""
+app.add_middleware(QueryStatsMiddleware)
+app.add_middleware(DBSessionMiddleware)
+app.add_middleware(ErrorHandlingMiddleware)
+app.add_middleware(TimingMiddleware)
+app.add_middleware(RequestIDMiddleware)
+
 # Allowed origins
 origins = [
     "*",   # React app
     # add your domain here when deploying
 ]
 
+# Outermost, so error responses also carry CORS headers.
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
     allow_credentials=True,
     allow_methods=["*"],        # allow all HTTP methods
     allow_headers=["*"],        # allow all headers
+    expose_headers=["X-Request-ID", "Server-Timing", "ETag"],
 )
 
 
-
-"""
-create db tables
-"""
-init_db()
-
-"""
-add all middlewares
-"""
-app.add_middleware(DBSessionMiddleware)
-
-
 """
 register all routes
 """
@@ -56,13 +78,17 @@ app.include_router(store.router)
 app.include_router(imei.router)
 # app.include_router(permission.router)
 
-from api import payment, transfer, stock_request, sale, customer
+from api import payment, transfer, stock_request, sale, customer, imports, inventory, stock_take
 app.include_router(transaction.router)
 app.include_router(purchase.router)
 # app.include_router(payment.router)
 app.include_router(transfer.router)
 app.include_router(stock_request.router)
 app.include_router(sale.router)
+app.include_router(imports.router)
+app.include_router(inventory.router)
+app.include_router(stock_take.router)
 app.include_router(customer.router)
 app.include_router(menu.router)
+app.include_router(admin.router)
 
@@ -0,0 +1,32 @@
+"""
+Versioned schema migrations.
+
+Run once per deploy, before the uvicorn workers start:
+    cd backend/app && python -m migrations upgrade
+
+Workers only call check_schema_version() at startup.
+To add a migration, create migrations/versions/vNNNN_<name>.py exposing
+`migration = Migration(NNNN, ...)` and list it in versions/__init__.py.
+"""
+from core.database import engine
+from migrations.runner import Migration, SchemaOutOfDate, create_index_concurrently  # noqa: F401
+from migrations.runner import check_schema_version as _check_schema_version
+from migrations.runner import current_version as _current_version
+from migrations.runner import upgrade as _upgrade
+from migrations.versions import MIGRATIONS
+
+
+def head_version() -> int:
+    return max(m.version for m in MIGRATIONS)
+
+
+def current_version() -> int:
+    return _current_version(engine)
+
+
+def upgrade(target: int | None = None):
+    return _upgrade(engine, MIGRATIONS, target)
+
+
+def check_schema_version():
+    _check_schema_version(engine, MIGRATIONS)
@@ -0,0 +1,48 @@
+"""
+Usage:
+    python -m migrations upgrade [--to VERSION]
+    python -m migrations current
+    python -m migrations check      # exit 1 if the DB is behind this build
+"""
+import argparse
+import logging
+import sys
+
+from migrations import (
+    SchemaOutOfDate,
+    check_schema_version,
+    current_version,
+    head_version,
+    upgrade,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m migrations")
+    sub = parser.add_subparsers(dest="command", required=True)
+    up = sub.add_parser("upgrade", help="apply pending migrations")
+    up.add_argument("--to", type=int, default=None, help="stop after this version")
+    sub.add_parser("current", help="print the applied and head versions")
+    sub.add_parser("check", help="fail if the database is behind this build")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    if args.command == "upgrade":
+        applied = upgrade(args.to)
+        for m in applied:
+            print(f"applied {m.version:04d} {m.name}")
+        print(f"schema at version {current_version()} (head {head_version()})")
+    elif args.command == "current":
+        print(f"current {current_version()} head {head_version()}")
+    elif args.command == "check":
+        try:
+            check_schema_version()
+        except SchemaOutOfDate as e:
+            print(e, file=sys.stderr)
+            sys.exit(1)
+        print("schema up to date")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Migration runner.
+
+Migrations are applied in version order by one process holding a Postgres
+advisory lock, so concurrent deploys cannot race on DDL. Applied versions
+are recorded in the `schema_version` table.
+"""
+import logging
+from typing import Callable, Union
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary, fixed key for pg_advisory_lock.
+ADVISORY_LOCK_KEY = 7_240_001
+
+Step = Union[str, Callable[[Connection], None]]
+
+
+class SchemaOutOfDate(RuntimeError):
+    pass
+
+
+class Migration:
+    """
+    One schema version.
+
+    steps are SQL strings or callables taking a Connection. When
+    transactional is False each step runs in autocommit mode, which is
+    required for CREATE INDEX CONCURRENTLY.
+    """
+
+    def __init__(self, version: int, name: str, steps: list[Step], *, transactional: bool = True):
+        self.version = version
+        self.name = name
+        self.steps = steps
+        self.transactional = transactional
+
+    def __repr__(self):
+        return f"<Migration {self.version:04d} {self.name}>"
+
+
+def create_index_concurrently(name: str, definition: str, *, unique: bool = False) -> Step:
+    """
+    Step for an online index build. `definition` is everything after the
+    index name, e.g. "ON sale (store_id, id DESC)". Use it only in a
+    Migration with transactional=False. A previously interrupted build
+    leaves an INVALID index behind; it is dropped and rebuilt.
+    """
+
+    def step(conn: Connection):
+        invalid = conn.execute(
+            text(
+                "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                "WHERE c.relname = :name AND NOT i.indisvalid"
+            ),
+            {"name": name},
+        ).first()
+        if invalid:
+            logger.warning("Dropping invalid index %s left by an interrupted build", name)
+            conn.execute(text(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"'))
+        conn.execute(
+            text(
+                f'CREATE {"UNIQUE " if unique else ""}INDEX CONCURRENTLY IF NOT EXISTS "{name}" {definition}'
+            )
+        )
+
+    step.__name__ = f"create_index_concurrently({name})"
+    return step
+
+
+def _ensure_version_table(conn: Connection):
+    conn.execute(
+        text(
+            "CREATE TABLE IF NOT EXISTS schema_version ("
+            " version INTEGER PRIMARY KEY,"
+            " name VARCHAR NOT NULL,"
+            " applied_at TIMESTAMPTZ NOT NULL DEFAULT now())"
+        )
+    )
+
+
+def _run_step(conn: Connection, step: Step):
+    if callable(step):
+        step(conn)
+    else:
+        conn.execute(text(step))
+
+
+def current_version(engine: Engine) -> int:
+    with engine.connect() as conn:
+        exists = conn.execute(text("SELECT to_regclass('schema_version')")).scalar()
+        if not exists:
+            return 0
+        return conn.execute(text("SELECT coalesce(max(version), 0) FROM schema_version")).scalar()
+
+
+def upgrade(engine: Engine, migrations: list[Migration], target: int | None = None) -> list[Migration]:
+    """Apply every pending migration up to `target` (default: all). Returns what ran."""
+    applied: list[Migration] = []
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as lock_conn:
+        lock_conn.execute(text("SELECT pg_advisory_lock(:k)"), {"k": ADVISORY_LOCK_KEY})
+        try:
+            _ensure_version_table(lock_conn)
+            done = set(lock_conn.execute(text("SELECT version FROM schema_version")).scalars())
+
+            for migration in sorted(migrations, key=lambda m: m.version):
+                if migration.version in done:
+                    continue
+                if target is not None and migration.version > target:
+                    break
+
+                logger.info("Applying %r", migration)
+                if migration.transactional:
+                    with engine.begin() as conn:
+                        conn.execute(text("SET LOCAL statement_timeout = 0"))
+                        for step in migration.steps:
+                            _run_step(conn, step)
+                        _record(conn, migration)
+                else:
+                    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                        conn.execute(text("SET statement_timeout = 0"))
+                        for step in migration.steps:
+                            _run_step(conn, step)
+                        _record(conn, migration)
+                applied.append(migration)
+        finally:
+            lock_conn.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": ADVISORY_LOCK_KEY})
+    return applied
+
+
+def _record(conn: Connection, migration: Migration):
+    conn.execute(
+        text("INSERT INTO schema_version (version, name) VALUES (:v, :n)"),
+        {"v": migration.version, "n": migration.name},
+    )
+
+
+def check_schema_version(engine: Engine, migrations: list[Migration]):
+    """Cheap startup check for workers: one query, no DDL."""
+    head = max(m.version for m in migrations)
+    current = current_version(engine)
+    if current < head:
+        raise SchemaOutOfDate(
+            f"Database schema is at version {current}, this build expects {head}. "
+            "Run `python -m migrations upgrade` before starting workers."
+        )
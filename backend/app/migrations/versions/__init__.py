@@ -0,0 +1,45 @@
+from migrations.versions import (
+    v0001_baseline,
+    v0002_query_plan_indexes,
+    v0003_imei_keyset_indexes,
+    v0004_imei_code_backfill,
+    v0005_imei_secondary_code_index,
+    v0006_import_jobs,
+    v0007_stock_summary,
+    v0008_store_inventory_version,
+    v0009_inventory_change_log,
+    v0010_imei_link_int_keys_backfill,
+    v0011_imei_link_int_keys_swap,
+    v0012_imei_current_store,
+    v0013_stock_takes,
+    v0014_imei_code_search,
+    v0015_sale_order_ref,
+    v0016_stock_take_report,
+    v0017_imei_link_imei_id_indexes,
+    v0018_inventory_change_created_at,
+    v0019_imei_brand_model_keyset_indexes,
+    v0020_stock_summary_canonical_case,
+)
+
+MIGRATIONS = [
+    v0001_baseline.migration,
+    v0002_query_plan_indexes.migration,
+    v0003_imei_keyset_indexes.migration,
+    v0004_imei_code_backfill.migration,
+    v0005_imei_secondary_code_index.migration,
+    v0006_import_jobs.migration,
+    v0007_stock_summary.migration,
+    v0008_store_inventory_version.migration,
+    v0009_inventory_change_log.migration,
+    v0010_imei_link_int_keys_backfill.migration,
+    v0011_imei_link_int_keys_swap.migration,
+    v0012_imei_current_store.migration,
+    v0013_stock_takes.migration,
+    v0014_imei_code_search.migration,
+    v0015_sale_order_ref.migration,
+    v0016_stock_take_report.migration,
+    v0017_imei_link_imei_id_indexes.migration,
+    v0018_inventory_change_created_at.migration,
+    v0019_imei_brand_model_keyset_indexes.migration,
+    v0020_stock_summary_canonical_case.migration,
+]
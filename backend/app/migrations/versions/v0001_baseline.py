@@ -0,0 +1,34 @@
+"""Tables as created by SQLModel.metadata.create_all plus the legacy imei columns."""
+from sqlmodel import SQLModel
+
+# Import every model module so the metadata is complete.
+import models  # noqa: F401
+import models.blacklist  # noqa: F401
+import models.imei  # noqa: F401
+import models.import_job  # noqa: F401
+import models.inventory_change  # noqa: F401
+import models.purchase  # noqa: F401
+import models.sale  # noqa: F401
+import models.stock_request  # noqa: F401
+import models.stock_take  # noqa: F401
+import models.stock_summary  # noqa: F401
+import models.store_inventory_version  # noqa: F401
+from migrations.runner import Migration
+
+
+def create_tables(conn):
+    # On a fresh database this also creates tables that later migrations
+    # add, which is why those use IF NOT EXISTS / checkfirst.
+    SQLModel.metadata.create_all(conn)
+
+
+migration = Migration(
+    1,
+    "baseline",
+    [
+        create_tables,
+        # Older databases predate these columns; create_all does not ALTER.
+        "ALTER TABLE IF EXISTS imei ADD COLUMN IF NOT EXISTS vendor_id INTEGER",
+        "ALTER TABLE IF EXISTS imei ADD COLUMN IF NOT EXISTS storage_size VARCHAR",
+    ],
+)
@@ -0,0 +1,25 @@
+"""
+Indexes for the sequential scans found by `python -m bench.explain`.
+Built concurrently so a live database keeps serving writes.
+"""
+from migrations.runner import Migration, create_index_concurrently
+
+migration = Migration(
+    2,
+    "query_plan_indexes",
+    [
+        create_index_concurrently("ix_imei_code_lower_trim", "ON imei (lower(trim(code)))"),
+        create_index_concurrently("ix_sale_status_id", "ON sale (status, id)"),
+        create_index_concurrently(
+            "ix_sale_completed_customer",
+            "ON sale (customer_phone) INCLUDE (id, amount, created_at) "
+            "WHERE status = 'completed' AND customer_phone <> ''",
+        ),
+        create_index_concurrently("ix_stock_request_status_id", "ON stock_request (status, id)"),
+        # Expression indexes get statistics only from ANALYZE; without them
+        # lower(trim(code)) lookups are estimated at thousands of rows.
+        "ANALYZE imei",
+        "ANALYZE sale",
+    ],
+    transactional=False,
+)
@@ -0,0 +1,18 @@
+"""
+Composite (filter, created_at, id) indexes for the keyset-paginated IMEI
+listing, so each page is an index range scan of pageSize rows whatever
+the filter combination or depth.
+"""
+from migrations.runner import Migration, create_index_concurrently
+
+migration = Migration(
+    3,
+    "imei_keyset_indexes",
+    [
+        create_index_concurrently("ix_imei_created_at_id", "ON imei (created_at, id)"),
+        create_index_concurrently("ix_imei_brand_model_created_at", "ON imei (brand, model, created_at, id)"),
+        create_index_concurrently("ix_imei_storage_size_created_at", "ON imei (storage_size, created_at, id)"),
+        create_index_concurrently("ix_imei_vendor_created_at", "ON imei (vendor_id, created_at, id)"),
+    ],
+    transactional=False,
+)
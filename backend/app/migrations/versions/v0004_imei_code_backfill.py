@@ -0,0 +1,74 @@
+"""
+Rewrites stored IMEI codes into the canonical form of core/imei_codes.py
+(no whitespace or hyphens, upper case) so lookups can be plain equality
+matches on the unique index, and adds imei.secondary_code for the second
+IMEI of dual-SIM phones.
+
+Link tables reference imei.code without ON UPDATE CASCADE, so their foreign
+keys are dropped and re-created around the rewrite; that only happens when
+some code actually changes. Two codes that collapse into the same canonical
+code must be merged by hand first; the migration stops and lists them.
+"""
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from migrations.runner import Migration
+
+# SQL twin of core.imei_codes.normalize().
+NORMALIZE = "upper(regexp_replace({col}, '[[:space:]-]+', '', 'g'))"
+
+
+def _refuse_collisions(conn: Connection):
+    clashes = conn.execute(
+        text(
+            f"SELECT {NORMALIZE.format(col='code')} AS canonical, array_agg(code ORDER BY id) "
+            "FROM imei GROUP BY 1 HAVING count(*) > 1 LIMIT 20"
+        )
+    ).all()
+    if clashes:
+        listing = "; ".join(f"{canonical}: {', '.join(codes)}" for canonical, codes in clashes)
+        raise RuntimeError(f"IMEI codes that normalise to the same code must be merged first: {listing}")
+
+
+def _normalize_codes(conn: Connection):
+    changed = conn.execute(
+        text(f"SELECT 1 FROM imei WHERE code <> {NORMALIZE.format(col='code')} LIMIT 1")
+    ).first()
+    if changed:
+        references = conn.execute(
+            text(
+                "SELECT c.conname, c.conrelid::regclass::text, a.attname, pg_get_constraintdef(c.oid) "
+                "FROM pg_constraint c "
+                "JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = c.conkey[1] "
+                "JOIN pg_attribute r ON r.attrelid = c.confrelid AND r.attnum = c.confkey[1] "
+                "WHERE c.contype = 'f' AND c.confrelid = 'imei'::regclass AND r.attname = 'code'"
+            )
+        ).all()
+        for name, table, _, _ in references:
+            conn.execute(text(f'ALTER TABLE {table} DROP CONSTRAINT "{name}"'))
+        for _, table, column, _ in references:
+            canonical = NORMALIZE.format(col=column)
+            conn.execute(text(f"UPDATE {table} SET {column} = {canonical} WHERE {column} <> {canonical}"))
+        conn.execute(text(f"UPDATE imei SET code = {NORMALIZE.format(col='code')} WHERE code <> {NORMALIZE.format(col='code')}"))
+        for name, table, _, definition in references:
+            conn.execute(text(f'ALTER TABLE {table} ADD CONSTRAINT "{name}" {definition}'))
+
+    canonical = NORMALIZE.format(col="imei_code")
+    conn.execute(text(f"UPDATE sale SET imei_code = {canonical} WHERE imei_code <> {canonical}"))
+    for column in ("requested_imeis", "transferred_imeis", "received_imeis"):
+        canonical = (
+            f"array_to_string(ARRAY(SELECT {NORMALIZE.format(col='c')} "
+            f"FROM unnest(string_to_array({column}, ',')) c WHERE btrim(c) <> ''), ',')"
+        )
+        conn.execute(text(f"UPDATE stock_request SET {column} = {canonical} WHERE {column} <> {canonical}"))
+
+
+migration = Migration(
+    4,
+    "imei_code_backfill",
+    [
+        "ALTER TABLE imei ADD COLUMN IF NOT EXISTS secondary_code VARCHAR",
+        _refuse_collisions,
+        _normalize_codes,
+    ],
+)
@@ -0,0 +1,16 @@
+"""
+Unique index for dual-SIM lookups on imei.secondary_code. With every code
+canonical (migration 0004) the lower(trim(code)) expression index has no
+reader left and is dropped.
+"""
+from migrations.runner import Migration, create_index_concurrently
+
+migration = Migration(
+    5,
+    "imei_secondary_code_index",
+    [
+        create_index_concurrently("ix_imei_secondary_code", "ON imei (secondary_code)", unique=True),
+        "DROP INDEX CONCURRENTLY IF EXISTS ix_imei_code_lower_trim",
+    ],
+    transactional=False,
+)
@@ -0,0 +1,10 @@
+"""Table for background stock-file imports (core/stock_import.py)."""
+from migrations.runner import Migration
+from models.import_job import ImportJob
+
+
+def create_import_job(conn):
+    ImportJob.__table__.create(conn, checkfirst=True)
+
+
+migration = Migration(6, "import_jobs", [create_import_job])
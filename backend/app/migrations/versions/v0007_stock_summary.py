@@ -0,0 +1,53 @@
+"""
+stock_summary table (see crud/inventory.py), filled from the current
+StoreImeiLink rows, and the storeimeilink (imei_id) index its per-IMEI
+bucket counts need. Run it with writers stopped: stock moved between the
+rebuild and the new code going live would not be counted.
+
+Databases created after v0012 have no storeimeilink; both of its steps
+then do nothing.
+"""
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from migrations.runner import Migration, create_index_concurrently
+from models.stock_summary import StockSummary
+
+# The stock summary rebuild as of this version, when store links were keyed by code.
+REBUILD_FROM_LINKS_SQL = """
+DELETE FROM stock_summary;
+INSERT INTO stock_summary (store_id, brand, model, storage_size, quantity, updated_at)
+SELECT l.store_id, i.brand, i.model, coalesce(i.storage_size, ''), count(*), now()
+FROM storeimeilink l JOIN imei i ON i.code = l.imei_id
+GROUP BY 1, 2, 3, 4
+"""
+
+
+def _has_store_links(conn: Connection) -> bool:
+    return conn.execute(text("SELECT to_regclass('storeimeilink')")).scalar() is not None
+
+
+def create_link_index(conn: Connection):
+    if _has_store_links(conn):
+        create_index_concurrently("ix_storeimeilink_imei_id", "ON storeimeilink (imei_id)")(conn)
+
+
+def create_stock_summary(conn):
+    StockSummary.__table__.create(conn, checkfirst=True)
+
+
+def rebuild(conn: Connection):
+    if _has_store_links(conn):
+        conn.execute(text(REBUILD_FROM_LINKS_SQL))
+
+
+migration = Migration(
+    7,
+    "stock_summary",
+    [
+        create_link_index,
+        create_stock_summary,
+        rebuild,
+    ],
+    transactional=False,
+)
@@ -0,0 +1,10 @@
+"""Per-store inventory versions for ETag'd store inventory responses (crud/inventory.py)."""
+from migrations.runner import Migration
+from models.store_inventory_version import StoreInventoryVersion
+
+
+def create_store_inventory_version(conn):
+    StoreInventoryVersion.__table__.create(conn, checkfirst=True)
+
+
+migration = Migration(8, "store_inventory_version", [create_store_inventory_version])
@@ -0,0 +1,22 @@
+"""
+inventory_change log for delta sync (crud/inventory.py). Stores start with
+changes_floor at their current version: nothing before it was logged, so
+older cursors get a full snapshot.
+"""
+from migrations.runner import Migration
+from models.inventory_change import InventoryChange
+
+
+def create_inventory_change(conn):
+    InventoryChange.__table__.create(conn, checkfirst=True)
+
+
+migration = Migration(
+    9,
+    "inventory_change_log",
+    [
+        "ALTER TABLE store_inventory_version ADD COLUMN IF NOT EXISTS changes_floor INTEGER NOT NULL DEFAULT 0",
+        "UPDATE store_inventory_version SET changes_floor = version",
+        create_inventory_change,
+    ],
+)
@@ -0,0 +1,124 @@
+"""
+First half of moving the IMEI link tables from imei.code (varchar) to
+imei.id (integer) keys; v0011 is the cutover. This half is online: it runs
+while the previous build keeps serving and writing links by code.
+
+Each link table gets an imei_ref column, kept filled for new rows by a
+trigger that looks the code up in imei, and is backfilled in batches of
+BATCH rows in primary-key order, one short transaction each. The unique
+index that becomes the new primary key, the per-IMEI index, the NOT NULL
+check and the foreign key to imei.id are then built or validated without
+blocking writes (CREATE INDEX CONCURRENTLY, NOT VALID + VALIDATE).
+
+On a database created by this build the link tables already have integer
+keys and every step does nothing.
+"""
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from migrations.runner import Migration, create_index_concurrently
+
+BATCH = 5000
+
+# link table -> the other column of its primary key
+LINK_TABLES = {
+    "storeimeilink": "store_id",
+    "purchaseimeilink": "purchase_id",
+    "transactionimeilink": "transaction_id",
+}
+
+TRIGGER_FUNCTION = """
+CREATE OR REPLACE FUNCTION link_imei_ref() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    NEW.imei_ref := (SELECT id FROM imei WHERE code = NEW.imei_id);
+    RETURN NEW;
+END $$
+"""
+
+
+def keyed_by_code(conn: Connection, table: str) -> bool:
+    """True while the table's imei_id still holds codes."""
+    return conn.execute(
+        text(
+            "SELECT 1 FROM information_schema.columns "
+            "WHERE table_name = :t AND column_name = 'imei_id' AND data_type = 'character varying'"
+        ),
+        {"t": table},
+    ).first() is not None
+
+
+def _add_columns(conn: Connection):
+    conn.execute(text(TRIGGER_FUNCTION))
+    for table in LINK_TABLES:
+        if not keyed_by_code(conn, table):
+            continue
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS imei_ref INTEGER"))
+        conn.execute(text(f"DROP TRIGGER IF EXISTS {table}_imei_ref ON {table}"))
+        conn.execute(text(
+            f"CREATE TRIGGER {table}_imei_ref BEFORE INSERT OR UPDATE OF imei_id ON {table} "
+            "FOR EACH ROW EXECUTE FUNCTION link_imei_ref()"
+        ))
+
+
+def _backfill(conn: Connection):
+    for table, key in LINK_TABLES.items():
+        if not keyed_by_code(conn, table):
+            continue
+        # Walks the primary key; each statement updates one batch and returns its last key.
+        step = (
+            f"WITH batch AS ("
+            f" SELECT {key}, imei_id FROM {table} {{after}} ORDER BY {key}, imei_id LIMIT {BATCH}"
+            f"), filled AS ("
+            f" UPDATE {table} l SET imei_ref = i.id FROM batch b JOIN imei i ON i.code = b.imei_id"
+            f" WHERE l.{key} = b.{key} AND l.imei_id = b.imei_id AND l.imei_ref IS NULL"
+            f") SELECT {key}, imei_id FROM batch ORDER BY {key} DESC, imei_id DESC LIMIT 1"
+        )
+        last = conn.execute(text(step.format(after=""))).first()
+        while last is not None:
+            last = conn.execute(
+                text(step.format(after=f"WHERE ({key}, imei_id) > (:key, :code)")),
+                {"key": last[0], "code": last[1]},
+            ).first()
+
+
+def _for_code_keyed(table: str, step):
+    def run(conn: Connection):
+        if keyed_by_code(conn, table):
+            step(conn)
+
+    run.__name__ = step.__name__
+    return run
+
+
+def _constrain(conn: Connection):
+    for table in LINK_TABLES:
+        if not keyed_by_code(conn, table):
+            continue
+        constraints = {
+            f"{table}_imei_ref_not_null": "CHECK (imei_ref IS NOT NULL)",
+            f"{table}_imei_ref_fkey": "FOREIGN KEY (imei_ref) REFERENCES imei (id)",
+        }
+        for name, definition in constraints.items():
+            exists = conn.execute(text("SELECT 1 FROM pg_constraint WHERE conname = :n"), {"n": name}).first()
+            if not exists:
+                conn.execute(text(f"ALTER TABLE {table} ADD CONSTRAINT {name} {definition} NOT VALID"))
+            conn.execute(text(f"ALTER TABLE {table} VALIDATE CONSTRAINT {name}"))
+
+
+migration = Migration(
+    10,
+    "imei_link_int_keys_backfill",
+    [
+        _add_columns,
+        _backfill,
+        *(
+            _for_code_keyed(table, create_index_concurrently(f"{table}_imei_ref_key", f"ON {table} ({key}, imei_ref)", unique=True))
+            for table, key in LINK_TABLES.items()
+        ),
+        _for_code_keyed(
+            "storeimeilink", create_index_concurrently("ix_storeimeilink_imei_ref", "ON storeimeilink (imei_ref)")
+        ),
+        _constrain,
+    ],
+    transactional=False,
+)
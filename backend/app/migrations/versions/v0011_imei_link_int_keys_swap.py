@@ -0,0 +1,44 @@
+"""
+Cutover of the IMEI link tables to imei.id keys, prepared by v0010: in one
+transaction, under a brief exclusive lock, imei_ref replaces imei_id as the
+column, primary key and foreign key. Only catalog changes are left at this
+point (NOT NULL is proven by the validated check), so the lock is held for
+milliseconds, not for a table scan.
+
+Link writes from the previous build fail from here on; start the new build
+right after.
+"""
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from migrations.runner import Migration
+from migrations.versions.v0010_imei_link_int_keys_backfill import LINK_TABLES, keyed_by_code
+
+
+def _swap(conn: Connection):
+    tables = [table for table in LINK_TABLES if keyed_by_code(conn, table)]
+    if tables:
+        conn.execute(text(f"LOCK TABLE {', '.join(tables)} IN ACCESS EXCLUSIVE MODE"))
+    for table in tables:
+        pkey = conn.execute(
+            text("SELECT conname FROM pg_constraint WHERE conrelid = CAST(:t AS regclass) AND contype = 'p'"),
+            {"t": table},
+        ).scalar()
+        for sql in (
+            f"ALTER TABLE {table} ALTER COLUMN imei_ref SET NOT NULL",
+            f"ALTER TABLE {table} DROP CONSTRAINT {table}_imei_ref_not_null",
+            f"DROP TRIGGER {table}_imei_ref ON {table}",
+            f'ALTER TABLE {table} DROP CONSTRAINT "{pkey}"',
+            # Also drops the code foreign key and ix_storeimeilink_imei_id.
+            f"ALTER TABLE {table} DROP COLUMN imei_id",
+            f"ALTER TABLE {table} RENAME COLUMN imei_ref TO imei_id",
+            f'ALTER TABLE {table} ADD CONSTRAINT "{pkey}" PRIMARY KEY USING INDEX {table}_imei_ref_key',
+            f"ALTER TABLE {table} RENAME CONSTRAINT {table}_imei_ref_fkey TO {table}_imei_id_fkey",
+        ):
+            conn.execute(text(sql))
+    if "storeimeilink" in tables:
+        conn.execute(text("ALTER INDEX ix_storeimeilink_imei_ref RENAME TO ix_storeimeilink_imei_id"))
+    conn.execute(text("DROP FUNCTION IF EXISTS link_imei_ref()"))
+
+
+migration = Migration(11, "imei_link_int_keys_swap", [_swap])
@@ -0,0 +1,91 @@
+"""
+Replaces the store <-> IMEI many-to-many (storeimeilink) with
+imei.current_store_id and imei.status (in_stock / in_transit / sold, see
+models/imei.py), then drops storeimeilink. Run it with writers stopped.
+
+Backfill, in order:
+  - linked phones are in_stock in their store; one linked to several
+    stores (possible before) keeps the lowest store id, and the count is logged
+  - other phones with a sale are sold from the store of their last sale
+  - other phones on a pending purchase are in_transit to its store
+  - anything else is in_transit with no store
+  - phones on a transferred, not yet received stock request are in_transit
+    from its source store
+
+Stock summaries are rebuilt, and every store's inventory version and
+changes_floor are bumped so cached snapshots and delta-sync cursors from
+before are not reused.
+"""
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from migrations.runner import Migration, create_index_concurrently
+
+logger = logging.getLogger(__name__)
+
+BACKFILL = [
+    # Linked phones.
+    "UPDATE imei i SET current_store_id = l.store_id, status = 'in_stock' "
+    "FROM (SELECT DISTINCT ON (imei_id) imei_id, store_id FROM storeimeilink ORDER BY imei_id, store_id) l "
+    "WHERE i.id = l.imei_id",
+    # Sold ones.
+    "UPDATE imei i SET current_store_id = s.store_id, status = 'sold' "
+    "FROM (SELECT DISTINCT ON (imei_code) imei_code, store_id FROM sale ORDER BY imei_code, created_at DESC) s "
+    "WHERE i.code = s.imei_code AND i.current_store_id IS NULL",
+    # Bought on a pending purchase (status stays in_transit).
+    "UPDATE imei i SET current_store_id = p.store_id "
+    "FROM purchaseimeilink pl JOIN purchase p ON p.id = pl.purchase_id "
+    "WHERE pl.imei_id = i.id AND p.status = 'pending' AND i.current_store_id IS NULL",
+    # On their way between stores.
+    "UPDATE imei i SET status = 'in_transit' "
+    "FROM stock_request r, unnest(string_to_array(r.transferred_imeis, ',')) c "
+    "WHERE r.status = 'transferred' AND i.code = c AND i.current_store_id = r.source_store_id "
+    "AND i.status = 'in_stock'",
+]
+
+# Frozen copy of crud.inventory.REBUILD_SQL as of this version.
+REBUILD_SQL = """
+DELETE FROM stock_summary;
+INSERT INTO stock_summary (store_id, brand, model, storage_size, quantity, updated_at)
+SELECT current_store_id, brand, model, coalesce(storage_size, ''), count(*), now()
+FROM imei WHERE status = 'in_stock' AND current_store_id IS NOT NULL
+GROUP BY 1, 2, 3, 4
+"""
+
+
+def _add_columns(conn: Connection):
+    conn.execute(text("ALTER TABLE imei ADD COLUMN IF NOT EXISTS current_store_id INTEGER REFERENCES store (id)"))
+    # Everything starts out of stock; the backfill puts linked phones back.
+    conn.execute(text("ALTER TABLE imei ADD COLUMN IF NOT EXISTS status VARCHAR NOT NULL DEFAULT 'in_transit'"))
+
+
+def _backfill(conn: Connection):
+    if conn.execute(text("SELECT to_regclass('storeimeilink')")).scalar() is None:
+        return
+    doubles = conn.execute(
+        text("SELECT count(*) FROM (SELECT imei_id FROM storeimeilink GROUP BY imei_id HAVING count(*) > 1) d")
+    ).scalar()
+    if doubles:
+        logger.warning("%s IMEIs were linked to more than one store; each keeps the lowest store id", doubles)
+    for sql in BACKFILL:
+        conn.execute(text(sql))
+
+
+migration = Migration(
+    12,
+    "imei_current_store",
+    [
+        _add_columns,
+        _backfill,
+        "ALTER TABLE imei ALTER COLUMN status DROP DEFAULT",
+        create_index_concurrently(
+            "ix_imei_current_store_status", "ON imei (current_store_id, status, created_at, id)"
+        ),
+        REBUILD_SQL,
+        "UPDATE store_inventory_version SET version = version + 1, changes_floor = version + 1",
+        "DROP TABLE IF EXISTS storeimeilink",
+    ],
+    transactional=False,
+)
@@ -0,0 +1,11 @@
+"""Tables for stock-take sessions (crud/stock_take.py)."""
+from migrations.runner import Migration
+from models.stock_take import StockTake, StockTakeScan
+
+
+def create_stock_take(conn):
+    StockTake.__table__.create(conn, checkfirst=True)
+    StockTakeScan.__table__.create(conn, checkfirst=True)
+
+
+migration = Migration(13, "stock_takes", [create_stock_take])
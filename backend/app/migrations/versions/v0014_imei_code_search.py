@@ -0,0 +1,47 @@
+"""
+Indexes for partial IMEI search (GET /api/imeis/search):
+
+  ix_imei_code_reverse  btree on reverse(code), so "ends with" is a prefix range scan
+  ix_imei_code_trgm     pg_trgm GIN on code, for "contains"
+
+The trigram index needs the pg_trgm extension (in postgres-contrib, shipped
+with the official images). Where it is not available, or the migration role
+may not create it, the index is skipped with a warning and search matches
+suffixes only. To add it later, create the extension and then
+
+  CREATE INDEX CONCURRENTLY ix_imei_code_trgm ON imei USING gin (code gin_trgm_ops);
+
+search uses it from the next restart.
+"""
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import DBAPIError
+
+from migrations.runner import Migration, create_index_concurrently
+
+logger = logging.getLogger(__name__)
+
+
+def _create_trigram_index(conn: Connection):
+    if conn.execute(text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")).first() is None:
+        logger.warning("pg_trgm is not available; IMEI search will match suffixes only")
+        return
+    try:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    except DBAPIError as e:
+        logger.warning("Could not create pg_trgm (%s); IMEI search will match suffixes only", e.orig)
+        return
+    create_index_concurrently("ix_imei_code_trgm", "ON imei USING gin (code gin_trgm_ops)")(conn)
+
+
+migration = Migration(
+    14,
+    "imei_code_search",
+    [
+        create_index_concurrently("ix_imei_code_reverse", "ON imei (reverse(code) text_pattern_ops)"),
+        _create_trigram_index,
+    ],
+    transactional=False,
+)
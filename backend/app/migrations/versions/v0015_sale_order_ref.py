@@ -0,0 +1,12 @@
+"""sale.order_ref, shared by the sales of one multi-item checkout (POST /api/sales/batch)."""
+from migrations.runner import Migration, create_index_concurrently
+
+migration = Migration(
+    15,
+    "sale_order_ref",
+    [
+        "ALTER TABLE sale ADD COLUMN IF NOT EXISTS order_ref VARCHAR",
+        create_index_concurrently("ix_sale_order_ref", "ON sale (order_ref)"),
+    ],
+    transactional=False,
+)
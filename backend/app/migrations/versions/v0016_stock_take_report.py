@@ -0,0 +1,8 @@
+"""stock_take.report: the reconciliation lists frozen when a stock take is closed."""
+from migrations.runner import Migration
+
+migration = Migration(
+    16,
+    "stock_take_report",
+    ["ALTER TABLE stock_take ADD COLUMN IF NOT EXISTS report JSON"],
+)
@@ -0,0 +1,16 @@
+"""
+Per-IMEI indexes on purchaseimeilink and transactionimeilink. Their
+primary keys lead with the purchase / transaction, so deleting an imei
+scanned both tables for the foreign-key check.
+"""
+from migrations.runner import Migration, create_index_concurrently
+
+migration = Migration(
+    17,
+    "imei_link_imei_id_indexes",
+    [
+        create_index_concurrently("ix_purchaseimeilink_imei_id", "ON purchaseimeilink (imei_id)"),
+        create_index_concurrently("ix_transactionimeilink_imei_id", "ON transactionimeilink (imei_id)"),
+    ],
+    transactional=False,
+)
@@ -0,0 +1,9 @@
+"""Index for pruning the inventory change log by age (prune_inventory_changes.py)."""
+from migrations.runner import Migration, create_index_concurrently
+
+migration = Migration(
+    18,
+    "inventory_change_created_at",
+    [create_index_concurrently("ix_inventory_change_created_at", "ON inventory_change (created_at)")],
+    transactional=False,
+)
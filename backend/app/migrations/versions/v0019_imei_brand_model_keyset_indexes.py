@@ -0,0 +1,17 @@
+"""
+Keyset indexes for the IMEI listing filtered by brand alone or model alone.
+(brand, model, created_at, id) serves both filters together; brand alone
+could not page through it in (created_at, id) order and model alone could
+not use it at all, so both sorted every matching row.
+"""
+from migrations.runner import Migration, create_index_concurrently
+
+migration = Migration(
+    19,
+    "imei_brand_model_keyset_indexes",
+    [
+        create_index_concurrently("ix_imei_brand_created_at", "ON imei (brand, created_at, id)"),
+        create_index_concurrently("ix_imei_model_created_at", "ON imei (model, created_at, id)"),
+    ],
+    transactional=False,
+)
@@ -0,0 +1,17 @@
+"""
+Rebuilds stock_summary with brand and model lowercased, the case
+InventoryCRUD now writes, so stock lookups are primary-key lookups instead
+of lower() comparisons over the store's rows.
+"""
+from migrations.runner import Migration
+
+# Frozen copy of crud.inventory.REBUILD_SQL as of this version.
+REBUILD_SQL = """
+DELETE FROM stock_summary;
+INSERT INTO stock_summary (store_id, brand, model, storage_size, quantity, updated_at)
+SELECT current_store_id, lower(brand), lower(model), coalesce(storage_size, ''), count(*), now()
+FROM imei WHERE status = 'in_stock' AND current_store_id IS NOT NULL
+GROUP BY 1, 2, 3, 4
+"""
+
+migration = Migration(20, "stock_summary_canonical_case", [REBUILD_SQL])
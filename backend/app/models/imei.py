@@ -1,24 +1,60 @@
+from sqlalchemy import Index, text
 from sqlmodel import SQLModel, Field, Relationship
 from datetime import datetime
-from .links import StoreImeiLink, TransactionImeiLink, PurchaseImeiLink
+from .links import TransactionImeiLink, PurchaseImeiLink
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 if TYPE_CHECKING:
     from models.transaction import Transaction
     from models.store import Store
     from models.purchase import Purchase
 
+IN_STOCK = "in_stock"
+IN_TRANSIT = "in_transit"
+SOLD = "sold"
+
+
 class Imei(SQLModel, table=True):
+    __table_args__ = (
+        # Keyset pages of ImeiCRUD.page, unfiltered and per filter.
+        Index("ix_imei_created_at_id", "created_at", "id"),
+        Index("ix_imei_brand_model_created_at", "brand", "model", "created_at", "id"),
+        Index("ix_imei_brand_created_at", "brand", "created_at", "id"),
+        Index("ix_imei_model_created_at", "model", "created_at", "id"),
+        Index("ix_imei_storage_size_created_at", "storage_size", "created_at", "id"),
+        Index("ix_imei_vendor_created_at", "vendor_id", "created_at", "id"),
+        # A store's inventory (and its keyset pages) as one range scan.
+        Index("ix_imei_current_store_status", "current_store_id", "status", "created_at", "id"),
+        # Typeahead on the last digits (ImeiCRUD.search) as a prefix range scan.
+        # Substring search also uses ix_imei_code_trgm, built by migration 0014
+        # only where the pg_trgm extension is available.
+        Index("ix_imei_code_reverse", text("reverse(code) text_pattern_ops")),
+    )
+
     id: int | None = Field(default=None, primary_key=True)
-    code: str = Field(index=True, unique=True)
+    code: str = Field(index=True, unique=True)       # canonical, see core/imei_codes.py
+    secondary_code: str | None = Field(default=None, index=True, unique=True)  # second IMEI of a dual-SIM phone
     vendor_id: int | None = Field(default=None, foreign_key="vendor.id")
     brand: str
     model: str
     storage_size: str | None = Field(default=None)
+    # Where the phone is. in_stock: sellable in current_store_id.
+    # in_transit: sellable nowhere yet; on a transfer out of current_store_id,
+    # or bought on a purchase that is not completed (current_store_id is its store).
+    # sold: sold from current_store_id.
+    current_store_id: int | None = Field(default=None, foreign_key="store.id")
+    status: str = Field(default=IN_STOCK)
     created_at: datetime = Field(default_factory=datetime.now)
     updated_at: datetime = Field(default_factory=datetime.now, sa_column_kwargs={"onupdate": datetime.now})
 
-    stores: list["Store"] = Relationship(back_populates="imeis", link_model=StoreImeiLink)
+    current_store: Optional["Store"] = Relationship(back_populates="imeis")
     transactions: list["Transaction"] = Relationship(back_populates="imeis", link_model=TransactionImeiLink)
     purchases: list["Purchase"] = Relationship(back_populates="imeis", link_model=PurchaseImeiLink)
+
+    @property
+    def stores(self) -> list["Store"]:
+        """The store the phone is in stock at, as the list ReadImei has always returned."""
+        if self.status == IN_STOCK and self.current_store is not None:
+            return [self.current_store]
+        return []
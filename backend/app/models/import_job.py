@@ -0,0 +1,36 @@
+from datetime import datetime
+from sqlalchemy import JSON, Column
+from sqlmodel import Field, SQLModel
+
+
+class ImportJob(SQLModel, table=True):
+    """
+    One uploaded stock file (CSV / XLSX of IMEIs) being loaded into a store
+    in the background by core.stock_import. Counters are updated after
+    every chunk so the status endpoint can report progress.
+    """
+    __tablename__ = "import_job"
+
+    id: int | None = Field(default=None, primary_key=True)
+    filename: str
+    path: str                                   # the upload on disk
+    store_id: int = Field(foreign_key="store.id")
+    vendor_id: int | None = Field(default=None, foreign_key="vendor.id")
+    # Defaults for rows whose file has no brand / model / storage column.
+    brand: str = ""
+    model: str = ""
+    storage_size: str | None = None
+
+    # queued → running → completed | failed
+    status: str = Field(default="queued")
+    rows_processed: int = 0
+    rows_created: int = 0
+    rows_updated: int = 0
+    rows_rejected: int = 0
+    # "row N: code: reason", first IMPORT_MAX_ERRORS only.
+    errors: list[str] = Field(default_factory=list, sa_column=Column(JSON, nullable=False, default=list))
+    detail: str = ""                            # why a failed job failed
+
+    created_at: datetime = Field(default_factory=datetime.now)
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
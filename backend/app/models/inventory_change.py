@@ -0,0 +1,27 @@
+from datetime import datetime
+from sqlalchemy import BigInteger, Column, Index
+from sqlmodel import Field, SQLModel
+
+
+class InventoryChange(SQLModel, table=True):
+    """
+    Append-only log of IMEIs entering ("added") or leaving ("removed") a
+    store, written by InventoryCRUD in the same transaction as the move.
+    `version` is the store's inventory version after that transaction, so
+    one store's changes are ordered by commit and a client can resume from
+    the version it last saw (GET /api/imeis/stores/{id}/changes).
+    Rows older than the retention are pruned by prune_inventory_changes.py.
+    """
+    __tablename__ = "inventory_change"
+    __table_args__ = (
+        Index("ix_inventory_change_store_version", "store_id", "version"),
+        # The daily prune deletes by age as a range scan, not a full scan.
+        Index("ix_inventory_change_created_at", "created_at"),
+    )
+
+    id: int | None = Field(default=None, sa_column=Column(BigInteger, primary_key=True, autoincrement=True))
+    store_id: int = Field(foreign_key="store.id")
+    version: int
+    imei_code: str
+    change: str                                 # "added" | "removed"
+    created_at: datetime = Field(default_factory=datetime.now)
@@ -9,17 +9,15 @@ class PermissionUserLink(SQLModel, table=True):
     user_id: int | None = Field(default=None, foreign_key="user.id", primary_key=True)
     permission_id: int | None = Field(default=None, foreign_key="permission.id", primary_key=True)
 
-class StoreImeiLink(SQLModel, table=True):
-    store_id: int | None = Field(default=None, foreign_key="store.id", primary_key=True)
-    imei_id: str | None = Field(default=None, foreign_key="imei.code", primary_key=True)
-
 class TransactionImeiLink(SQLModel, table=True):
     transaction_id: uuid.UUID | None = Field(default=None, foreign_key="transaction.code", primary_key=True)
-    imei_id: str | None = Field(default=None, foreign_key="imei.code", primary_key=True)
+    # Indexed for the phone's history and the foreign-key check on imei deletes.
+    imei_id: int | None = Field(default=None, foreign_key="imei.id", primary_key=True, index=True)
 
 
 class PurchaseImeiLink(SQLModel, table=True):
     purchase_id: int | None = Field(
         default=None, foreign_key="purchase.id", primary_key=True
     )
-    imei_id: str | None = Field(default=None, foreign_key="imei.code", primary_key=True)
+    # Indexed for the phone's history and the foreign-key check on imei deletes.
+    imei_id: int | None = Field(default=None, foreign_key="imei.id", primary_key=True, index=True)
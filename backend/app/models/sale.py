@@ -1,4 +1,5 @@
 from datetime import datetime
+from sqlalchemy import Index, text
 from sqlmodel import Field, SQLModel
 
 
@@ -9,6 +10,17 @@ class Sale(SQLModel, table=True):
     receipt_path stores the server-relative path to the uploaded receipt image.
     """
     __tablename__ = "sale"
+    __table_args__ = (
+        # Sales list filtered by status, newest first.
+        Index("ix_sale_status_id", "status", "id"),
+        # Customer list: index-only aggregation per phone over completed sales.
+        Index(
+            "ix_sale_completed_customer",
+            "customer_phone",
+            postgresql_include=["id", "amount", "created_at"],
+            postgresql_where=text("status = 'completed' AND customer_phone <> ''"),
+        ),
+    )
 
     id: int | None = Field(default=None, primary_key=True)
 
@@ -26,6 +38,8 @@ class Sale(SQLModel, table=True):
     amount: float = 0.0
     notes: str = ""
     status: str = Field(default="completed")  # completed | cancelled
+    # Shared by the sales of one multi-item checkout (POST /api/sales/batch).
+    order_ref: str | None = Field(default=None, index=True)
 
     # Customer info
     customer_name: str = ""
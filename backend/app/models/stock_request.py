@@ -1,9 +1,14 @@
 from datetime import datetime
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel
 
 
 class StockRequest(SQLModel, table=True):
     __tablename__ = "stock_request"
+    __table_args__ = (
+        # Stock request list filtered by status, newest first.
+        Index("ix_stock_request_status_id", "status", "id"),
+    )
 
     id: int | None = Field(default=None, primary_key=True)
     source_store_id: int = Field(index=True)
@@ -0,0 +1,21 @@
+from datetime import datetime
+from sqlmodel import Field, SQLModel
+
+
+class StockSummary(SQLModel, table=True):
+    """
+    Phones in stock per store and brand / model / storage: the in-stock Imei
+    rows grouped by current_store_id and bucket. InventoryCRUD keeps it in step in
+    the same transaction as every stock movement, so stock levels are one
+    primary-key lookup instead of a count over the inventory. Brand and
+    model are stored lowercased, so "Apple" and "apple" phones share a row
+    and lookups compare the key columns directly.
+    """
+    __tablename__ = "stock_summary"
+
+    store_id: int = Field(foreign_key="store.id", primary_key=True)
+    brand: str = Field(primary_key=True)
+    model: str = Field(primary_key=True)
+    storage_size: str = Field(default="", primary_key=True)   # "" when the IMEI has none
+    quantity: int = 0
+    updated_at: datetime = Field(default_factory=datetime.now)
@@ -0,0 +1,51 @@
+from datetime import datetime
+from sqlalchemy import JSON, Column, Index
+from sqlmodel import Field, SQLModel
+
+
+class StockTake(SQLModel, table=True):
+    """
+    A physical count of one store. Any number of handhelds stream scanned
+    codes into it (StockTakeScan); crud.stock_take reconciles the scans
+    against the phones in stock there. Closing it freezes the counters
+    and lists below and rejects further scans.
+    """
+    __tablename__ = "stock_take"
+
+    id: int | None = Field(default=None, primary_key=True)
+    store_id: int = Field(foreign_key="store.id", index=True)
+    note: str = ""
+
+    # open → closed
+    status: str = Field(default="open")
+    # Counters as of closing; while open they are computed live.
+    expected: int = 0
+    counted: int = 0
+    missing: int = 0
+    wrong_store: int = 0
+    unexpected: int = 0
+    scanned: int = 0
+    # The missing / wrong_store / unexpected lists as of closing (see
+    # StockTakeCRUD.report); None while open.
+    report: dict | None = Field(default=None, sa_column=Column(JSON))
+
+    created_at: datetime = Field(default_factory=datetime.now)
+    closed_at: datetime | None = None
+
+
+class StockTakeScan(SQLModel, table=True):
+    """
+    One distinct code scanned during a stock take, whoever scanned it
+    first. imei_id is the phone it resolved to when scanned, None for a
+    code the system does not know.
+    """
+    __tablename__ = "stock_take_scan"
+    __table_args__ = (
+        Index("ix_stock_take_scan_imei", "stock_take_id", "imei_id"),
+    )
+
+    stock_take_id: int = Field(foreign_key="stock_take.id", primary_key=True)
+    code: str = Field(primary_key=True)         # canonical (core.imei_codes.normalize)
+    imei_id: int | None = Field(default=None, foreign_key="imei.id")
+    scanned_by: str = ""                        # the handheld / user that sent it
+    scanned_at: datetime = Field(default_factory=datetime.now)
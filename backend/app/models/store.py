@@ -6,8 +6,7 @@ if TYPE_CHECKING:
     from models.client import Client
     from models.imei import Imei
     from models.transaction import Transaction
-    
-from .links import StoreImeiLink
+
 
 class Store(SQLModel, table=True):
     id: int | None = Field(default=None, primary_key=True)
@@ -20,5 +19,6 @@ class Store(SQLModel, table=True):
     client_id: int | None = Field(default=None, foreign_key="client.id")
 
     client: "Client" = Relationship(back_populates="stores", cascade_delete=False)
-    imeis: list["Imei"] = Relationship(back_populates="stores", link_model=StoreImeiLink, cascade_delete=False)
+    # Every phone whose current_store_id is this store, sold ones included.
+    imeis: list["Imei"] = Relationship(back_populates="current_store", cascade_delete=False)
     transactions: list["Transaction"] = Relationship(back_populates="store")
@@ -0,0 +1,20 @@
+from datetime import datetime
+from sqlmodel import Field, SQLModel
+
+
+class StoreInventoryVersion(SQLModel, table=True):
+    """
+    Bumped by InventoryCRUD in the same transaction as any change to a
+    store's stock (the IMEIs in stock there, or their details).
+    GET /api/imeis/stores/{id} uses it as the ETag and snapshot cache key.
+    A store without a row is at version 0.
+
+    changes_floor is the oldest version the inventory_change log can still
+    be replayed from; it moves up when old changes are pruned.
+    """
+    __tablename__ = "store_inventory_version"
+
+    store_id: int = Field(foreign_key="store.id", primary_key=True)
+    version: int = 0
+    changes_floor: int = 0
+    updated_at: datetime = Field(default_factory=datetime.now)
@@ -0,0 +1,27 @@
+"""
+Delete inventory changes older than INVENTORY_CHANGES_RETENTION_DAYS (or --days).
+Delta-sync clients with an older cursor get a full snapshot next time.
+Usage: docker compose exec backend python prune_inventory_changes.py [--days N]
+Run it daily, e.g. from cron.
+"""
+import argparse
+from datetime import datetime, timedelta
+
+from sqlmodel import Session
+
+from core import config
+from core.database import engine
+from crud.inventory import InventoryCRUD
+
+
+def prune(days: int):
+    before = datetime.now() - timedelta(days=days)
+    with Session(engine) as db:
+        deleted = InventoryCRUD(db).prune_changes(before)
+    print(f"Deleted {deleted} inventory changes logged before {before:%Y-%m-%d %H:%M}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prune the inventory change log.")
+    parser.add_argument("--days", type=int, default=config.INVENTORY_CHANGES_RETENTION_DAYS)
+    prune(parser.parse_args().days)
@@ -1,6 +1,8 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, TypeAdapter
 from datetime import datetime
 
+from core import config
+
 
 class ReadImeiStore(BaseModel):
     id: int
@@ -12,7 +14,8 @@ class ReadImeiStore(BaseModel):
         from_attributes = True
 
 class CreateImei(BaseModel):
-    code: str
+    code: str                           # may be a dual-SIM pair "IMEI1/IMEI2"
+    secondary_code: str | None = None
     vendor_id: int | None = None
     brand: str
     model: str
@@ -22,16 +25,71 @@ class CreateImei(BaseModel):
 class ReadImei(BaseModel):
     id: int
     code: str
+    secondary_code: str | None = None
     vendor_id: int | None = None
     brand: str
     model: str
     storage_size: str | None = None
-    stores: list[ReadImeiStore] = []
+    current_store_id: int | None = None
+    status: str
+    stores: list[ReadImeiStore] = []    # the current store while in stock, else empty
     created_at: datetime
     updated_at: datetime
 
     class Config:
         orm_mode = True
         from_attributes = True
-    
-    
\ No newline at end of file
+
+
+# Validates and serializes a whole list in one call, e.g. the dicts of
+# ImeiCRUD.page / all_by_store_id.
+ReadImeiList = TypeAdapter(list[ReadImei])
+
+
+class BulkCreateImei(BaseModel):
+    """One carton: many codes sharing the same phone details and store."""
+    codes: list[str] = Field(min_length=1, max_length=config.IMEI_BULK_MAX_CODES)
+    vendor_id: int | None = None
+    brand: str
+    model: str
+    storage_size: str | None = None
+    store_id: int
+
+
+class LookupImeis(BaseModel):
+    """Scanned codes to resolve; with store_id, each result says whether the phone is in stock there."""
+    codes: list[str] = Field(min_length=1, max_length=config.IMEI_LOOKUP_MAX_CODES)
+    store_id: int | None = None
+
+
+class ImeiLookupResult(BaseModel):
+    code: str                           # as sent
+    found: bool
+    id: int | None = None
+    imei_code: str | None = None        # the phone's primary IMEI
+    brand: str | None = None
+    model: str | None = None
+    storage_size: str | None = None
+    status: str | None = None           # in_stock | in_transit | sold
+    current_store_id: int | None = None
+    current_store_name: str | None = None
+    in_store: bool | None = None        # only when store_id was sent
+
+
+class ImeiLookupReport(BaseModel):
+    found: int
+    missing: int
+    results: list[ImeiLookupResult]
+
+
+class BulkImeiResult(BaseModel):
+    code: str
+    status: str  # created | updated | rejected
+    detail: str | None = None
+
+
+class BulkImeiReport(BaseModel):
+    created: int
+    updated: int
+    rejected: int
+    results: list[BulkImeiResult]
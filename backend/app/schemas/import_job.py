@@ -0,0 +1,20 @@
+from datetime import datetime
+from pydantic import BaseModel
+
+
+class ReadImportJob(BaseModel):
+    id: int
+    filename: str
+    store_id: int
+    vendor_id: int | None = None
+    status: str  # queued | running | completed | failed
+    rows_processed: int
+    rows_created: int
+    rows_updated: int
+    rows_rejected: int
+    rows_per_second: float | None = None
+    errors: list[str] = []
+    detail: str = ""
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
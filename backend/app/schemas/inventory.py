@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+
+
+class ReadStockLevel(BaseModel):
+    store_id: int
+    brand: str
+    model: str
+    storage_size: str
+    quantity: int
+
+    class Config:
+        from_attributes = True
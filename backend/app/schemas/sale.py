@@ -1,5 +1,7 @@
 from datetime import datetime
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from core import config
 
 
 class CreateSale(BaseModel):
@@ -33,6 +35,7 @@ class ReadSale(BaseModel):
     amount: float
     notes: str
     status: str
+    order_ref: str | None = None
     customer_name: str
     customer_phone: str
     customer_secondary_phone: str
@@ -48,3 +51,40 @@ class ReadSale(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class SaleItem(BaseModel):
+    imei_code: str
+    amount: float
+    brand: str = ""                     # "" takes the IMEI's
+    model: str = ""
+    storage: str = ""
+    notes: str = ""
+
+
+class CreateSaleBatch(BaseModel):
+    """One checkout: several phones from one store to one customer, sold together or not at all."""
+    store_id: int
+    store_name: str = ""
+    items: list[SaleItem] = Field(min_length=1, max_length=config.SALE_BATCH_MAX_ITEMS)
+    customer_name: str
+    customer_phone: str
+    customer_secondary_phone: str = ""
+    next_of_kin_name: str = ""
+    next_of_kin_relationship: str = ""
+    next_of_kin_phone: str = ""
+    next_of_kin_secondary_phone: str = ""
+    seller_id: int | None = None
+    seller_name: str = ""
+
+
+class SaleBatchItemError(BaseModel):
+    imei_code: str                      # as sent
+    error: str  # not_found | not_available | duplicate
+    detail: str
+
+
+class ReadSaleBatch(BaseModel):
+    order_ref: str
+    total_amount: float
+    sales: list[ReadSale]
@@ -11,7 +11,7 @@ class CreateStockRequest(BaseModel):
     model: str
     storage: str
     requested_quantity: int
-    available_stock: int = 0
+    available_stock: int = 0  # ignored: filled in from the stock summary
     notes: str = ""
     requested_imeis: list[str] = []
 
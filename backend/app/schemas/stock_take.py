@@ -0,0 +1,84 @@
+from datetime import datetime
+from pydantic import BaseModel, Field
+
+from core import config
+
+
+class CreateStockTake(BaseModel):
+    store_id: int
+    note: str = ""
+
+
+class StockTakeScanBatch(BaseModel):
+    """Codes from one handheld; several handhelds may send into the same stock take."""
+    codes: list[str] = Field(min_length=1, max_length=config.IMEI_LOOKUP_MAX_CODES)
+    scanned_by: str = ""
+
+
+class StockTakeCounters(BaseModel):
+    expected: int
+    counted: int
+    missing: int
+    wrong_store: int
+    unexpected: int
+    scanned: int
+    progress: float                     # counted / expected, in percent
+
+
+class ReadStockTake(BaseModel):
+    id: int
+    store_id: int
+    note: str
+    status: str  # open | closed
+    counters: StockTakeCounters
+    created_at: datetime
+    closed_at: datetime | None = None
+
+
+class FlaggedScan(BaseModel):
+    code: str
+    result: str  # wrong_store | unexpected
+    status: str | None = None           # the phone's status, None for an unknown code
+    current_store_id: int | None = None
+
+
+class StockTakeScanResult(BaseModel):
+    accepted: int                       # new to this stock take
+    duplicates: int                     # already scanned, by any handheld
+    flagged: list[FlaggedScan]
+    counters: StockTakeCounters
+
+
+class MissingItem(BaseModel):
+    code: str
+    brand: str
+    model: str
+    storage_size: str | None = None
+
+
+class WrongStoreItem(BaseModel):
+    code: str                           # as scanned
+    imei_code: str
+    brand: str
+    model: str
+    current_store_id: int
+    current_store_name: str
+
+
+class UnexpectedItem(BaseModel):
+    code: str                           # as scanned
+    imei_code: str | None = None        # None: unknown code
+    brand: str | None = None
+    model: str | None = None
+    status: str | None = None
+    scanned_by: str = ""
+
+
+class StockTakeReport(BaseModel):
+    id: int
+    store_id: int
+    status: str
+    counters: StockTakeCounters
+    missing: list[MissingItem]
+    wrong_store: list[WrongStoreItem]
+    unexpected: list[UnexpectedItem]
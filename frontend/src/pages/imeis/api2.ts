@@ -41,9 +41,16 @@ export interface ImeiInventoryItem {
     imeis: Imei[];
 }
 
+// GET /imeis is paginated (newest first); follow nextCursor to the last page.
 export const fetchAllImeis = async (): Promise<Imei[]> => {
-    const res = await api.get("/imeis");
-    return res.data.data || res.data;
+    const all: Imei[] = [];
+    let cursor: string | null = null;
+    do {
+        const res = await api.get("/imeis", { params: { pageSize: 200, ...(cursor ? { cursor } : {}) } });
+        all.push(...(res.data?.data ?? []));
+        cursor = res.data?.nextCursor ?? null;
+    } while (cursor);
+    return all;
 };
 
 export const getStorageOptions = async (): Promise<{ id?: number; name: string }[]> => {
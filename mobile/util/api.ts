@@ -129,7 +129,19 @@ export const modelApi = {
 
 // IMEI/Product endpoints
 export const imeiApi = {
-    getAll: () => api.get('/imeis'),
+    getPage: (params?: { cursor?: string; pageSize?: number; store_id?: number; brand?: string; model?: string }) =>
+        api.get('/imeis', { params }),
+    // Every IMEI, following nextCursor through the paginated list.
+    getAll: async () => {
+        const data: any[] = [];
+        let cursor: string | undefined;
+        do {
+            const res = await api.get('/imeis', { params: { pageSize: 200, cursor } });
+            data.push(...(res.data?.data ?? []));
+            cursor = res.data?.nextCursor ?? undefined;
+        } while (cursor);
+        return { data: { data, total: data.length } };
+    },
     getByCode: (code: string) => api.get(`/imeis/code/${code}`),
     getById: (id: number) => api.get(`/imeis/id/${id}`),
     getByStoreId: (storeId: number) => api.get(`/imeis/stores/${storeId}`),